@@ -9,13 +9,25 @@ wykorzystanie w celach komercyjnych bez pisemnej zgody autora jest zabronione.
 
 Kontakt: prof.instal@example.com
 """
+from __future__ import annotations
+
+import time
+_T_START = time.perf_counter()
 
 import tkinter as tk
 from tkinter import ttk, messagebox, font as tkfont
 from math import isfinite
-import os, sys, tempfile, subprocess
+import os, sys, subprocess, threading
+import importlib.util
+
+# moduły wspólne z aplikacją webową (jedna kopia: Mieszkancy/profinstal_web)
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Mieszkancy", "profinstal_web"))
+
+from logo_assets import LOGO_CANDIDATES, logo_source, logo_bytes, logo_reader
+from fonts import pdf_fonts
+from doc_worker import DocWorker, DONE, FAILED
 
-LOGO_FILE = "profinstal_logo_150x150.png"  # w tym samym folderze
+LOGO_FILE = LOGO_CANDIDATES[0]  # w tym samym folderze (zapasowo LOGO512x512.png)
 
 # ========= COPYRIGHT & LICENSING =========
 COPYRIGHT_NOTICE = """
@@ -28,31 +40,55 @@ wykorzystanie w celach komercyjnych bez pisemnej zgody autora jest zabronione.
 Kontakt: prof.instal@example.com
 """
 
-# ===== moduły opcjonalne =====
-DOCX_AVAILABLE = True
-try:
-    from docx import Document
-    from docx.shared import Pt, Inches
-    from docx.oxml.ns import qn
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    import datetime
-except Exception:
-    DOCX_AVAILABLE = False
-
-PDF_AVAILABLE = True
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.pdfgen import canvas as pdf_canvas
-    from reportlab.lib.units import mm
-except Exception:
-    PDF_AVAILABLE = False
-
-# (logo w GUI)
-try:
-    from PIL import Image, ImageTk
-    PIL_OK = True
-except Exception:
-    PIL_OK = False
+# ===== tryb szybkiego startu =====
+# PROFINSTAL_FAST_START=0 przywraca dawny start: wszystkie moduły i karty od razu
+FAST_START = os.environ.get("PROFINSTAL_FAST_START", "1") != "0"
+STARTUP = {}  # czasy startu [s] — raport: --startup-report
+
+# ===== moduły opcjonalne (python-docx / reportlab ładowane przy pierwszym eksporcie) =====
+DOCX_AVAILABLE = importlib.util.find_spec("docx") is not None
+PDF_AVAILABLE = importlib.util.find_spec("reportlab") is not None
+_import_lock = threading.Lock()
+
+def _load_docx():
+    """Importuje python-docx (raz; także z wątku roboczego)."""
+    global DOCX_AVAILABLE, Document, Pt, qn, datetime
+    with _import_lock:
+        if "docx" in STARTUP.get("doc_imports", {}):
+            return
+        t = time.perf_counter()
+        try:
+            from docx import Document
+            from docx.shared import Pt
+            from docx.oxml.ns import qn
+            import datetime
+        except Exception:
+            DOCX_AVAILABLE = False
+            raise
+        STARTUP.setdefault("doc_imports", {})["docx"] = time.perf_counter() - t
+
+def _load_pdf():
+    """Importuje reportlab (raz; także z wątku roboczego)."""
+    global PDF_AVAILABLE, A4, pdf_canvas, mm
+    with _import_lock:
+        if "pdf" in STARTUP.get("doc_imports", {}):
+            return
+        t = time.perf_counter()
+        try:
+            from reportlab.lib.pagesizes import A4
+            from reportlab.pdfgen import canvas as pdf_canvas
+            from reportlab.lib.units import mm
+        except Exception:
+            PDF_AVAILABLE = False
+            raise
+        STARTUP.setdefault("doc_imports", {})["pdf"] = time.perf_counter() - t
+
+if not FAST_START:
+    for _load in (_load_docx, _load_pdf):
+        try:
+            _load()
+        except Exception:
+            pass
 
 # ===== dane eksperta =====
 EXPERT = {
@@ -65,6 +101,14 @@ EXPERT = {
     "city": "Kraków"
 }
 
+# ===== domyślne dane stron pisma (pola kart nadawcy/adresata) =====
+PARTY_DEFAULTS = {
+    "r_name": "Jan Kowalski", "r_addr": "ul. Przykładowa 12/34, 30-000 Kraków",
+    "r_email": "jan.kowalski@example.com", "r_phone": "+48 600 000 000", "flatid": "lok. 34 / kl. B",
+    "a_name": "Spółdzielnia Mieszkaniowa XYZ", "a_addr": "ul. Zarządcza 1, 30-000 Kraków",
+    "a_email": "biuro@sm-xyz.pl", "a_nip": "",
+}
+
 # ===== paleta (eco dark + delikatny gradient nagłówka) =====
 COL_BG      = "#0e1f18"
 COL_CARD    = "#173627"
@@ -98,8 +142,7 @@ def open_file_crossplatform(path: str):
         messagebox.showerror("Nie można otworzyć pliku", f"{path}\n\n{e}")
 
 def logo_path_or_none():
-    p = os.path.join(os.path.dirname(__file__), LOGO_FILE)
-    return p if os.path.exists(p) else None
+    return logo_source()
 
 # ===== komponent KPI (mini-kart z dużą liczbą + pasek) =====
 class KPI(ttk.Frame):
@@ -124,7 +167,10 @@ class KPI(ttk.Frame):
 
 # ===== GUI =====
 class App(tk.Tk):
+    _gradients = {}  # (interpreter Tcl, wysokość, szerokość) → PhotoImage gradientu nagłówka
+
     def __init__(self):
+        t0 = time.perf_counter()
         super().__init__()
         self.title("PROF INSTAL — Dla Mieszkańców © 2025 Maciej Ślusarczyk")
         self.geometry("1200x840")
@@ -136,8 +182,14 @@ class App(tk.Tk):
         tkfont.nametofont("TkTextFont").configure(family=FONT_FAMILY)
         tkfont.nametofont("TkHeadingFont").configure(family=FONT_FAMILY)
 
+        self.worker = DocWorker()  # dokumenty generowane w tle, okno odpytuje postęp przez after()
+        self._poll_id = None
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
         self._styles()
         self._ui()
+        STARTUP["widgets"] = time.perf_counter() - t0
+        self.bind("<Map>", self._on_first_map, add="+")
 
     def _styles(self):
         st = ttk.Style(self)
@@ -221,10 +273,9 @@ class App(tk.Tk):
         # Prawa kolumna: nadawca + adresat (początkowo ukryte)
         self.right_column = ttk.Frame(grid, style="Bg.TFrame")
         self.right_column.grid(row=0, column=1, sticky="nsew", padx=(8, 0))
-        self.sender_card = self._card_sender(self.right_column)
-        self.addressee_card = self._card_addressee(self.right_column)
-        
-        # Początkowo ukrywamy karty adresowe
+        # Karty adresowe są początkowo ukryte — w trybie szybkiego startu powstają przy pierwszym pokazaniu
+        self.sender_card = None if FAST_START else self._card_sender(self.right_column)
+        self.addressee_card = None if FAST_START else self._card_addressee(self.right_column)
         self.sender_visible = False
         self.addressee_visible = False
 
@@ -234,6 +285,14 @@ class App(tk.Tk):
         # Pasek akcji
         self._card_actions(wrap).pack(fill="x", pady=(16, 12))
 
+        # KPI, wyniki i stopka — w trybie szybkiego startu zaraz po pierwszym odrysowaniu okna
+        if FAST_START:
+            self.after_idle(self._ui_results, wrap, scrollable_frame)
+        else:
+            self._ui_results(wrap, scrollable_frame)
+
+    def _ui_results(self, wrap, scrollable_frame):
+        t0 = time.perf_counter()
         # KPI pasek - pierwsze 4 wskaźniki
         self.kpi_bar1 = ttk.Frame(wrap, style="Bg.TFrame")
         self.kpi_bar1.pack(fill="x", pady=(4, 6))
@@ -277,6 +336,7 @@ class App(tk.Tk):
 
         # Stopka - w scrollable_frame
         self._create_copyright_footer(scrollable_frame)
+        STARTUP["deferred_widgets"] = time.perf_counter() - t0
 
     def _toggle_sender_form(self):
         """Pokazuje/ukrywa formularz nadawcy (mieszkańca)"""
@@ -286,6 +346,8 @@ class App(tk.Tk):
             self.sender_visible = False
         else:
             # Pokaż formularz nadawcy
+            if self.sender_card is None:
+                self.sender_card = self._card_sender(self.right_column)
             self.sender_card.pack(fill="x", pady=(0, 8))
             self.sender_visible = True
 
@@ -297,6 +359,8 @@ class App(tk.Tk):
             self.addressee_visible = False
         else:
             # Pokaż formularz adresata
+            if self.addressee_card is None:
+                self.addressee_card = self._card_addressee(self.right_column)
             if self.sender_visible:
                 # Jeśli nadawca jest widoczny, pokaż adresata pod nim
                 self.addressee_card.pack(fill="x")
@@ -307,25 +371,48 @@ class App(tk.Tk):
 
     # ===== Nagłówek =====
     def _draw_header_gradient(self, canvas: tk.Canvas):
-        # ręcznie malowany pionowy gradient (prosty, bez PIL)
-        w = canvas.winfo_reqwidth()
+        # pionowy gradient jako jeden obraz: kolumna 1 px rozciągnięta (zoom) na szerokość ekranu,
+        # budowany raz na proces zamiast 84 linii Canvas
         h = 84
-        start = (10, 44, 28)   # ~#0a2c1c
-        end   = (18, 62, 39)   # ~#123e27
-        for i in range(h):
-            t = i / max(h-1,1)
-            r = int(start[0] + (end[0]-start[0]) * t)
-            g = int(start[1] + (end[1]-start[1]) * t)
-            b = int(start[2] + (end[2]-start[2]) * t)
-            canvas.create_line(0, i, w, i, fill=f"#{r:02x}{g:02x}{b:02x}")
+        w = max(canvas.winfo_screenwidth(), canvas.winfo_reqwidth())
+        key = (id(self.tk), h, w)
+        img = App._gradients.get(key)
+        if img is None:
+            start = (10, 44, 28)   # ~#0a2c1c
+            end   = (18, 62, 39)   # ~#123e27
+            rows = []
+            for i in range(h):
+                t = i / max(h-1,1)
+                r = int(start[0] + (end[0]-start[0]) * t)
+                g = int(start[1] + (end[1]-start[1]) * t)
+                b = int(start[2] + (end[2]-start[2]) * t)
+                rows.append(f"{{#{r:02x}{g:02x}{b:02x}}}")
+            column = tk.PhotoImage(master=self, width=1, height=h)
+            column.put(" ".join(rows))
+            img = App._gradients[key] = column.zoom(w, 1)
+        canvas.create_image(0, 0, image=img, anchor="nw")
+
+    # ===== raport startu =====
+    def _on_first_map(self, event):
+        if event.widget is not self or "first_paint" in STARTUP:
+            return
+        # pierwsze odrysowanie: po obsłużeniu zaległych zdarzeń rysowania
+        self.after_idle(self._mark_first_paint)
+
+    def _mark_first_paint(self):
+        if "first_paint" not in STARTUP:
+            self.update_idletasks()
+            STARTUP["first_paint"] = time.perf_counter() - _T_START
+            for hook in _on_first_paint:
+                hook(self)
 
     def _header_contents(self, canvas: tk.Canvas):
         # Logo + tytuł + podtytuł
-        lp = logo_path_or_none()
-        if PIL_OK and lp:
+        # logo 64 px z pamięci podręcznej (PNG) — bez dekodowania oryginału przy starcie
+        data = logo_bytes("tk")
+        if data:
             try:
-                img = Image.open(lp).resize((64, 64))
-                self._logo_img = ImageTk.PhotoImage(img)
+                self._logo_img = tk.PhotoImage(data=data)
                 canvas.create_image(24, 42, image=self._logo_img, anchor="w")
             except Exception:
                 pass
@@ -393,20 +480,22 @@ class App(tk.Tk):
     def _card_sender(self, parent):
         c = ttk.Frame(parent, style="Card.TFrame", padding=16)
         ttk.Label(c, text="Nadawca (mieszkaniec)", style="Title.TLabel").grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 10))
-        self.e_res_name = self._mk_pair(c, "Imię i nazwisko:", "Jan Kowalski", 1)
-        self.e_res_addr = self._mk_pair(c, "Adres lokalu:", "ul. Przykładowa 12/34, 30-000 Kraków", 2)
-        self.e_res_email = self._mk_pair(c, "E-mail:", "jan.kowalski@example.com", 3)
-        self.e_res_phone = self._mk_pair(c, "Telefon:", "+48 600 000 000", 4)
-        self._mk_pair(c, "Nr mieszkania/identyfikator:", "lok. 34 / kl. B", 5, varname="e_flat_id")
+        D = PARTY_DEFAULTS
+        self.e_res_name = self._mk_pair(c, "Imię i nazwisko:", D["r_name"], 1)
+        self.e_res_addr = self._mk_pair(c, "Adres lokalu:", D["r_addr"], 2)
+        self.e_res_email = self._mk_pair(c, "E-mail:", D["r_email"], 3)
+        self.e_res_phone = self._mk_pair(c, "Telefon:", D["r_phone"], 4)
+        self._mk_pair(c, "Nr mieszkania/identyfikator:", D["flatid"], 5, varname="e_flat_id")
         return c
 
     def _card_addressee(self, parent):
         c = ttk.Frame(parent, style="Card.TFrame", padding=16)
         ttk.Label(c, text="Adresat (spółdzielnia / wspólnota)", style="Title.TLabel").grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 10))
-        self._mk_pair(c, "Nazwa:", "Spółdzielnia Mieszkaniowa XYZ", 1, varname="e_add_name")
-        self._mk_pair(c, "Adres:", "ul. Zarządcza 1, 30-000 Kraków", 2, varname="e_add_addr")
-        self._mk_pair(c, "E-mail:", "biuro@sm-xyz.pl", 3, varname="e_add_email")
-        self._mk_pair(c, "NIP (opcjonalnie):", "", 4, varname="e_add_nip")
+        D = PARTY_DEFAULTS
+        self._mk_pair(c, "Nazwa:", D["a_name"], 1, varname="e_add_name")
+        self._mk_pair(c, "Adres:", D["a_addr"], 2, varname="e_add_addr")
+        self._mk_pair(c, "E-mail:", D["a_email"], 3, varname="e_add_email")
+        self._mk_pair(c, "NIP (opcjonalnie):", D["a_nip"], 4, varname="e_add_nip")
         return c
 
     def _mk_pair(self, parent, label, default, r, varname=None):
@@ -426,6 +515,13 @@ class App(tk.Tk):
         ttk.Button(c, text="Pismo reklamacyjne (PDF)",  command=self._gen_resident_letter_pdf, style="Ghost.TButton").grid(row=0, column=3, padx=4)
         ttk.Button(c, text="Opinia eksperta (DOCX)", command=self._gen_opinion_docx, style="Ghost.TButton").grid(row=0, column=4, padx=4)
         ttk.Button(c, text="Opinia eksperta (PDF)",  command=self._gen_opinion_pdf, style="Ghost.TButton").grid(row=0, column=5, padx=4)
+        # postęp generowania dokumentów w tle
+        self.job_status = ttk.Label(c, text="", style="Hint.TLabel")
+        self.job_status.grid(row=1, column=0, columnspan=4, sticky="w", padx=4, pady=(8, 0))
+        self.job_pb = ttk.Progressbar(c, maximum=100)
+        self.job_pb.grid(row=1, column=4, sticky="ew", padx=4, pady=(8, 0))
+        self.job_cancel = ttk.Button(c, text="Anuluj", command=self._cancel_job, style="Ghost.TButton", state="disabled")
+        self.job_cancel.grid(row=1, column=5, padx=4, pady=(8, 0))
         for i in range(6): c.columnconfigure(i, weight=1)
         return c
 
@@ -557,346 +653,209 @@ class App(tk.Tk):
         style._element.rPr.rFonts.set(qn('w:eastAsia'), 'Times New Roman')
         style.font.size = Pt(11)
 
-    def _add_docx_header(self, doc: Document):
-        # Copyright na początku dokumentu
+    # ===== DOKUMENTY W TLE =====
+    def _submit_doc(self, label, suffix, write, error_text):
+        """
+        Odczytuje dane z okna (wątek Tk) i zleca write(job, path, L, P) wątkowi
+        roboczemu; gotowy plik otwiera _poll_jobs. Można zlecić kilka dokumentów
+        pod rząd — czekają w kolejce.
+        """
+        try:
+            if not hasattr(self, "_last"): self._calc_all()
+            L = dict(self._last); P = self._collect_parties()
+        except Exception as e:
+            messagebox.showerror("Błąd", f"{error_text}\n{e}")
+            return
+        job = self.worker.submit(label, write, suffix, L, P)
+        job.error_text = error_text
+        self._update_job_status()
+        if self._poll_id is None:
+            self._poll_id = self.after(100, self._poll_jobs)
+
+    def _poll_jobs(self):
+        self._poll_id = None
+        for job, state in self.worker.poll():
+            if state == DONE:
+                open_file_crossplatform(job.path)
+            elif state == FAILED:
+                messagebox.showerror("Błąd", f"{job.error_text}\n{job.error}")
+        self._update_job_status()
+        if self.worker.jobs:
+            self._poll_id = self.after(100, self._poll_jobs)
+
+    def _update_job_status(self):
+        job = self.worker.current()
+        if job is None:
+            self.job_status.configure(text="")
+            self.job_pb.configure(value=0)
+            self.job_cancel.configure(state="disabled")
+            return
+        waiting = len(self.worker.jobs) - 1
+        text = f"{job.label}: {job.message or 'w kolejce'}"
+        if job.cancel_requested:
+            text += " (anulowanie…)"
+        if waiting:
+            text += f"  |  w kolejce: {waiting}"
+        self.job_status.configure(text=text)
+        self.job_pb.configure(value=job.progress * 100)
+        self.job_cancel.configure(state="disabled" if job.cancel_requested else "normal")
+
+    def _cancel_job(self):
+        job = self.worker.current()
+        if job is not None:
+            self.worker.cancel(job)
+            self._update_job_status()
+
+    def _on_close(self):
+        self.worker.shutdown()
+        self.destroy()
+
+    # ===== PISMO REKLAMACYJNE (DOCX / PDF) =====
+    def _collect_parties(self):
+        # karty tworzone przy pierwszym pokazaniu — do tego czasu wartości domyślne
+        fields = dict(r_name="e_res_name", r_addr="e_res_addr", r_email="e_res_email", r_phone="e_res_phone",
+                      flatid="e_flat_id", a_name="e_add_name", a_addr="e_add_addr", a_email="e_add_email", a_nip="e_add_nip")
+        return {key: getattr(self, attr).get().strip() if hasattr(self, attr) else PARTY_DEFAULTS[key]
+                for key, attr in fields.items()}
+
+    def _gen_resident_letter_docx(self):
+        if not DOCX_AVAILABLE:
+            messagebox.showwarning("Brak modułu", "Zainstaluj: py -m pip install python-docx")
+            return
+        self._submit_doc("Pismo reklamacyjne (DOCX)", ".docx", self._write_resident_letter_docx, "Nie udało się utworzyć pisma (DOCX).")
+
+    def _write_resident_letter_docx(self, job, path, L, P):
+        _load_docx()  # pierwszy eksport importuje moduł (w wątku roboczym)
+        doc = Document(); self._style_docx_times(doc)
+
         copyright_para = doc.add_paragraph()
         copyright_run = copyright_para.add_run(COPYRIGHT_NOTICE)
         copyright_run.font.size = Pt(8)
         copyright_run.italic = True
         doc.add_paragraph("")
 
-        table = doc.add_table(rows=1, cols=2)
-        table.columns[0].width = Inches(5.5)
-        table.columns[1].width = Inches(1.5)
-        cell_l, cell_r = table.rows[0].cells
-        p = cell_l.paragraphs[0]
-        p.add_run(f"{EXPERT['company']} — {EXPERT['city']}\n").bold = True
-        p.add_run(f"{EXPERT['name']} | {EXPERT['title']}\n{EXPERT['lic']}\n{EXPERT['chamber']}\n{EXPERT['contact']}")
-        p.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        lp = logo_path_or_none()
-        if lp:
-            try:
-                cell_r.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
-                cell_r.paragraphs[0].add_run().add_picture(lp, width=Inches(1.0))
-            except Exception:
-                pass
+        doc.add_paragraph(P["r_name"]); doc.add_paragraph(P["r_addr"])
+        if P["r_email"] or P["r_phone"]:
+            doc.add_paragraph(f"{P['r_email']} | {P['r_phone']}")
         doc.add_paragraph("")
+        doc.add_paragraph(P["a_name"]); doc.add_paragraph(P["a_addr"])
+        if P["a_email"]:
+            doc.add_paragraph(P["a_email"])
+        if P["a_nip"]:
+            doc.add_paragraph(f"NIP: {P['a_nip']}")
+        doc.add_paragraph("")
+        doc.add_paragraph(f"Data: {datetime.datetime.today().date()}")
+        doc.add_paragraph("")
+        doc.add_heading("Reklamacja dotycząca zawyżonych kosztów podgrzania ciepłej wody użytkowej", 0)
+        job.step(0.5, "treść pisma")
+
+        doc.add_paragraph(
+            f"Jako mieszkaniec ({P['flatid']}) składam reklamację w zakresie kosztów podgrzewu CWU. "
+            f"Na podstawie niezależnej opinii eksperckiej PROF INSTAL wyliczona sprawność instalacji wspólnej "
+            f"wynosi około {L['eta']*100:.1f}%. Realny koszt podgrzania 1 m³ powinien wynosić ok. "
+            f"{L['cost_theor']:.2f} zł/m³, podczas gdy na rachunku płacę {L['bill']:.2f} zł/m³."
+        )
+        doc.add_paragraph(
+            f"Różnica (moja strata) to {L['loss_per_m3']:.2f} zł na każdym m³. Przy miesięcznym zużyciu "
+            f"{L['month_m3']:.2f} m³ daje to {L['loss_flat_m']:.2f} zł/miesiąc. To są pieniądze, które wypływają, "
+            f"bo instalacja po stronie zarządcy nie działa wystarczająco sprawnie."
+        )
+        doc.add_paragraph(
+            "Żądam uwzględnienia reklamacji, przedstawienia planu naprawczego (izolacje, regulacja/równoważenie cyrkulacji, "
+            "przegląd i korekta nastaw węzła) oraz korekty rozliczeń tak, aby nie obciążać mieszkańców kosztami strat. "
+            "Proszę o pisemną odpowiedź w terminie 14 dni."
+        )
+        doc.add_paragraph("")
+        doc.add_paragraph("Z poważaniem,")
+        doc.add_paragraph(P["r_name"])
 
-    def _legal_basis_docx(self, doc: Document):
-        doc.add_heading("Podstawy prawne i normatywne", level=1)
-        doc.add_paragraph("• Ustawa o spółdzielniach mieszkaniowych – art. 4 ust. 2 (rzeczywiste koszty).")
-        doc.add_paragraph("• Prawo budowlane – art. 62 (należyty stan techniczny; przeglądy okresowe).")
-        doc.add_paragraph("• Prawo energetyczne – art. 5 (należyta staranność i efektywność usług energetycznych).")
-        doc.add_paragraph("• Warunki Techniczne (rozp. MI) m.in. §120, §134 – instalacje wodociągowe/CWU; ograniczanie strat; cyrkulacja.")
-        doc.add_paragraph("• Taryfy ciepła zatwierdzane przez Prezesa URE – ceny energii (zł/GJ) i opłaty dystrybucyjne.")
-
-    def _signature_block_docx(self, doc: Document):
         doc.add_paragraph("")
-        p = doc.add_paragraph()
-        p.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        p.add_run(EXPERT["name"] + "\n").bold = True
-        p.add_run(EXPERT["title"] + "\n")
-        p.add_run(EXPERT["lic"] + "\n")
-        p.add_run(EXPERT["chamber"] + "\n")
-        p.add_run(EXPERT["contact"])
+        doc.add_paragraph("Na żądanie udostępnię pełną opinię eksperta PROF INSTAL z obliczeniami.")
         doc.add_paragraph("")
         footer_para = doc.add_paragraph()
-        footer_run = footer_para.add_run(f"Oprogramowanie: PROF INSTAL - Dla Mieszkańców © 2025 Maciej Ślusarczyk")
+        footer_run = footer_para.add_run(f"Analiza wykonana przy użyciu: PROF INSTAL - Dla Mieszkańców © 2025 Maciej Ślusarczyk")
         footer_run.font.size = Pt(8)
-        footer_run.bold = True
+        footer_run.italic = True
 
-    # ===== PISMO REKLAMACYJNE (DOCX / PDF) =====
-    def _collect_parties(self):
-        return dict(
-            r_name=getattr(self, 'e_res_name', ttk.Entry()).get().strip() if hasattr(self, 'e_res_name') else "Jan Kowalski",
-            r_addr=getattr(self, 'e_res_addr', ttk.Entry()).get().strip() if hasattr(self, 'e_res_addr') else "",
-            r_email=getattr(self, 'e_res_email', ttk.Entry()).get().strip() if hasattr(self, 'e_res_email') else "",
-            r_phone=getattr(self, 'e_res_phone', ttk.Entry()).get().strip() if hasattr(self, 'e_res_phone') else "",
-            flatid=getattr(self, 'e_flat_id', ttk.Entry()).get().strip() if hasattr(self, 'e_flat_id') else "",
-            a_name=getattr(self, 'e_add_name', ttk.Entry()).get().strip() if hasattr(self, 'e_add_name') else "Spółdzielnia Mieszkaniowa XYZ",
-            a_addr=getattr(self, 'e_add_addr', ttk.Entry()).get().strip() if hasattr(self, 'e_add_addr') else "",
-            a_email=getattr(self, 'e_add_email', ttk.Entry()).get().strip() if hasattr(self, 'e_add_email') else "",
-            a_nip=getattr(self, 'e_add_nip', ttk.Entry()).get().strip() if hasattr(self, 'e_add_nip') else ""
-        )
-
-    def _gen_resident_letter_docx(self):
-        if not DOCX_AVAILABLE:
-            messagebox.showwarning("Brak modułu", "Zainstaluj: py -m pip install python-docx")
-            return
-        try:
-            if not hasattr(self, "_last"): self._calc_all()
-            L = self._last; P = self._collect_parties()
-
-            doc = Document(); self._style_docx_times(doc)
-
-            copyright_para = doc.add_paragraph()
-            copyright_run = copyright_para.add_run(COPYRIGHT_NOTICE)
-            copyright_run.font.size = Pt(8)
-            copyright_run.italic = True
-            doc.add_paragraph("")
-
-            doc.add_paragraph(P["r_name"]); doc.add_paragraph(P["r_addr"])
-            if P["r_email"] or P["r_phone"]:
-                doc.add_paragraph(f"{P['r_email']} | {P['r_phone']}")
-            doc.add_paragraph("")
-            doc.add_paragraph(P["a_name"]); doc.add_paragraph(P["a_addr"])
-            if P["a_email"]:
-                doc.add_paragraph(P["a_email"])
-            if P["a_nip"]:
-                doc.add_paragraph(f"NIP: {P['a_nip']}")
-            doc.add_paragraph("")
-            doc.add_paragraph(f"Data: {datetime.datetime.today().date()}")
-            doc.add_paragraph("")
-            doc.add_heading("Reklamacja dotycząca zawyżonych kosztów podgrzania ciepłej wody użytkowej", 0)
-
-            doc.add_paragraph(
-                f"Jako mieszkaniec ({P['flatid']}) składam reklamację w zakresie kosztów podgrzewu CWU. "
-                f"Na podstawie niezależnej opinii eksperckiej PROF INSTAL wyliczona sprawność instalacji wspólnej "
-                f"wynosi około {L['eta']*100:.1f}%. Realny koszt podgrzania 1 m³ powinien wynosić ok. "
-                f"{L['cost_theor']:.2f} zł/m³, podczas gdy na rachunku płacę {L['bill']:.2f} zł/m³."
-            )
-            doc.add_paragraph(
-                f"Różnica (moja strata) to {L['loss_per_m3']:.2f} zł na każdym m³. Przy miesięcznym zużyciu "
-                f"{L['month_m3']:.2f} m³ daje to {L['loss_flat_m']:.2f} zł/miesiąc. To są pieniądze, które wypływają, "
-                f"bo instalacja po stronie zarządcy nie działa wystarczająco sprawnie."
-            )
-            doc.add_paragraph(
-                "Żądam uwzględnienia reklamacji, przedstawienia planu naprawczego (izolacje, regulacja/równoważenie cyrkulacji, "
-                "przegląd i korekta nastaw węzła) oraz korekty rozliczeń tak, aby nie obciążać mieszkańców kosztami strat. "
-                "Proszę o pisemną odpowiedź w terminie 14 dni."
-            )
-            doc.add_paragraph("")
-            doc.add_paragraph("Z poważaniem,")
-            doc.add_paragraph(P["r_name"])
-
-            doc.add_paragraph("")
-            doc.add_paragraph("Na żądanie udostępnię pełną opinię eksperta PROF INSTAL z obliczeniami.")
-            doc.add_paragraph("")
-            footer_para = doc.add_paragraph()
-            footer_run = footer_para.add_run(f"Analiza wykonana przy użyciu: PROF INSTAL - Dla Mieszkańców © 2025 Maciej Ślusarczyk")
-            footer_run.font.size = Pt(8)
-            footer_run.italic = True
-
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".docx")
-            path = tmp.name; tmp.close()
-            doc.save(path); open_file_crossplatform(path)
-        except Exception as e:
-            messagebox.showerror("Błąd", f"Nie udało się utworzyć pisma (DOCX).\n{e}")
+        job.step(0.9, "zapis pliku")
+        doc.save(path)
 
     def _gen_resident_letter_pdf(self):
         if not PDF_AVAILABLE:
             messagebox.showwarning("Brak modułu", "Zainstaluj: py -m pip install reportlab")
             return
-        try:
-            if not hasattr(self, "_last"): self._calc_all()
-            L = self._last; P = self._collect_parties()
-
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-            path = tmp.name; tmp.close()
-
-            c = pdf_canvas.Canvas(path, pagesize=A4)
-            w, h = A4
-            x, y = 20*mm, h - 20*mm
-            lh = 6*mm
-
-            def writeln(text, bold=False, size=10):
-                nonlocal y
-                c.setFont("Times-Bold" if bold else "Times-Roman", size)
-                c.drawString(x, y, text)
-                y -= lh
-
-            lp = logo_path_or_none()
-            if lp:
-                try: c.drawImage(lp, w-40*mm, h-30*mm, width=20*mm, height=20*mm, preserveAspectRatio=True, mask='auto')
-                except Exception: pass
-
-            writeln("© 2025 PROF INSTAL Maciej Ślusarczyk - Wszelkie prawa zastrzeżone", size=8)
-            y -= 2*mm
-
-            writeln(f"{EXPERT['company']} — {EXPERT['city']}", bold=True, size=12)
-            writeln(f"{EXPERT['name']} | {EXPERT['title']}", size=9)
-            writeln(f"{EXPERT['lic']} | {EXPERT['chamber']}", size=9)
-            writeln(EXPERT["contact"], size=9); y -= 4*mm
-
-            writeln("Opinia techniczno-finansowa — CWU (skrót)", bold=True); y -= 2*mm
-            writeln("Wzory autorskie PROF INSTAL © 2025 Maciej Ślusarczyk:", bold=True, size=9)
-            writeln("Q = m·c·ΔT;  Q[GJ/m³]=(1000·4,19·ΔT)/1e6;  koszt_teor = Q·cena_ciepła_brutto;  η = koszt_teor/rachunek")
-            writeln(f"Rachunek: {L['bill']:.2f} zł/m³ | Ciepło brutto: {L['price_GJ_brutto']:.2f} zł/GJ | ΔT: {L['dT']:.0f}°C")
-            writeln(f"Q_teor: {L['q_per_m3']:.5f} GJ/m³ → koszt_teor: {L['cost_theor']:.2f} zł/m³ | η: {L['eta']*100:.1f}%")
-            writeln(f"Strata: {L['loss_per_m3']:.2f} zł/m³ | Budynek: {L['loss_build_m']:,.2f} zł/m-c; {L['loss_build_y']:,.2f} zł/rok"); y -= 2*mm
-            writeln("Scenariusze modernizacji:", bold=True)
-            writeln(f"70% → koszt {L['cost70']:.2f} zł/m³ | oszcz. {L['save70_m3']:.2f} zł/m³")
-            writeln(f"80% → koszt {L['cost80']:.2f} zł/m³ | oszcz. {L['save80_m3']:.2f} zł/m³")
-            y -= 2*mm
-            writeln("Oprogramowanie: PROF INSTAL - Dla Mieszkańców © 2025 Maciej Ślusarczyk", size=8)
-
-            c.showPage(); c.save(); open_file_crossplatform(path)
-        except Exception as e:
-            messagebox.showerror("Błąd", f"Nie udało się utworzyć opinii (PDF).\n{e}")
+        self._submit_doc("Pismo reklamacyjne (PDF)", ".pdf", self._write_resident_letter_pdf, "Nie udało się utworzyć pisma (PDF).")
+
+    def _write_resident_letter_pdf(self, job, path, L, P):
+        _load_pdf()
+        regular, bold_font = pdf_fonts()  # TTF z polskimi znakami (podzbiór glifów), inaczej Times
+        c = pdf_canvas.Canvas(path, pagesize=A4)
+        w, h = A4
+        x, y = 20*mm, h - 20*mm
+        lh = 6*mm
+
+        def writeln(text, bold=False, size=10):
+            nonlocal y
+            c.setFont(bold_font if bold else regular, size)
+            c.drawString(x, y, text)
+            y -= lh
+
+        logo = logo_reader()
+        if logo:
+            try: c.drawImage(logo, w-40*mm, h-30*mm, width=20*mm, height=20*mm, preserveAspectRatio=True, mask='auto')
+            except Exception: pass
+        job.step(0.3, "treść dokumentu")
+
+        writeln("© 2025 PROF INSTAL Maciej Ślusarczyk - Wszelkie prawa zastrzeżone", size=8)
+        y -= 2*mm
+
+        writeln(f"{EXPERT['company']} — {EXPERT['city']}", bold=True, size=12)
+        writeln(f"{EXPERT['name']} | {EXPERT['title']}", size=9)
+        writeln(f"{EXPERT['lic']} | {EXPERT['chamber']}", size=9)
+        writeln(EXPERT["contact"], size=9); y -= 4*mm
+
+        writeln("Opinia techniczno-finansowa — CWU (skrót)", bold=True); y -= 2*mm
+        writeln("Wzory autorskie PROF INSTAL © 2025 Maciej Ślusarczyk:", bold=True, size=9)
+        writeln("Q = m·c·ΔT;  Q[GJ/m³]=(1000·4,19·ΔT)/1e6;  koszt_teor = Q·cena_ciepła_brutto;  η = koszt_teor/rachunek")
+        writeln(f"Rachunek: {L['bill']:.2f} zł/m³ | Ciepło brutto: {L['price_GJ_brutto']:.2f} zł/GJ | ΔT: {L['dT']:.0f}°C")
+        writeln(f"Q_teor: {L['q_per_m3']:.5f} GJ/m³ → koszt_teor: {L['cost_theor']:.2f} zł/m³ | η: {L['eta']*100:.1f}%")
+        writeln(f"Strata: {L['loss_per_m3']:.2f} zł/m³ | Budynek: {L['loss_build_m']:,.2f} zł/m-c; {L['loss_build_y']:,.2f} zł/rok"); y -= 2*mm
+        writeln("Scenariusze modernizacji:", bold=True)
+        writeln(f"70% → koszt {L['cost70']:.2f} zł/m³ | oszcz. {L['save70_m3']:.2f} zł/m³")
+        writeln(f"80% → koszt {L['cost80']:.2f} zł/m³ | oszcz. {L['save80_m3']:.2f} zł/m³")
+        y -= 2*mm
+        writeln("Oprogramowanie: PROF INSTAL - Dla Mieszkańców © 2025 Maciej Ślusarczyk", size=8)
+
+        job.step(0.9, "zapis pliku")
+        c.showPage(); c.save()
 
     # ===== OPINIA EKSPERTA (DOCX / PDF) =====
     def _gen_opinion_docx(self):
         if not DOCX_AVAILABLE:
             messagebox.showwarning("Brak modułu", "Zainstaluj: py -m pip install python-docx")
             return
-        try:
-            if not hasattr(self, "_last"): self._calc_all()
-            L = self._last
-
-            doc = Document(); self._style_docx_times(doc); self._add_docx_header(doc)
-            doc.add_heading("Opinia techniczno-finansowa — ciepła woda użytkowa (CWU)", 0)
-            doc.add_paragraph(f"Data: {datetime.datetime.today().date()}")
-
-            doc.add_heading("1. Metodyka i wzory obliczeniowe", level=1)
-            doc.add_paragraph("Obliczenia wykonano według zasad bilansu cieplnego (Q = m·c·ΔT) opisanych w normach i literaturze technicznej, z autorską metodyką PROF INSTAL w zakresie interpretacji sprawności, analizy strat i symulacji scenariuszy modernizacji.")
-            doc.add_paragraph("Q = m·c·ΔT;  m = 1000 kg;  c = 4,19 kJ/(kg·K).")
-            doc.add_paragraph("Q[GJ/m³] = (1000·4,19·ΔT) / 1 000 000;  koszt_teor [zł/m³] = Q · cena_ciepła_brutto [zł/GJ].")
-            doc.add_paragraph("Sprawność: η = koszt_teor / stawka_rachunkowa.")
-
-            method_para = doc.add_paragraph()
-            method_run = method_para.add_run("© 2025 PROF INSTAL Maciej Ślusarczyk - Model obliczeniowy objęty prawami autorskimi")
-            method_run.font.size = Pt(9)
-            method_run.italic = True
-
-            doc.add_heading("2. Dane wejściowe i wyniki", level=1)
-            u = "zł/GJ" if L['unit']=="GJ" else "zł/MJ"
-            doc.add_paragraph(f"Stawka rachunkowa: {L['bill']:.2f} zł/m³")
-            doc.add_paragraph(f"Cena ciepła (netto): {L['heat_price']:.4f} {u}; VAT: {L['vat']}%; Ciepło brutto: {L['price_GJ_brutto']:.2f} zł/GJ")
-            doc.add_paragraph(f"ΔT: {L['dT']:.0f}°C  →  Q_teor = {L['q_per_m3']:.5f} GJ/m³;  koszt_teor = {L['cost_theor']:.2f} zł/m³")
-            doc.add_paragraph(f"Sprawność wyliczona: {L['eta']*100:.1f}%")
-            doc.add_paragraph(f"Strata na 1 m³: {L['loss_per_m3']:.2f} zł;  Strata budynku: {L['loss_build_m']:,.2f} zł/m-c; {L['loss_build_y']:,.2f} zł/rok.")
-
-            # Dodanie szczegółowych obliczeń krok po kroku
-            doc.add_heading("2.1. Szczegółowe obliczenia krok po kroku", level=2)
-            
-            doc.add_paragraph("Obliczenie zapotrzebowania na energię:")
-            doc.add_paragraph(f"Q = 1000 · 4,19 · {L['dT']:.0f} / 1 000 000 = {L['q_per_m3']:.5f} GJ/m³")
-            
-            doc.add_paragraph("Cena brutto energii cieplnej:")
-            doc.add_paragraph(f"{L['heat_price']:.2f} · 1,{L['vat']} = {L['price_GJ_brutto']:.2f} zł/GJ")
-            
-            doc.add_paragraph("Koszt teoretyczny podgrzania 1 m³:")
-            doc.add_paragraph(f"{L['q_per_m3']:.5f} · {L['price_GJ_brutto']:.2f} = {L['cost_theor']:.2f} zł/m³")
-            
-            doc.add_paragraph('Sprawność (definiowana jako "efektywność rozliczeniowa"):')
-            doc.add_paragraph(f"η = {L['cost_theor']:.2f} / {L['bill']:.2f} = {L['eta']*100:.1f}%")
-            
-            doc.add_paragraph("Strata na 1 m³:")
-            doc.add_paragraph(f"{L['bill']:.2f} - {L['cost_theor']:.2f} = {L['loss_per_m3']:.2f} zł")
-            
-            # Zużycie budynku
-            total_consumption_month = L['loss_build_m'] / L['loss_per_m3'] if L['loss_per_m3'] > 0 else 0
-            total_consumption_year = total_consumption_month * 12
-            doc.add_paragraph(f"Z podanych danych wynika całkowite zużycie budynku:")
-            doc.add_paragraph(f"~{total_consumption_month:.1f} m³/miesiąc oraz ~{total_consumption_year:.1f} m³/rok")
-
-            doc.add_heading("3. Scenariusze po modernizacji", level=1)
-            doc.add_paragraph("Scenariusze liczone według wzoru: stawka = koszt_teor / η")
-            
-            doc.add_paragraph(f"70% sprawności:")
-            cost70_calc = L['cost_theor'] / 0.70
-            save70_calc = L['bill'] - cost70_calc
-            doc.add_paragraph(f"{L['cost_theor']:.2f} / 0,7 = {cost70_calc:.2f} zł/m³ → oszczędność {L['bill']:.2f} - {cost70_calc:.2f} = {save70_calc:.2f} zł/m³")
-            
-            doc.add_paragraph(f"80% sprawności:")
-            cost80_calc = L['cost_theor'] / 0.80
-            save80_calc = L['bill'] - cost80_calc
-            doc.add_paragraph(f"{L['cost_theor']:.2f} / 0,8 = {cost80_calc:.2f} zł/m³ → oszczędność {L['bill']:.2f} - {cost80_calc:.2f} = {save80_calc:.2f} zł/m³")
-            
-            doc.add_paragraph(f"Oszczędność budynku (mies.): 70% → {L['save70_build_m']:,.2f} zł; 80% → {L['save80_build_m']:,.2f} zł.")
-            doc.add_paragraph(f"Oszczędność budynku (rok):   70% → {L['save70_build_y']:,.2f} zł; 80% → {L['save80_build_y']:,.2f} zł.")
-
-            doc.add_heading("4. Uwagi metodyczne", level=1)
-            doc.add_paragraph("• Sprawność rozliczeniowa obejmuje straty przesyłu, magazynowania, cyrkulacji, przegrzewy anty-Legionella itd., a nie tylko sprawność wymiennika.")
-            doc.add_paragraph("• Wartość c = 4,19 kJ/(kg·K) jest przyjęta dla zakresu temperatur 10-60°C. W precyzyjnych obliczeniach można uwzględnić zmienność c i gęstości ρ≈998 kg/m³.")
-            doc.add_paragraph("• Stawka rachunkowa i cena ciepła brutto odnoszą się do tej samej bazy podatkowej.")
-            doc.add_paragraph("• Wyniki mogą podlegać niewielkim wahaniom sezonowym ze względu na zmienność temperatury wody zimnej.")
-
-            doc.add_heading("5. Podstawy prawne i normatywne", level=1)
-            self._legal_basis_docx(doc)
-
-            doc.add_heading("6. Ocena ekspercka i zalecenia", level=1)
-            eta_pct = L['eta']*100
-            if eta_pct >= 70:
-                ocena = ("Sprawność oceniona jako dobra. Rekomenduję utrzymanie parametrów, okresowe równoważenie cyrkulacji, "
-                         "monitoring temperatur (zasilanie/powrót CWU) i audyt co 12 miesięcy.")
-                # Dodatkowa notatka dla sprawności w okolicy 70%
-                if 70 <= eta_pct <= 75:
-                    doc.add_paragraph("")
-                    note_para = doc.add_paragraph()
-                    note_run = note_para.add_run("UWAGA: Sprawność na granicy normy technicznej.")
-                    note_run.bold = True
-                    doc.add_paragraph("Mimo że instalacja osiąga akceptowalny poziom 70%, warto rozważyć niewielkie usprawnienia: "
-                                    "optymalizację temperatur cyrkulacji, częściowe docieplenia najbardziej narażonych odcinków "
-                                    "oraz poprawę regulacji automatyki. Działania te mogą podnieść sprawność do 75-80% "
-                                    "przy relatywnie niskich nakładach finansowych.")
-            elif 50 <= eta_pct < 70:
-                ocena = ("Sprawność umiarkowana — realny potencjał poprawy 10–30%. Priorytety: docieplenia, zawory termostatyczne i równoważenie cyrkulacji, "
-                         "korekta nastaw węzła, praca pomp wg temperatury powrotu/harmonogramu.")
-            else:
-                ocena = ("Sprawność niska — nadmierne straty energii. Zalecane pilne działania: pełne izolacje przewodów, "
-                         "równoważenie i sterowanie cyrkulacji, przegląd wymienników i automatyki, eliminacja przegrzewów.")
-            doc.add_paragraph(ocena)
+        self._submit_doc("Opinia eksperta (DOCX)", ".docx", self._write_opinion_docx, "Nie udało się utworzyć opinii (DOCX).")
 
-            doc.add_heading("7. Metryka i podpis", level=1)
-            self._signature_block_docx(doc)
-
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".docx")
-            path = tmp.name; tmp.close()
-            doc.save(path); open_file_crossplatform(path)
-        except Exception as e:
-            messagebox.showerror("Błąd", f"Nie udało się utworzyć opinii (DOCX).\n{e}")
+    def _write_opinion_docx(self, job, path, L, P):
+        self._write_opinion(job, path, L, "docx")
 
     def _gen_opinion_pdf(self):
         if not PDF_AVAILABLE:
             messagebox.showwarning("Brak modułu", "Zainstaluj: py -m pip install reportlab")
             return
-        try:
-            if not hasattr(self, "_last"): self._calc_all()
-            L = self._last
-
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-            path = tmp.name; tmp.close()
-
-            c = pdf_canvas.Canvas(path, pagesize=A4)
-            w, h = A4
-            x, y = 20*mm, h - 20*mm
-            lh = 6*mm
-
-            def writeln(text, bold=False, size=10):
-                nonlocal y
-                c.setFont("Times-Bold" if bold else "Times-Roman", size)
-                c.drawString(x, y, text)
-                y -= lh
-
-            lp = logo_path_or_none()
-            if lp:
-                try: c.drawImage(lp, w-40*mm, h-30*mm, width=20*mm, height=20*mm, preserveAspectRatio=True, mask='auto')
-                except Exception: pass
-
-            writeln("© 2025 PROF INSTAL Maciej Ślusarczyk - Wszelkie prawa zastrzeżone", size=8)
-            y -= 2*mm
-
-            writeln(f"{EXPERT['company']} — {EXPERT['city']}", bold=True, size=12)
-            writeln(f"{EXPERT['name']} | {EXPERT['title']}", size=9)
-            writeln(f"{EXPERT['lic']} | {EXPERT['chamber']}", size=9)
-            writeln(EXPERT["contact"], size=9); y -= 4*mm
-
-            writeln("Opinia techniczno-finansowa — CWU (skrót)", bold=True); y -= 2*mm
-            writeln("Wzory autorskie PROF INSTAL © 2025 Maciej Ślusarczyk:", bold=True, size=9)
-            writeln("Q = m·c·ΔT;  Q[GJ/m³]=(1000·4,19·ΔT)/1e6;  koszt_teor = Q·cena_ciepła_brutto;  η = koszt_teor/rachunek")
-            writeln(f"Rachunek: {L['bill']:.2f} zł/m³ | Ciepło brutto: {L['price_GJ_brutto']:.2f} zł/GJ | ΔT: {L['dT']:.0f}°C")
-            writeln(f"Q_teor: {L['q_per_m3']:.5f} GJ/m³ → koszt_teor: {L['cost_theor']:.2f} zł/m³ | η: {L['eta']*100:.1f}%")
-            writeln(f"Strata: {L['loss_per_m3']:.2f} zł/m³ | Budynek: {L['loss_build_m']:,.2f} zł/m-c; {L['loss_build_y']:,.2f} zł/rok"); y -= 2*mm
-            writeln("Scenariusze modernizacji:", bold=True)
-            writeln(f"70% → koszt {L['cost70']:.2f} zł/m³ | oszcz. {L['save70_m3']:.2f} zł/m³")
-            writeln(f"80% → koszt {L['cost80']:.2f} zł/m³ | oszcz. {L['save80_m3']:.2f} zł/m³")
-            y -= 2*mm
-            writeln("Oprogramowanie: PROF INSTAL - Dla Mieszkańców © 2025 Maciej Ślusarczyk", size=8)
-
-            c.showPage(); c.save(); open_file_crossplatform(path)
-        except Exception as e:
-            messagebox.showerror("Błąd", f"Nie udało się utworzyć opinii (PDF).\n{e}")
+        self._submit_doc("Opinia eksperta (PDF)", ".pdf", self._write_opinion_pdf, "Nie udało się utworzyć opinii (PDF).")
+
+    def _write_opinion_pdf(self, job, path, L, P):
+        self._write_opinion(job, path, L, "pdf")
+
+    def _write_opinion(self, job, path, L, kind):
+        """Treść opinii z docmodel.build_opinion — ta sama co w eksportach aplikacji webowej."""
+        import docmodel
+        job.step(0.2, "treść dokumentu")
+        doc = docmodel.build_opinion(L, logo=logo_bytes(kind))
+        job.step(0.4, "zapis pliku")
+        with open(path, "wb") as fp:
+            docmodel.WRITERS[kind](doc, fp)
 
     # ===== Porady =====
     def _show_tips(self):
@@ -928,5 +887,33 @@ class App(tk.Tk):
         right = ttk.Frame(footer, style="Bg.TFrame"); right.grid(row=0, column=2, sticky="e")
         ttk.Label(right, text="prof.instal@example.com", style="Info.TLabel", font=(FONT_FAMILY, 8)).pack(side="right")
 
-if __name__ == "__main__":
+# ===== raport czasu startu =====
+_on_first_paint = []  # funkcje wywoływane po pierwszym odrysowaniu okna (argument: App)
+
+def startup_report() -> dict:
+    """Czasy startu [s]: importy modułu, budowa widżetów, pierwsze odrysowanie (od startu modułu)."""
+    return {"fast_start": FAST_START, **{k: (round(v, 4) if isinstance(v, float) else v) for k, v in STARTUP.items()}}
+
+def main(argv=None):
+    import argparse, json
+    ap = argparse.ArgumentParser(description="PROF INSTAL — Dla Mieszkańców")
+    ap.add_argument("--startup-report", nargs="?", const="-", metavar="PLIK",
+                    help="czasy startu (JSON) po pierwszym odrysowaniu: na stdout albo do pliku (build okienkowy nie ma konsoli)")
+    ap.add_argument("--exit-after-paint", action="store_true", help="zamknij okno po pierwszym odrysowaniu (pomiar)")
+    args, _ = ap.parse_known_args(argv)  # np. adres profinstal://… przekazany przez instalator
+    if args.startup_report or args.exit_after_paint:
+        def report(app):
+            if args.startup_report == "-":
+                print(json.dumps(startup_report(), ensure_ascii=False), flush=True)
+            elif args.startup_report:
+                with open(args.startup_report, "w", encoding="utf-8") as f:
+                    json.dump(startup_report(), f, ensure_ascii=False)
+            if args.exit_after_paint:
+                app.after(0, app._on_close)
+        _on_first_paint.append(report)
     App().mainloop()
+
+STARTUP["imports"] = time.perf_counter() - _T_START
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,9 @@
-from flask import Flask, render_template_string, request, jsonify
+import gzip
+import hashlib
+import os
+
+from flask import Flask, Response, render_template, request, jsonify
+from jinja2 import DictLoader, FileSystemBytecodeCache
 
 app = Flask(__name__)
 
@@ -141,18 +146,37 @@ koszt_teor [zł/m³] = Q · cena_ciepła_brutto [zł/GJ]
 </body></html>
 """
 
+# PAGE jako nazwany szablon: kompilowany raz (pamięć szablonów Jinja), bajtkod na dysku
+app.jinja_env.loader = DictLoader({"page.html": PAGE})
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(os.environ.get("PROFINSTAL_JINJA_CACHE") or None)
+
+DEFAULTS = dict(bill="49.00", heat_price="73.69", unit="GJ", vat="23", dT="45", month_m3="7.42", units="65")
+_DEFAULT_PAGES = {}  # script_root → (html, html.gz, etag) — GET z wartościami domyślnymi
+
+def _default_page():
+    page = _DEFAULT_PAGES.get(request.script_root)
+    if page is None:
+        body = render_template("page.html", expert=EXPERT, r=None, f=DEFAULTS).encode("utf-8")
+        page = _DEFAULT_PAGES.setdefault(request.script_root, (body, gzip.compress(body, 9, mtime=0), hashlib.sha256(body).hexdigest()[:32]))
+    body, gz, etag = page
+    use_gzip = request.accept_encodings["gzip"] > 0
+    rv = Response(gz if use_gzip else body, mimetype="text/html")
+    if use_gzip:
+        rv.headers["Content-Encoding"] = "gzip"
+    rv.vary.add("Accept-Encoding")
+    rv.set_etag(etag + ("-gz" if use_gzip else ""))
+    return rv.make_conditional(request)
+
 @app.route("/", methods=["GET","POST"])
 def index():
-    defaults = dict(bill="49.00", heat_price="73.69", unit="GJ", vat="23", dT="45", month_m3="7.42", units="65")
-    result = None
-    form_vals = defaults.copy()
-    if request.method == "POST":
-        form_vals = {k: request.form.get(k, defaults[k]) for k in defaults.keys()}
-        try:
-            result = compute(form_vals)
-        except Exception as e:
-            result = None
-    return render_template_string(PAGE, expert=EXPERT, r=result, f=form_vals)
+    if request.method != "POST":
+        return _default_page()
+    form_vals = {k: request.form.get(k, DEFAULTS[k]) for k in DEFAULTS.keys()}
+    try:
+        result = compute(form_vals)
+    except Exception as e:
+        result = None
+    return render_template("page.html", expert=EXPERT, r=result, f=form_vals)
 
 @app.post("/api/calc")
 def api_calc():
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — kontrola przyjmowania żądań (limity współbieżności, kolejki)
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Trasy dzielą się na dwie bramki: lekkie (strona główna, /calc) i ciężkie
+(eksporty, audyt, obliczenia wsadowe). Każda ma własny limit jednocześnie
+obsługiwanych żądań i ograniczoną kolejkę oczekujących, więc seria eksportów
+nie zajmie wszystkich wątków i nie spowolni /calc. Przy pełnej kolejce
+(albo po przekroczeniu czasu oczekiwania) odpowiedź to 503, a gdy jeden klient
+ma już za dużo ciężkich żądań — 429; obie z Retry-After szacowanym
+z bieżącego czasu obsługi. Limity działają w obrębie procesu (workera).
+
+Klient to request.remote_addr. Za serwerem proxy byłby to adres proxy (limit
+na klienta stałby się globalny), więc PROFINSTAL_PROXY_HOPS = liczba zaufanych
+proxy włącza ProxyFix (adres z X-Forwarded-For). Bez tej opcji żądanie
+z X-Forwarded-For nie podlega limitowi na klienta — nie wiadomo, kto je wysłał.
+"""
+import functools
+import math
+import os
+import threading
+import time
+
+from flask import jsonify, make_response, request
+
+
+class Rejected(Exception):
+    """Żądanie odrzucone przez bramkę: status HTTP (429 / 503) i sugerowany Retry-After [s]."""
+
+    def __init__(self, status: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class Gate:
+    """
+    Semafor z ograniczoną kolejką oczekujących (Condition), limitem na klienta
+    i licznikami. Czas obsługi uśredniany wykładniczo (EWMA) do Retry-After.
+    """
+
+    def __init__(self, name: str, limit: int, queue: int, timeout: float, per_client: int = 0):
+        self.name = name
+        self.limit = max(1, int(limit))
+        self.queue = max(0, int(queue))
+        self.timeout = float(timeout)
+        self.per_client = int(per_client)  # 0 = bez limitu na klienta
+        self._cond = threading.Condition()
+        self._clients = {}
+        self.active = self.waiting = self.peak_waiting = 0
+        self.admitted = self.rejected_full = self.rejected_timeout = self.rejected_client = 0
+        self.service_s = 0.0  # EWMA czasu obsługi
+
+    def retry_after(self) -> int:
+        """Szacowany czas do zwolnienia miejsca: (oczekujący + 1) / limit × średni czas obsługi."""
+        return max(1, math.ceil((self.waiting + 1) / self.limit * max(self.service_s, 0.5)))
+
+    def acquire(self, client: str | None = None) -> float:
+        """Zajmuje miejsce (czekając w kolejce); zwraca czas startu. Przy odmowie zgłasza Rejected."""
+        with self._cond:
+            if self.per_client and client is not None and self._clients.get(client, 0) >= self.per_client:
+                self.rejected_client += 1
+                raise Rejected(429, self.retry_after(), "Za dużo równoczesnych żądań z tego adresu")
+            if self.active >= self.limit:
+                if self.waiting >= self.queue:
+                    self.rejected_full += 1
+                    raise Rejected(503, self.retry_after(), "Serwer zajęty — kolejka pełna")
+                self.waiting += 1
+                self.peak_waiting = max(self.peak_waiting, self.waiting)
+                self._inc(client, 1)
+                try:
+                    if not self._cond.wait_for(lambda: self.active < self.limit, self.timeout):
+                        self.rejected_timeout += 1
+                        self._inc(client, -1)
+                        raise Rejected(503, self.retry_after(), "Serwer zajęty — przekroczony czas oczekiwania")
+                finally:
+                    self.waiting -= 1
+            else:
+                self._inc(client, 1)
+            self.active += 1
+            self.admitted += 1
+        return time.monotonic()
+
+    def release(self, client: str | None, started: float):
+        with self._cond:
+            self.active -= 1
+            self._inc(client, -1)
+            self.service_s += 0.2 * ((time.monotonic() - started) - self.service_s)
+            self._cond.notify()
+
+    def _inc(self, client, delta: int):
+        if not self.per_client or client is None:
+            return
+        n = self._clients.get(client, 0) + delta
+        if n > 0:
+            self._clients[client] = n
+        else:
+            self._clients.pop(client, None)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"limit": self.limit, "queue": self.queue, "per_client": self.per_client,
+                    "active": self.active, "waiting": self.waiting, "peak_waiting": self.peak_waiting,
+                    "admitted": self.admitted, "rejected_full": self.rejected_full,
+                    "rejected_timeout": self.rejected_timeout, "rejected_client": self.rejected_client,
+                    "service_s": round(self.service_s, 3)}
+
+
+def _env(name: str, default: str) -> str:
+    return os.environ.get(f"PROFINSTAL_{name}", default)
+
+
+# Oczekujący też zajmuje wątek workera, więc ciężka bramka domyślnie ma limit
+# i kolejkę po ćwierć wątków — razem połowę (PROFINSTAL_THREADS jak w gunicorn.conf.py).
+THREADS = int(_env("THREADS", "8"))
+PROXY_HOPS = int(_env("PROXY_HOPS", "0"))
+GATES = {
+    "cheap": Gate("cheap", int(_env("CHEAP_LIMIT", str(THREADS))), int(_env("CHEAP_QUEUE", str(4 * THREADS))),
+                  float(_env("CHEAP_TIMEOUT", "5"))),
+    "heavy": Gate("heavy", int(_env("HEAVY_LIMIT", str(max(1, THREADS // 4)))),
+                  int(_env("HEAVY_QUEUE", str(max(1, THREADS // 4)))),
+                  float(_env("HEAVY_TIMEOUT", "30")), per_client=int(_env("HEAVY_PER_CLIENT", "2"))),
+}
+
+
+def trust_proxy(app, hops: int = PROXY_HOPS):
+    """Za `hops` zaufanymi proxy remote_addr (i schemat) brane z nagłówków X-Forwarded-*."""
+    if hops > 0:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+    return app
+
+
+def client_id() -> str | None:
+    """Adres klienta do limitu na klienta; None, gdy to tylko adres nieskonfigurowanego proxy."""
+    if not PROXY_HOPS and "X-Forwarded-For" in request.headers:
+        return None
+    return request.remote_addr
+
+
+def admit(gate_name: str, methods: tuple | None = None):
+    """
+    Dekorator trasy: obsługa tylko po przejściu bramki `gate_name` (dla metod `methods`, domyślnie wszystkich).
+    Miejsce zwalniane jest po zwróceniu odpowiedzi, a dla odpowiedzi strumieniowej
+    (generator: ZIP pism, NDJSON) dopiero po jej wysłaniu (call_on_close).
+    """
+    gate = GATES[gate_name]
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if methods is not None and request.method not in methods:
+                return view(*args, **kwargs)
+            client = client_id()
+            try:
+                started = gate.acquire(client)
+            except Rejected as e:
+                rv = jsonify(error=e.reason, retry_after=e.retry_after)
+                rv.status_code = e.status
+                rv.headers["Retry-After"] = str(e.retry_after)
+                return rv
+            try:
+                rv = make_response(view(*args, **kwargs))
+            except BaseException:
+                gate.release(client, started)
+                raise
+            if rv.is_streamed and not rv.direct_passthrough:
+                rv.call_on_close(lambda: gate.release(client, started))  # generator liczy w trakcie wysyłania
+            else:
+                gate.release(client, started)  # gotowe bajty / plik (send_file nie wywołuje call_on_close)
+            return rv
+        return wrapper
+    return decorator
+
+
+def admission_stats() -> dict:
+    return {name: gate.stats() for name, gate in GATES.items()}
@@ -1,12 +1,33 @@
 
 # -*- coding: utf-8 -*-
-from flask import Flask, render_template, request, redirect, url_for, send_file, flash
+from flask import Flask, render_template, request, redirect, url_for, send_file, flash, Response, stream_with_context, jsonify
 from datetime import date
-import io
-from calc import compute_all, compute_audit
+import os
+import shutil
+import tempfile
+from cache import cached_compute_all, cached_compute_audit, cache_stats
+from batch_io import detect_format, open_text_stream, iter_input_rows, iter_ndjson, gzip_stream, STREAM_ERRORS
+from calc_np import scenario_grid, scenario_grid_compact, efficiency_axis, efficiency_axis_size
+from uncertainty import monte_carlo
+from exports import WRITERS, MIMETYPES, DOWNLOAD_NAMES, DOCX_MISSING, PDF_MISSING
+from jobs import EXPORT_JOBS
+from downloads import spool, send_spooled, download_stats
+from doccache import DOC_CACHE, document_key
+import docmodel
+from charts import audit_charts, chart_svg, chart_stats
+from letters import letter_tasks, iter_letters_zip, combined_letters_pdf, ADDRESSEE_KEYS
+from network import compute_network_audit, segment_table, apply_overrides, GROUP_FIELDS
+from topology import BuildingNetwork, NETWORKS
+from pagecache import PAGE_CACHE, init_templates
+from admission import admit, admission_stats, trust_proxy
+from results import RESULTS, DEFAULT_SECRET_KEY, issue_token, result_from_token
 
 app = Flask(__name__)
-app.secret_key = "change-me"
+app.secret_key = os.environ.get("PROFINSTAL_SECRET_KEY") or DEFAULT_SECRET_KEY  # domyślny → bez tokenów wyniku
+trust_proxy(app)  # PROFINSTAL_PROXY_HOPS: prawdziwy adres klienta za nginx/Apache (admission.py)
+# Za nginx/Apache: plik z dysku wysyła serwer proxy (X-Sendfile / X-Accel-Redirect przez konfigurację proxy)
+app.config["USE_X_SENDFILE"] = os.environ.get("PROFINSTAL_X_SENDFILE") == "1"
+init_templates(app)
 
 DEFAULTS = {
     "bill": 49.00,
@@ -43,6 +64,12 @@ AUDIT_DEFAULTS_NEW = {
     'czas_pracy': 2000
 }
 
+# Monte Carlo: limit próbek na jedno żądanie i liczba procesów dla dużych N
+MC_MAX_SAMPLES = 2_000_000
+MC_WORKERS = 1
+# Siatka scenariuszy: limit komórek (sprawność × cena × ΔT) na jedno żądanie
+SCENARIO_MAX_CELLS = 1_000_000
+
 CITY_PRICES = {
     "Kraków": 73.69,
     "Warszawa": 85.00,
@@ -51,42 +78,208 @@ CITY_PRICES = {
 }
 
 @app.route("/", methods=["GET"])
+@admit("cheap")
 def index():
-    return render_template("index.html", defaults=DEFAULTS, city_prices=CITY_PRICES, audit_defaults_old=AUDIT_DEFAULTS_OLD, audit_defaults_new=AUDIT_DEFAULTS_NEW)
+    # same stałe → HTML renderowany raz (pagecache.py)
+    return PAGE_CACHE.send("index", lambda: render_template("index.html", defaults=DEFAULTS, city_prices=CITY_PRICES, audit_defaults_old=AUDIT_DEFAULTS_OLD, audit_defaults_new=AUDIT_DEFAULTS_NEW))
+def _audit_inputs() -> tuple:
+    """Parametry starej/nowej instalacji i ceny ciepła z formularza audytu (POST lub query string)."""
+    params_old = {k: float(request.values.get(f"old_{k}", 0)) for k in AUDIT_DEFAULTS_OLD.keys()}
+    params_new = {k: float(request.values.get(f"new_{k}", 0)) for k in AUDIT_DEFAULTS_NEW.keys()}
+    heat_price = float(request.values.get("heat_price", 73.69))
+    unit = request.values.get("unit", "GJ")
+    vat = float(request.values.get("vat", 23.0))
+    return params_old, params_new, heat_price, unit, vat
+
 @app.route("/audit", methods=["GET", "POST"])
+@admit("heavy", methods=("POST",))
 def audit():
     if request.method == "POST":
         try:
-            # Pobierz parametry starej i nowej instalacji z formularza
-            params_old = {k: float(request.form.get(f"old_{k}", 0)) for k in AUDIT_DEFAULTS_OLD.keys()}
-            params_new = {k: float(request.form.get(f"new_{k}", 0)) for k in AUDIT_DEFAULTS_NEW.keys()}
-            
-            # Pobierz parametry ceny ciepła (opcjonalne, z domyślnymi wartościami)
-            heat_price = float(request.form.get("heat_price", 73.69))
-            unit = request.form.get("unit", "GJ")
-            vat = float(request.form.get("vat", 23.0))
-            
-            res = compute_audit(params_old, params_new, heat_price, unit, vat)
-            
-            # Przygotuj dane do wykresów
-            chart_labels = ["Stara instalacja", "Nowa instalacja"]
-            heat_losses = [res["Q_loss_old"], res["Q_loss_new"]]
-            costs = [res["cost_old"], res["cost_new"]]
+            params_old, params_new, heat_price, unit, vat = _audit_inputs()
+            res = cached_compute_audit(params_old, params_new, heat_price, unit, vat)
             
+            # Wykresy SVG z serwera (te same co w eksportach, z pamięci podręcznej charts.py)
             return render_template("audit_result.html", 
                                  res=res, 
                                  params_old=params_old, 
                                  params_new=params_new, 
+                                 heat_price=heat_price, unit=unit, vat=vat,
                                  today=date.today().isoformat(),
-                                 chart_labels=chart_labels,
-                                 heat_losses=heat_losses,
-                                 costs=costs)
+                                 charts=[chart_svg(c) for c in audit_charts(res)])
         except Exception as e:
             flash(f"Błąd danych: {e}")
             return redirect(url_for("audit"))
-    return render_template("audit.html", audit_defaults_old=AUDIT_DEFAULTS_OLD, audit_defaults_new=AUDIT_DEFAULTS_NEW)
+    return PAGE_CACHE.send("audit", lambda: render_template("audit.html", audit_defaults_old=AUDIT_DEFAULTS_OLD, audit_defaults_new=AUDIT_DEFAULTS_NEW))
+
+# Raport audytu z wykresami: DOCX / PDF / HTML albo wszystkie w ZIP
+@app.route("/export/audit", methods=["GET", "POST"])
+@admit("heavy")
+def export_audit():
+    kind = (request.values.get("format") or "pdf").lower()
+    if kind not in docmodel.WRITERS:
+        return jsonify(error=f"Nieznany format: {kind}"), 400
+    try:
+        params_old, params_new, heat_price, unit, vat = _audit_inputs()
+        res = cached_compute_audit(params_old, params_new, heat_price, unit, vat)
+    except (TypeError, ValueError, ZeroDivisionError) as e:
+        return jsonify(error=f"Błąd danych: {e}"), 400
+    today = date.today().isoformat()
+    inputs = {"old": params_old, "new": params_new, "heat_price": heat_price, "unit": unit, "vat": vat}
+    doc = lambda: docmodel.build_audit_report(res, params_old, params_new, today)
+    if kind == "zip":
+        write = lambda fp: docmodel.write_all_zip(doc(), fp, "PROF_INSTAL_audyt")
+    else:
+        write = lambda fp: docmodel.WRITERS[kind](doc(), fp)
+    try:
+        return _send_document(kind, "audit", inputs, write, f"PROF_INSTAL_audyt.{kind}", docmodel.MIMETYPES[kind])
+    except ImportError:
+        return (DOCX_MISSING if kind == "docx" else PDF_MISSING), 500
+
+@app.route("/api/audit/network", methods=["POST"])
+@admit("heavy")
+def api_audit_network():
+    """
+    Audyt całej sieci przewodów. JSON: {"segments_old": [...], "segments_new": [...],
+    "heat_price", "unit", "vat", "group_by" (kolumna lub lista z GROUP_FIELDS)}. Brakujące kolumny odcinków są
+    uzupełniane z AUDIT_DEFAULTS_OLD / AUDIT_DEFAULTS_NEW; bez "segments_new"
+    nowy wariant to stare odcinki z parametrami izolacji z AUDIT_DEFAULTS_NEW.
+    """
+    data = request.get_json(force=True)
+    try:
+        old = segment_table(data["segments_old"], AUDIT_DEFAULTS_OLD)
+        if data.get("segments_new"):
+            new = segment_table(data["segments_new"], AUDIT_DEFAULTS_NEW)
+        else:
+            new = apply_overrides(old, ins_thick=AUDIT_DEFAULTS_NEW["ins_thick"], **{"lambda": AUDIT_DEFAULTS_NEW["lambda"]})
+        res = compute_network_audit(old, new,
+                                    heat_price=float(data.get("heat_price", 73.69)),
+                                    unit=data.get("unit", "GJ"),
+                                    vat=float(data.get("vat", 23.0)),
+                                    group_by=data.get("group_by") or GROUP_FIELDS)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify(error=f"Błąd danych: {e}"), 400
+    res["segments"] = {k: v.tolist() for k, v in res["segments"].items()}
+    return jsonify(res)
+
+# Sieć budynku edytowana odcinek po odcinku (topology.py): po zmianie przeliczany jest
+# tylko ten odcinek i sumy jego przodków
+@app.route("/api/network", methods=["POST"])
+@admit("heavy")
+def api_network_create():
+    """
+    JSON: {"segments": [{"id", "parent", "kind", "old": {...}, "new": {...}} lub parametry płasko], "heat_price", "unit", "vat"};
+    rodzic przed dziećmi, brakujące parametry z AUDIT_DEFAULTS_OLD / AUDIT_DEFAULTS_NEW.
+    Zwraca network_id do kolejnych zmian i podsumowanie budynku.
+    """
+    data = request.get_json(force=True)
+    try:
+        net = BuildingNetwork.from_segments(data["segments"], heat_price=float(data.get("heat_price", 73.69)),
+                                            unit=data.get("unit", "GJ"), vat=float(data.get("vat", 23.0)),
+                                            defaults_old=AUDIT_DEFAULTS_OLD, defaults_new=AUDIT_DEFAULTS_NEW)
+    except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+        return jsonify(error=f"Błąd danych: {e}"), 400
+    network_id = NETWORKS.put(net)
+    return jsonify(network_id=network_id, segments=len(net.nodes), summary=net.summary(),
+                   url=url_for("api_network", network_id=network_id)), 201
+
+@app.route("/api/network/<network_id>", methods=["GET", "PATCH"])
+@admit("cheap")
+def api_network(network_id):
+    """
+    GET (?node=id): podsumowanie budynku lub poddrzewa. PATCH {"id", "old": {...}, "new": {...}}:
+    zmiana parametrów jednego odcinka (tylko podane klucze); zwraca podsumowanie budynku,
+    odcinka i jego przodków.
+    """
+    entry = NETWORKS.get(network_id)
+    if entry is None:
+        return jsonify(error="Sieć wygasła — wyślij ją ponownie (POST /api/network)"), 404
+    net, lock = entry
+    if request.method == "GET":
+        node_id = request.args.get("node")
+        with lock:
+            if node_id is not None and node_id not in net.nodes:
+                return jsonify(error=f"Nieznany węzeł '{node_id}'"), 404
+            return jsonify(network_id=network_id, summary=net.summary(node_id))
+    data = request.get_json(force=True)
+    node_id = data.get("id")
+    with lock:
+        if node_id not in net.nodes:
+            return jsonify(error=f"Nieznany węzeł {node_id!r}"), 404
+        try:
+            net.update(node_id, old=data.get("old"), new=data.get("new"))
+        except (TypeError, ValueError, ZeroDivisionError) as e:
+            return jsonify(error=f"Błąd danych: {e}"), 400
+        return jsonify(network_id=network_id, summary=net.summary(), node=net.summary(node_id),
+                       ancestors={a: net.summary(a) for a in net.ancestors(node_id)})
+
+def _float_list(v, default):
+    if v is None or v == "":
+        return default
+    if isinstance(v, (list, tuple)):
+        return [float(x) for x in v]
+    return [float(x.replace(",", ".")) for x in str(v).split(";") if x.strip()]
+
+@app.route("/api/scenarios", methods=["GET", "POST"])
+@admit("heavy")
+def api_scenarios():
+    """
+    Siatka scenariuszy: sprawność (eff_min..eff_max co eff_step) × cena ciepła × ΔT.
+    Parametry z query string lub JSON; listy cen i ΔT rozdzielane średnikiem
+    (np. heat_price=65,50;73,69;85). Domyślnie ceny wszystkich miast z CITY_PRICES.
+    """
+    data = request.get_json(silent=True) or request.values
+    if not hasattr(data, "get"):
+        return jsonify(error="Błąd danych: treść JSON musi być obiektem"), 400
+    try:
+        num = lambda k, default: float(str(data.get(k, default)).replace(",", "."))
+        f = lambda k: num(k, DEFAULTS[k])
+        eff = (num("eff_min", 0.40), num("eff_max", 1.00), num("eff_step", 0.01))
+        heat_price = _float_list(data.get("heat_price"), list(CITY_PRICES.values()))
+        dT = _float_list(data.get("dT"), [DEFAULTS["dT"]])
+        cells = efficiency_axis_size(*eff) * len(heat_price) * len(dT)
+        if not 0 < cells <= SCENARIO_MAX_CELLS:
+            raise ValueError(f"siatka ma {cells} scenariuszy (dozwolone 1..{SCENARIO_MAX_CELLS})")
+        grid = scenario_grid(
+            f("bill"), f("month_m3"), int(data.get("units", DEFAULTS["units"])),
+            eff=efficiency_axis(*eff), heat_price=heat_price, dT=dT,
+            unit=data.get("unit", DEFAULTS["unit"]), vat=f("vat"),
+        )
+    except (TypeError, ValueError, OverflowError) as e:
+        return jsonify(error=f"Błąd danych: {e}"), 400
+    return jsonify(scenario_grid_compact(grid))
+
+@app.route("/api/calc/uncertainty", methods=["POST"])
+@admit("heavy")
+def api_calc_uncertainty():
+    """
+    Pasma niepewności (Monte Carlo). JSON: {"inputs": {pole: stała lub rozkład},
+    "n": 100000, "seed": 0, "percentiles": [5, 50, 95]}; brakujące pola z DEFAULTS.
+    """
+    data = request.get_json(force=True)
+    if not hasattr(data, "get"):
+        return jsonify(error="Błąd danych: treść JSON musi być obiektem"), 400
+    try:
+        inputs = {k: DEFAULTS[k] for k in ("bill", "heat_price", "unit", "vat", "month_m3", "units", "dT")}
+        inputs.update(data.get("inputs") or {})
+        n = int(data.get("n", 100_000))
+        if n > MC_MAX_SAMPLES:
+            raise ValueError(f"n > {MC_MAX_SAMPLES}")
+        kwargs = {"percentiles": tuple(data["percentiles"])} if data.get("percentiles") else {}
+        res = monte_carlo(inputs, n=n, seed=int(data.get("seed", 0)), workers=MC_WORKERS, **kwargs)
+    except (KeyError, TypeError, ValueError, OverflowError) as e:
+        return jsonify(error=f"Błąd danych: {e}"), 400
+    return jsonify(res)
+
+@app.route("/api/stats", methods=["GET"])
+def api_stats():
+    """Liczniki w locie: pamięć podręczna obliczeń, wyników, dokumentów, wykresów, stron i sieci, kolejka eksportu, bramki żądań."""
+    return jsonify(cache=cache_stats(), export_jobs=EXPORT_JOBS.stats(), downloads=download_stats(),
+                   documents=DOC_CACHE.stats(), charts=chart_stats(), pages=PAGE_CACHE.stats(),
+                   admission=admission_stats(), results=RESULTS.stats(), networks=NETWORKS.stats())
 
 @app.route("/calc", methods=["POST"])
+@admit("cheap")
 def calc():
     try:
         bill = float(request.form.get("bill").replace(",", "."))
@@ -97,81 +290,229 @@ def calc():
         month_m3 = float(request.form.get("month_m3").replace(",", "."))
         dT = float(request.form.get("dT").replace(",", "."))
         units = int(request.form.get("units"))
-        res = compute_all(bill, heat_price, unit, vat, month_m3, units, dT)
-        return render_template("result.html", res=res, today=date.today().isoformat())
+        res = cached_compute_all(bill, heat_price, unit, vat, month_m3, units, dT)
+        return render_template("result.html", res=res, today=date.today().isoformat(), result_token=issue_token(res))
     except Exception as e:
         flash(f"Błąd danych: {e}")
         return redirect(url_for("index"))
 
-# Optional: DOCX/PDF generation stubs (can be expanded later)
-@app.route("/export/docx", methods=["POST"])
+@app.route("/api/calc/batch", methods=["POST"])
+@admit("heavy")
+def api_calc_batch():
+    """
+    Wsadowe obliczenia dla wielu budynków: CSV lub NDJSON w treści żądania,
+    wynik strumieniowany jako NDJSON (jedna linia na wiersz wejścia).
+    ?format=csv|ndjson wymusza format wejścia, ?gzip=1 (lub Accept-Encoding: gzip)
+    włącza kompresję odpowiedzi; wejście może mieć Content-Encoding: gzip.
+    """
+    fmt = detect_format(request.content_type, request.args.get("format"))
+    text = open_text_stream(request.stream, request.headers.get("Content-Encoding"))
+    chunks = iter_ndjson(iter_input_rows(text, fmt))
+
+    use_gzip = request.args.get("gzip") == "1" or "gzip" in request.headers.get("Accept-Encoding", "")
+    headers = {"X-Accel-Buffering": "no"}
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_stream(chunks)
+    else:
+        body = (c.encode("utf-8") for c in chunks)
+    return Response(stream_with_context(body), mimetype="application/x-ndjson", headers=headers)
+
+class ResultExpired(Exception):
+    """Token wyniku nieważny (wygasły, wyparty, zły podpis), a formularz nie ma pól do przeliczenia."""
+
+@app.errorhandler(ResultExpired)
+def result_expired(e):
+    return jsonify(error="Wynik wygasł — przelicz ponownie"), 410
+
+def _form_result() -> dict:
+    """
+    Wynik do eksportu: z tokenu result_token wystawionego przez /calc (bez ponownego liczenia),
+    a gdy go brak lub wygasł — z pól formularza (jak w /calc; POST lub query string).
+    Nieważny token bez pól formularza → ResultExpired (410).
+    """
+    token = request.values.get("result_token")
+    if token:
+        res = result_from_token(token)
+        if res is not None:
+            return res
+        if request.values.get("bill") is None:
+            raise ResultExpired()
+    bill = float(request.values.get("bill").replace(",", "."))
+    heat_price = float(request.values.get("heat_price").replace(",", "."))
+    unit = request.values.get("unit") or "GJ"
+    vat = float(request.values.get("vat").replace(",", "."))
+    month_m3 = float(request.values.get("month_m3").replace(",", "."))
+    dT = float(request.values.get("dT").replace(",", "."))
+    units = int(request.values.get("units"))
+    return cached_compute_all(bill, heat_price, unit, vat, month_m3, units, dT)
+
+# Eksport synchroniczny (dokument generowany w wątku żądania, duże pliki buforowane na dysku).
+# GET z parametrami w query string pozwala na Range / wznawianie pobierania.
+def _send_document(kind: str, doc: str, res: dict, write, download_name: str, mimetype: str):
+    """Dokument z pamięci podręcznej na dysku (albo wygenerowany przez write(fp) i tam zapisany)."""
+    if DOC_CACHE.enabled:
+        key = document_key(kind, doc, res, today=date.today().isoformat())
+        path, _ = DOC_CACHE.get_or_render(key, kind, write)
+        try:
+            return send_file(path, as_attachment=True, conditional=True, etag=key,
+                             download_name=download_name, mimetype=mimetype)
+        except FileNotFoundError:  # wyparty przez inny proces w międzyczasie
+            pass
+    return send_spooled(spool(write), download_name, mimetype)
+
+def _send_export(kind: str, res: dict):
+    today = date.today().isoformat()
+    return _send_document(kind, "result", res, lambda fp: WRITERS[kind](res, fp, today),
+                          DOWNLOAD_NAMES[kind], MIMETYPES[kind])
+
+@app.route("/export/docx", methods=["GET", "POST"])
+@admit("heavy")
 def export_docx():
     try:
-        from docx import Document
-        from docx.shared import Pt
-    except Exception:
-        return "Brak modułu python-docx. Zainstaluj: pip install python-docx", 500
-
-    # parse inputs (quick reuse of calc)
-    bill = float(request.form.get("bill").replace(",", "."))
-    city = request.form.get("city") or "Kraków"
-    heat_price = float(request.form.get("heat_price").replace(",", "."))
-    unit = request.form.get("unit") or "GJ"
-    vat = float(request.form.get("vat").replace(",", "."))
-    month_m3 = float(request.form.get("month_m3").replace(",", "."))
-    dT = float(request.form.get("dT").replace(",", "."))
-    units = int(request.form.get("units"))
-    res = compute_all(bill, heat_price, unit, vat, month_m3, units, dT)
-
-    doc = Document()
-    p = doc.add_paragraph()
-    r = p.add_run("PROF INSTAL — wynik obliczeń (skrót)\n")
-    r.bold = True
-    doc.add_paragraph(f"Data: {date.today().isoformat()}")
-    doc.add_paragraph(f"Rachunek: {res['bill']:.2f} zł/m³; Cena ciepła brutto: {res['price_GJ_brutto']:.2f} zł/GJ; ΔT: {res['dT']:.0f}°C")
-    doc.add_paragraph(f"Q_teor: {res['q_per_m3']:.5f} GJ/m³ → koszt_teor: {res['cost_theor']:.2f} zł/m³; η: {res['eta']*100:.1f}%")
-    doc.add_paragraph(f"Strata: {res['loss_per_m3']:.2f} zł/m³; Budynek: {res['loss_build_m']:,.2f} zł/m-c; {res['loss_build_y']:,.2f} zł/rok")
-    bio = io.BytesIO()
-    doc.save(bio)
-    bio.seek(0)
-    return send_file(bio, as_attachment=True, download_name="PROF_INSTAL_wynik.docx")
-
-@app.route("/export/pdf", methods=["POST"])
+        res = _form_result()
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify(error=f"Błąd danych: {e}"), 400
+    try:
+        return _send_export("docx", res)
+    except ImportError:
+        return DOCX_MISSING, 500
+
+@app.route("/export/pdf", methods=["GET", "POST"])
+@admit("heavy")
 def export_pdf():
     try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.units import mm
-    except Exception:
-        return "Brak modułu reportlab. Zainstaluj: pip install reportlab", 500
-
-    bill = float(request.form.get("bill").replace(",", "."))
-    heat_price = float(request.form.get("heat_price").replace(",", "."))
-    unit = request.form.get("unit") or "GJ"
-    vat = float(request.form.get("vat").replace(",", "."))
-    month_m3 = float(request.form.get("month_m3").replace(",", "."))
-    dT = float(request.form.get("dT").replace(",", "."))
-    units = int(request.form.get("units"))
-    res = compute_all(bill, heat_price, unit, vat, month_m3, units, dT)
-
-    bio = io.BytesIO()
-    c = canvas.Canvas(bio, pagesize=A4)
-    w, h = A4
-    x, y = 20*mm, h - 20*mm
-    lh = 6*mm
-    def writeln(text, bold=False, size=10):
-        nonlocal y
-        c.setFont("Times-Bold" if bold else "Times-Roman", size)
-        c.drawString(x, y, text); y -= lh
-
-    writeln("PROF INSTAL — wynik obliczeń (skrót)", bold=True)
-    writeln(f"Data: {date.today().isoformat()}")
-    writeln(f"Rachunek: {res['bill']:.2f} zł/m³ | Ciepło brutto: {res['price_GJ_brutto']:.2f} zł/GJ | ΔT: {res['dT']:.0f}°C")
-    writeln(f"Q_teor: {res['q_per_m3']:.5f} GJ/m³ → koszt_teor: {res['cost_theor']:.2f} zł/m³ | η: {res['eta']*100:.1f}%")
-    writeln(f"Strata: {res['loss_per_m3']:.2f} zł/m³ | Budynek: {res['loss_build_m']:,.2f} zł/m-c; {res['loss_build_y']:,.2f} zł/rok")
-    c.showPage(); c.save()
-    bio.seek(0)
-    return send_file(bio, as_attachment=True, download_name="PROF_INSTAL_wynik.pdf", mimetype="application/pdf")
+        res = _form_result()
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify(error=f"Błąd danych: {e}"), 400
+    try:
+        return _send_export("pdf", res)
+    except ImportError:
+        return PDF_MISSING, 500
+
+# Opinia techniczno-finansowa: jedno drzewo dokumentu → DOCX / PDF / HTML albo wszystkie w ZIP
+@app.route("/export/opinion", methods=["GET", "POST"])
+@admit("heavy")
+def export_opinion():
+    kind = (request.values.get("format") or "zip").lower()
+    if kind not in docmodel.WRITERS:
+        return jsonify(error=f"Nieznany format: {kind}"), 400
+    try:
+        res = _form_result()
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify(error=f"Błąd danych: {e}"), 400
+    today = date.today().isoformat()
+    write = lambda fp: docmodel.WRITERS[kind](docmodel.build_opinion(res, today), fp)
+    try:
+        return _send_document(kind, "opinion", res, write, docmodel.DOWNLOAD_NAMES[kind], docmodel.MIMETYPES[kind])
+    except ImportError:
+        return (DOCX_MISSING if kind == "docx" else PDF_MISSING), 500
+
+# Masowe pisma: lista mieszkańców → ZIP z pismem dla każdego mieszkania (strumieniowo)
+def _letter_tasks_from_request():
+    """
+    Parametry budynku (bill, heat_price, unit, vat, dT, units), dane adresata
+    (a_name, a_addr, a_email, a_nip) i lista mieszkańców: plik 'residents'
+    (CSV/NDJSON: name, address, flat_id, month_m3[, email, phone]) albo treść
+    żądania (parametry w query string). Zwraca generator letter_tasks.
+    """
+    building = {k: float(str(request.values.get(k, DEFAULTS[k])).replace(",", "."))
+                for k in ("bill", "heat_price", "vat", "dT")}
+    building["unit"] = request.values.get("unit") or DEFAULTS["unit"]
+    building["units"] = int(request.values.get("units", DEFAULTS["units"]))
+    addressee = {k: request.values[k] for k in ADDRESSEE_KEYS if request.values.get(k)}
+
+    upload = request.files.get("residents")
+    if upload is not None:
+        # pliki z formularza zamykane są po wyjściu z widoku — kopia żyje do końca strumienia
+        buf = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+        shutil.copyfileobj(upload.stream, buf)
+        buf.seek(0)
+        fmt = detect_format(upload.mimetype, "csv" if (upload.filename or "").lower().endswith(".csv") else None)
+        text = open_text_stream(buf)
+    else:
+        fmt = detect_format(request.content_type, request.args.get("residents_format"))
+        text = open_text_stream(request.stream, request.headers.get("Content-Encoding"))
+    return letter_tasks(iter_input_rows(text, fmt), building, addressee)
+
+@app.route("/export/letters.zip", methods=["POST"])
+@admit("heavy")
+def export_letters_zip():
+    """Pisma w formacie 'format' (docx/pdf), po jednym pliku na mieszkanie, w archiwum ZIP."""
+    kind = (request.values.get("format") or "docx").lower()
+    if kind not in WRITERS:
+        return jsonify(error=f"Nieznany format: {kind}"), 400
+    try:
+        tasks = _letter_tasks_from_request()
+    except (TypeError, ValueError) as e:
+        return jsonify(error=f"Błąd danych: {e}"), 400
+    body = iter_letters_zip(tasks, kind, EXPORT_JOBS.executor(), window=2 * EXPORT_JOBS.workers,
+                            today=date.today().isoformat())
+    return Response(stream_with_context(body), mimetype="application/zip",
+                    headers={"Content-Disposition": f"attachment; filename=PROF_INSTAL_pisma_{kind}.zip",
+                             "X-Accel-Buffering": "no"})
+
+# Masowe pisma do druku: jeden PDF, strona na mieszkanie (wspólne czcionki i nagłówek)
+@app.route("/export/letters.pdf", methods=["POST"])
+@admit("heavy")
+def export_letters_pdf():
+    """Te same dane co /export/letters.zip; liczba pominiętych wierszy w nagłówku X-Letters-Skipped."""
+    try:
+        tasks = _letter_tasks_from_request()
+    except (TypeError, ValueError) as e:
+        return jsonify(error=f"Błąd danych: {e}"), 400
+    result = {}
+    def write(fp):
+        result["count"], result["errors"] = combined_letters_pdf(tasks, fp, date.today().isoformat())
+    try:
+        fp = spool(write)
+    except ImportError:
+        return PDF_MISSING, 500
+    except STREAM_ERRORS as e:  # lista czytana przed wysłaniem odpowiedzi — można jeszcze zwrócić błąd
+        return jsonify(error=f"Błąd odczytu listy mieszkańców: {e}"), 400
+    resp = send_spooled(fp, "PROF_INSTAL_pisma.pdf", "application/pdf")
+    resp.headers["X-Letters-Count"] = str(result["count"])
+    resp.headers["X-Letters-Skipped"] = str(len(result["errors"]))
+    return resp
+
+# Eksport w tle: POST zleca zadanie, status i pobranie po identyfikatorze
+@app.route("/export/jobs", methods=["POST"])
+@admit("cheap")
+def export_job_submit():
+    kind = (request.form.get("format") or request.args.get("format") or "pdf").lower()
+    if kind not in WRITERS:
+        return jsonify(error=f"Nieznany format: {kind}"), 400
+    try:
+        res = _form_result()
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify(error=f"Błąd danych: {e}"), 400
+    try:
+        job_id = EXPORT_JOBS.submit(kind, res, date.today().isoformat())
+    except RuntimeError as e:
+        return jsonify(error=str(e)), 503
+    return jsonify(job_id=job_id, status="queued",
+                   status_url=url_for("export_job_status", job_id=job_id),
+                   download_url=url_for("export_job_download", job_id=job_id)), 202
+
+@app.route("/export/jobs/<job_id>", methods=["GET"])
+def export_job_status(job_id):
+    st = EXPORT_JOBS.status(job_id)
+    if st is None:
+        return jsonify(error="Nieznane zadanie"), 404
+    return jsonify(st)
+
+@app.route("/export/jobs/<job_id>/download", methods=["GET"])
+def export_job_download(job_id):
+    st = EXPORT_JOBS.status(job_id)
+    if st is None:
+        return jsonify(error="Nieznane zadanie"), 404
+    if st["status"] == "failed":
+        return jsonify(st), 500
+    if st["status"] != "done":
+        return jsonify(st), 409
+    kind = st["kind"]
+    return send_file(EXPORT_JOBS.get(job_id)["path"], as_attachment=True, conditional=True,
+                     download_name=DOWNLOAD_NAMES[kind], mimetype=MIMETYPES[kind])
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — strumieniowe przetwarzanie wsadów (CSV / NDJSON → NDJSON)
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Wiersze są czytane ze strumienia wejściowego na bieżąco, liczone paczkami
+przez calc_np.compute_all_batch i od razu odsyłane jako NDJSON, więc
+zużycie pamięci nie zależy od wielkości przesłanego pliku.
+Odpowiedź 200 wychodzi przed końcem odczytu, więc błąd strumienia wejściowego
+(zły UTF-8, uszkodzony gzip) kończy ją linią {"error": ...} zamiast urwać.
+"""
+import csv
+import gzip
+import io
+import json
+import math
+import zlib
+from itertools import islice
+
+import numpy as np
+
+from calc_np import compute_all_batch, iter_rows
+
+CHUNK_ROWS = 2000       # wierszy na jedną paczkę obliczeń
+FIRST_CHUNK_ROWS = 64   # pierwsza paczka mała, żeby klient szybko dostał wynik
+
+# Pola opcjonalne i ich wartości domyślne (jak w MIESZKANCY compute)
+ROW_DEFAULTS = {"unit": "GJ", "vat": "23"}
+FLOAT_FIELDS = ("bill", "heat_price", "vat", "month_m3", "dT")
+MAX_UNITS = 1_000_000  # lokali w budynku — większe wartości nie mieszczą się w sensie (ani w int64 wsadu)
+# błędy odczytu wejścia w trakcie strumienia (dekodowanie, gzip, CSV)
+STREAM_ERRORS = (UnicodeDecodeError, OSError, EOFError, zlib.error, csv.Error)
+
+
+def detect_format(content_type: str | None, requested: str | None = None) -> str:
+    """
+    Zwraca "csv" lub "ndjson" na podstawie parametru ?format= lub Content-Type.
+    """
+    fmt = (requested or "").lower()
+    if fmt in ("csv", "ndjson", "jsonl"):
+        return "csv" if fmt == "csv" else "ndjson"
+    ct = (content_type or "").lower()
+    return "csv" if ("csv" in ct or ct.startswith("text/plain")) else "ndjson"
+
+
+def open_text_stream(raw, content_encoding: str | None = None):
+    """
+    Owija binarny strumień żądania w czytnik tekstu (opcjonalnie rozpakowując gzip).
+    """
+    if (content_encoding or "").lower() == "gzip":
+        raw = gzip.GzipFile(fileobj=raw, mode="rb")
+    return io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+
+
+def iter_input_rows(text, fmt: str):
+    """
+    Generator słowników wierszy z CSV (nagłówek w pierwszej linii, separator
+    ',' lub ';') albo NDJSON (jeden obiekt JSON na linię).
+    Błędny wiersz NDJSON zwracany jest jako {"_error": "..."}.
+    """
+    if fmt == "csv":
+        first = text.readline()
+        if not first:
+            return
+        delim = ";" if first.count(";") > first.count(",") else ","
+        header = next(csv.reader([first], delimiter=delim))
+        for rec in csv.DictReader(text, fieldnames=[h.strip() for h in header], delimiter=delim):
+            yield rec
+        return
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            yield {"_error": f"Niepoprawny JSON: {e}"}
+            continue
+        yield obj if isinstance(obj, dict) else {"_error": "Wiersz nie jest obiektem JSON"}
+
+
+def _to_float(v) -> float:
+    if isinstance(v, str):
+        v = v.strip().replace(",", ".")
+    return float(v)
+
+
+def _parse_row(rec: dict):
+    """
+    Zamienia surowy wiersz na krotkę wejść compute_all.
+    Zwraca (wartości, None) albo (None, komunikat błędu).
+    """
+    if "_error" in rec:
+        return None, rec["_error"]
+    try:
+        vals = {k: _to_float(rec.get(k) if rec.get(k) not in (None, "") else ROW_DEFAULTS[k])
+                for k in FLOAT_FIELDS}
+        unit = str(rec.get("unit") or ROW_DEFAULTS["unit"]).strip()
+        units_f = _to_float(rec["units"])
+        if not units_f.is_integer():
+            raise ValueError(f"units musi być liczbą całkowitą: {rec['units']!r}")
+        if abs(units_f) > MAX_UNITS:
+            raise ValueError(f"units poza zakresem (najwyżej {MAX_UNITS}): {rec['units']!r}")
+        units = int(units_f)
+    except KeyError as e:
+        return None, f"Brak pola {e}"
+    except (TypeError, ValueError) as e:
+        return None, f"Błąd danych: {e}"
+    return (vals["bill"], vals["heat_price"], unit, vals["vat"], vals["month_m3"], units, vals["dT"]), None
+
+
+def compute_chunk(records: list, start: int):
+    """
+    Liczy jedną paczkę wierszy i zwraca linie NDJSON (str, zakończone '\\n').
+    Każda linia ma numer wiersza 'row' (od 1) i opcjonalnie 'id' z wejścia.
+    """
+    parsed, errors = [], []
+    for rec in records:
+        vals, err = _parse_row(rec)
+        parsed.append(vals or (np.nan, np.nan, "GJ", np.nan, np.nan, 0, np.nan))
+        errors.append(err)
+    bill, heat_price, unit, vat, month_m3, units, dT = zip(*parsed)
+    batch = compute_all_batch(np.array(bill), np.array(heat_price), np.array(unit), np.array(vat),
+                              np.array(month_m3), np.array(units, dtype=np.int64), np.array(dT))
+    lines = []
+    for i, (rec, err, res) in enumerate(zip(records, errors, iter_rows(batch))):
+        out = {"row": start + i}
+        if "id" in rec:
+            out["id"] = rec["id"]
+        if err is None and res is None:
+            err = "Invalid inputs: " + ", ".join(k for k, m in batch["invalid"].items() if m[i])
+        if err is None:
+            overflow = [k for k, v in res.items() if isinstance(v, float) and not math.isfinite(v)]
+            if overflow:
+                err = "Wynik poza zakresem liczb: " + ", ".join(overflow)
+        if err is None:
+            out.update(res)
+        else:
+            out["error"] = err
+        try:
+            lines.append(json.dumps(out, ensure_ascii=False, allow_nan=False) + "\n")
+        except ValueError:  # np. NaN w polu id z wejścia NDJSON
+            lines.append(json.dumps({"row": start + i, "error": "Wartość spoza JSON (NaN / Infinity)"}) + "\n")
+    return lines
+
+
+def iter_ndjson(rows, chunk_rows: int = CHUNK_ROWS):
+    """
+    Generator paczek NDJSON. Pierwsza paczka ma FIRST_CHUNK_ROWS wierszy,
+    kolejne rosną dwukrotnie aż do chunk_rows. Błąd odczytu wejścia
+    (STREAM_ERRORS): wiersze przeczytane wcześniej są liczone, a ostatnia linia
+    to {"error": ..., "rows_read": n}.
+    """
+    rows = iter(rows)
+    start = 1
+    size = min(FIRST_CHUNK_ROWS, chunk_rows)
+    while True:
+        chunk, failed = [], None
+        try:
+            for rec in islice(rows, size):
+                chunk.append(rec)
+        except STREAM_ERRORS as e:
+            failed = e
+        if chunk:
+            yield "".join(compute_chunk(chunk, start))
+            start += len(chunk)
+        if failed is not None:
+            yield json.dumps({"error": f"Błąd odczytu danych wejściowych: {failed}", "rows_read": start - 1},
+                             ensure_ascii=False) + "\n"
+            return
+        if not chunk:
+            return
+        size = min(size * 2, chunk_rows)
+
+
+def gzip_stream(chunks):
+    """
+    Kompresuje kolejne fragmenty tekstu do jednego strumienia gzip.
+    Po każdym fragmencie robi Z_SYNC_FLUSH, żeby klient dostawał dane od razu.
+    """
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = z.compress(chunk.encode("utf-8")) + z.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield z.flush()
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — pamięć podręczna wyników compute_all / compute_audit
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Większość ruchu to te same zestawy parametrów (DEFAULTS, ceny miast,
+dane z rachunku tej samej spółdzielni). Klucz budowany jest z
+znormalizowanych wartości (liczby jako float, jednostka wielkimi literami,
+VAT bez znaku %), więc "49,00" i 49.0 trafiają w ten sam wpis.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from calc import compute_all, compute_audit
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Ograniczony słownik z wypieraniem LRU (lub FIFO) i opcjonalnym TTL.
+    Bezpieczny wątkowo; liczniki trafień/chybień/wyparć dostępne przez stats().
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None, policy: str = "lru"):
+        if policy not in ("lru", "fifo"):
+            raise ValueError(f"Nieznana polityka wypierania: {policy!r}")
+        self.maxsize = int(maxsize)
+        self.ttl = ttl
+        self.policy = policy
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            expires, value = item
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            if self.policy == "lru":
+                self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = (expires, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def configure(self, maxsize: int | None = None, ttl: float | None = _MISSING, policy: str | None = None):
+        """Zmienia rozmiar / TTL / politykę w locie (nadmiarowe wpisy są wypierane)."""
+        with self._lock:
+            if policy is not None:
+                self.policy = policy
+            if ttl is not _MISSING:
+                self.ttl = ttl
+            if maxsize is not None:
+                self.maxsize = int(maxsize)
+                while len(self._data) > max(self.maxsize, 0):
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data), "maxsize": self.maxsize, "ttl": self.ttl, "policy": self.policy,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "expirations": self.expirations, "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def _env_num(name: str, default, cast=int):
+    v = os.environ.get(name)
+    return cast(v) if v not in (None, "") else default
+
+
+CALC_CACHE = LRUCache(maxsize=_env_num("PROFINSTAL_CALC_CACHE_SIZE", 1024),
+                      ttl=_env_num("PROFINSTAL_CALC_CACHE_TTL", 3600.0, float) or None,
+                      policy=os.environ.get("PROFINSTAL_CALC_CACHE_POLICY", "lru"))
+AUDIT_CACHE = LRUCache(maxsize=_env_num("PROFINSTAL_AUDIT_CACHE_SIZE", 256),
+                       ttl=_env_num("PROFINSTAL_CALC_CACHE_TTL", 3600.0, float) or None,
+                       policy=os.environ.get("PROFINSTAL_CALC_CACHE_POLICY", "lru"))
+
+
+# --- normalizacja kluczy ---
+def canon_float(x) -> float:
+    """Liczba jako float; przecinek dziesiętny dozwolony, -0.0 → 0.0."""
+    if isinstance(x, str):
+        x = x.strip().replace(",", ".")
+    return float(x) + 0.0
+
+
+def canon_unit(unit) -> str:
+    return (unit or "GJ").strip().upper()
+
+
+def canon_vat(vat) -> float:
+    """VAT w procentach: 23, "23", "23%", "23,0 %" → 23.0."""
+    if isinstance(vat, str):
+        vat = vat.replace("%", "")
+    return canon_float(vat)
+
+
+def cached_compute_all(bill, heat_price, unit, vat, month_m3, units, dT) -> dict:
+    """
+    compute_all z pamięcią podręczną. Zwraca kopię słownika wyniku —
+    modyfikacja nie psuje wpisu w cache. Błędne dane nie są zapamiętywane.
+    """
+    args = (canon_float(bill), canon_float(heat_price), canon_unit(unit), canon_vat(vat),
+            canon_float(month_m3), int(units), canon_float(dT))
+    res = CALC_CACHE.get(args)
+    if res is None:
+        res = compute_all(*args)
+        CALC_CACHE.set(args, res)
+    return dict(res)
+
+
+def _params_key(params: dict) -> tuple:
+    return tuple(sorted((k, canon_float(v)) for k, v in params.items()))
+
+
+def cached_compute_audit(params_old: dict, params_new: dict, heat_price: float = 73.69,
+                         unit: str = "GJ", vat: float = 23.0) -> dict:
+    """compute_audit z pamięcią podręczną (kopia wyniku, jak cached_compute_all)."""
+    key = (_params_key(params_old), _params_key(params_new),
+           canon_float(heat_price), canon_unit(unit), canon_vat(vat))
+    res = AUDIT_CACHE.get(key)
+    if res is None:
+        res = compute_audit(dict(key[0]), dict(key[1]), key[2], key[3], key[4])
+        AUDIT_CACHE.set(key, res)
+    return dict(res)
+
+
+def cache_stats() -> dict:
+    return {"calc": CALC_CACHE.stats(), "audit": AUDIT_CACHE.stats()}
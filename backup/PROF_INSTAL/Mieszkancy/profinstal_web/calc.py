@@ -4,7 +4,7 @@
 PROF INSTAL — core calculation logic extracted from the Tkinter app
 © 2025 Maciej Ślusarczyk. All rights reserved.
 """
-from math import isfinite
+from math import isfinite, pi, log
 
 CP_KJ_PER_KG_K = 4.19  # kJ/(kg·K)
 
@@ -58,6 +58,20 @@ def compute_all(bill: float, heat_price: float, unit: str, vat: float, month_m3:
 
 
 # --- AUDYTORSKIE PORÓWNANIE INSTALACJI ---
+def heat_loss(Q, L, d, lamb, t_in, t_out, t_amb, ins_thick, czas_pracy):
+    """
+    Roczna strata ciepła jednego przewodu [kWh/rok].
+    Wzór uproszczony wg PN-EN 12831, PN-EN 15316
+    Strata liniowa: q = 2 * pi * lambda * (t_sr - t_amb) / ln((d+2*ins)/d)
+    """
+    d_m = d / 1000.0
+    ins_m = ins_thick / 1000.0
+    d_ext = d_m + 2*ins_m
+    t_sr = (t_in + t_out) / 2.0
+    q = 2 * pi * lamb * (t_sr - t_amb) / log(d_ext/d_m)
+    Q_loss = q * L * czas_pracy / 1000.0  # [kWh/rok]
+    return Q_loss
+
 def compute_audit(params_old: dict, params_new: dict, heat_price: float = 73.69, unit: str = "GJ", vat: float = 23.0) -> dict:
     """
     Porównuje straty starej i nowej instalacji na podstawie parametrów i wzorów z norm.
@@ -71,18 +85,6 @@ def compute_audit(params_old: dict, params_new: dict, heat_price: float = 73.69,
     vat: VAT w procentach (domyślnie 23%)
     Zwraca słownik z porównaniem strat i oszczędności oraz kosztów.
     """
-    def heat_loss(Q, L, d, lamb, t_in, t_out, t_amb, ins_thick, czas_pracy):
-        # Wzór uproszczony wg PN-EN 12831, PN-EN 15316
-        # Strata liniowa: q = 2 * pi * lambda * (t_sr - t_amb) / ln((d+2*ins)/d)
-        from math import pi, log
-        d_m = d / 1000.0
-        ins_m = ins_thick / 1000.0
-        d_ext = d_m + 2*ins_m
-        t_sr = (t_in + t_out) / 2.0
-        q = 2 * pi * lamb * (t_sr - t_amb) / log(d_ext/d_m)
-        Q_loss = q * L * czas_pracy / 1000.0  # [kWh/rok]
-        return Q_loss
-
     Q_loss_old = heat_loss(
         params_old['Q'], params_old['L'], params_old['d'], params_old['lambda'],
         params_old['t_in'], params_old['t_out'], params_old['t_amb'], params_old['ins_thick'], params_old['czas_pracy']
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — wektorowa (NumPy) wersja obliczeń z calc.py
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Liczy ten sam zestaw pól co calc.compute_all, ale dla całych kolumn
+(portfel budynków) w jednym przebiegu NumPy. Kolejność działań jest
+identyczna jak w wersji skalarnej, więc wyniki zgadzają się bit w bit.
+Zawiera też siatkę scenariuszy modernizacji (sprawność × cena × ΔT).
+"""
+import math
+
+import numpy as np
+
+from calc import CP_KJ_PER_KG_K
+
+# Kolumny wejściowe w kolejności argumentów calc.compute_all
+INPUT_FIELDS = ("bill", "heat_price", "unit", "vat", "month_m3", "units", "dT")
+
+# Klucze wyniku w kolejności słownika zwracanego przez calc.compute_all
+RESULT_FIELDS = (
+    "bill", "heat_price", "unit", "vat", "dT", "month_m3", "units",
+    "price_GJ_brutto", "q_per_m3", "cost_theor", "eta",
+    "loss_per_m3", "loss_flat_m", "loss_build_m", "loss_build_y",
+    "cost70", "cost80", "save70_m3", "save80_m3",
+    "save70_flat_m", "save80_flat_m",
+    "save70_build_m", "save80_build_m",
+    "save70_build_y", "save80_build_y",
+)
+
+
+def _py_max(a, b):
+    # semantyka wbudowanego max(a, b): zwraca a, chyba że b > a (ważne dla -0.0)
+    return np.where(b > a, b, a)
+
+
+def _py_min(a, b):
+    # semantyka wbudowanego min(a, b): zwraca a, chyba że b < a
+    return np.where(b < a, b, a)
+
+
+def price_GJ_brutto_batch(price_net, unit, vat_percent):
+    """
+    Wektorowy odpowiednik calc.price_GJ_brutto.
+    unit: tablica (lub skalar) "GJ"/"MJ" — wielkość liter bez znaczenia.
+    """
+    price_net = np.asarray(price_net, dtype=np.float64)
+    is_mj = np.char.upper(np.asarray(unit, dtype=str)) == "MJ"
+    per_GJ_net = np.where(is_mj, price_net * 1000.0, price_net)
+    return per_GJ_net * (1.0 + np.asarray(vat_percent, dtype=np.float64)/100.0)
+
+
+def Q_GJ_per_m3_batch(dT):
+    """
+    Wektorowy odpowiednik calc.Q_GJ_per_m3.
+    """
+    return (1000.0 * CP_KJ_PER_KG_K * np.asarray(dT, dtype=np.float64)) / 1_000_000.0
+
+
+def validate_batch(bill, heat_price, vat, month_m3, units, dT) -> dict:
+    """
+    Maski błędnych wierszy (True = wartość odrzucona), po jednej na kolumnę.
+    Te same reguły co w calc.compute_all: wartości skończone i units > 0.
+    """
+    with np.errstate(invalid="ignore"):
+        units_bad = ~(np.asarray(units) > 0)
+    return {
+        "bill": ~np.isfinite(bill),
+        "heat_price": ~np.isfinite(heat_price),
+        "vat": ~np.isfinite(vat),
+        "month_m3": ~np.isfinite(month_m3),
+        "units": units_bad,
+        "dT": ~np.isfinite(dT),
+    }
+
+
+def compute_all_batch(bill, heat_price, unit, vat, month_m3, units, dT) -> dict:
+    """
+    Wsadowy odpowiednik calc.compute_all dla kolumn danych.
+
+    Argumenty to tablice (lub skalary — są rozgłaszane do wspólnej długości).
+    Zwraca słownik kolumn o kluczach RESULT_FIELDS oraz:
+        - 'valid'   — maska poprawnych wierszy,
+        - 'invalid' — słownik masek błędów per kolumna wejściowa.
+    Zamiast ValueError dla całego wsadu wiersze błędne mają NaN w polach
+    wyliczanych; poprawne wiersze są identyczne z wynikiem compute_all.
+    """
+    bill, heat_price, vat, month_m3, dT = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (bill, heat_price, vat, month_m3, dT))
+    )
+    units = np.asarray(units)
+    if units.dtype.kind not in "iuf":
+        units = units.astype(np.float64)
+    units = np.broadcast_to(units, bill.shape)
+    unit = np.broadcast_to(np.char.upper(np.asarray(unit, dtype=str)), bill.shape)
+
+    invalid = validate_batch(bill, heat_price, vat, month_m3, units, dT)
+    valid = ~np.logical_or.reduce(list(invalid.values()))
+
+    with np.errstate(all="ignore"):
+        price_gj_brutto = price_GJ_brutto_batch(heat_price, unit, vat)
+        q_per_m3 = Q_GJ_per_m3_batch(dT)
+        cost_theor = q_per_m3 * price_gj_brutto
+        ratio = np.divide(cost_theor, bill, out=np.zeros_like(cost_theor), where=bill != 0)
+        eta = _py_max(_py_min(ratio, 1.0), 0.0)
+
+        loss_per_m3 = bill - cost_theor
+        loss_flat_m = loss_per_m3 * month_m3
+        loss_build_m = loss_flat_m * units
+        loss_build_y = loss_build_m * 12.0
+
+        cost70 = (q_per_m3 / 0.70) * price_gj_brutto
+        cost80 = (q_per_m3 / 0.80) * price_gj_brutto
+        save70_m3 = _py_max(bill - cost70, 0.0); save80_m3 = _py_max(bill - cost80, 0.0)
+        save70_flat_m = save70_m3 * month_m3; save80_flat_m = save80_m3 * month_m3
+        save70_build_m = save70_flat_m * units; save80_build_m = save80_flat_m * units
+        save70_build_y = save70_build_m * 12.0; save80_build_y = save80_build_m * 12.0
+
+    derived = {
+        "price_GJ_brutto": price_gj_brutto, "q_per_m3": q_per_m3, "cost_theor": cost_theor, "eta": eta,
+        "loss_per_m3": loss_per_m3, "loss_flat_m": loss_flat_m, "loss_build_m": loss_build_m, "loss_build_y": loss_build_y,
+        "cost70": cost70, "cost80": cost80, "save70_m3": save70_m3, "save80_m3": save80_m3,
+        "save70_flat_m": save70_flat_m, "save80_flat_m": save80_flat_m,
+        "save70_build_m": save70_build_m, "save80_build_m": save80_build_m,
+        "save70_build_y": save70_build_y, "save80_build_y": save80_build_y,
+    }
+    out = {
+        "bill": bill, "heat_price": heat_price, "unit": unit, "vat": vat, "dT": dT, "month_m3": month_m3, "units": units,
+    }
+    for k, v in derived.items():
+        out[k] = np.where(valid, np.broadcast_to(v, bill.shape), np.nan)
+    out["valid"] = valid
+    out["invalid"] = invalid
+    return out
+
+
+def iter_rows(batch: dict):
+    """
+    Rozpakowuje wynik compute_all_batch na słowniki w formacie compute_all
+    (typy Pythona). Dla błędnych wierszy zwraca None.
+    """
+    cols = [batch[k].tolist() for k in RESULT_FIELDS]
+    for i, ok in enumerate(batch["valid"].tolist()):
+        yield dict(zip(RESULT_FIELDS, (c[i] for c in cols))) if ok else None
+
+
+# --- SIATKA SCENARIUSZY: sprawność × cena ciepła × ΔT ---
+SCENARIO_FIELDS = ("cost_m3", "save_m3", "save_flat_m", "save_build_m", "save_build_y")
+
+
+def efficiency_axis_size(start: float = 0.40, stop: float = 1.00, step: float = 0.01) -> int:
+    """Liczba punktów osi sprawności; ValueError dla kroku <= 0, stop < start lub wartości nieskończonych."""
+    if not all(math.isfinite(x) for x in (start, stop, step)):
+        raise ValueError("Invalid efficiency axis")
+    if step <= 0:
+        raise ValueError("eff_step must be > 0")
+    if stop < start:
+        raise ValueError("eff_max must be >= eff_min")
+    n = (stop - start) / step
+    if not math.isfinite(n):  # np. krok 1e-320 → inf
+        raise ValueError("eff_step too small")
+    return int(round(n)) + 1
+
+
+def efficiency_axis(start: float = 0.40, stop: float = 1.00, step: float = 0.01) -> np.ndarray:
+    """Oś sprawności, domyślnie 40–100% co 1 punkt procentowy (zaokrąglona do 1e-6)."""
+    n = efficiency_axis_size(start, stop, step)
+    return np.round(start + step * np.arange(n), 6)
+
+
+def scenario_grid(bill: float, month_m3: float, units: int, eff=None, heat_price=73.69, dT=45.0,
+                  unit: str = "GJ", vat: float = 23.0, dtype=np.float64) -> dict:
+    """
+    Ocenia pełną siatkę scenariuszy modernizacji zamiast sztywnych 70%/80%.
+    eff, heat_price, dT: skalary lub tablice 1D (osie siatki); cena netto w jednostce unit.
+    Zwraca {'axes': {'eff', 'heat_price', 'dT'}, 'shape': (n_eff, n_price, n_dT),
+    oraz tablice SCENARIO_FIELDS o kształcie shape}. Wartości dla eff = 0.70 / 0.80
+    są identyczne z cost70/save70_* i cost80/save80_* z calc.compute_all.
+    """
+    eff = efficiency_axis() if eff is None else np.atleast_1d(np.asarray(eff, dtype=np.float64))
+    heat_price = np.atleast_1d(np.asarray(heat_price, dtype=np.float64))
+    dT = np.atleast_1d(np.asarray(dT, dtype=np.float64))
+    if not (np.all(eff > 0) and np.all(np.isfinite(heat_price)) and np.all(np.isfinite(dT))
+            and all(np.isfinite(x) for x in (bill, month_m3, vat)) and units > 0):
+        raise ValueError("Invalid inputs")
+
+    price_gj_brutto = price_GJ_brutto_batch(heat_price, unit, vat)[None, :, None]
+    q_per_m3 = Q_GJ_per_m3_batch(dT)[None, None, :]
+    cost_m3 = (q_per_m3 / eff[:, None, None]) * price_gj_brutto
+    save_m3 = _py_max(bill - cost_m3, 0.0)
+    save_flat_m = save_m3 * month_m3
+    save_build_m = save_flat_m * units
+    save_build_y = save_build_m * 12.0
+
+    out = {"axes": {"eff": eff, "heat_price": heat_price, "dT": dT}, "shape": cost_m3.shape}
+    for k, v in zip(SCENARIO_FIELDS, (cost_m3, save_m3, save_flat_m, save_build_m, save_build_y)):
+        out[k] = v.astype(dtype, copy=False)
+    return out
+
+
+def scenario_grid_compact(grid: dict, decimals: int = 2) -> dict:
+    """
+    Zwarta postać siatki do JSON: osie jako listy, każde pole jako płaska lista
+    (kolejność C: eff, heat_price, dT) zaokrąglona do `decimals` miejsc.
+    """
+    return {
+        "axes": {k: v.tolist() for k, v in grid["axes"].items()},
+        "shape": list(grid["shape"]),
+        "order": ["eff", "heat_price", "dT"],
+        **{k: np.round(grid[k], decimals).ravel().tolist() for k in SCENARIO_FIELDS},
+    }
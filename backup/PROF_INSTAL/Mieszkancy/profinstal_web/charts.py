@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — wykresy słupkowe po stronie serwera (SVG / reportlab / PNG)
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Wykres opisuje BarChart (tytuł, etykiety, wartości, jednostka, kolory).
+Układ (słupki, siatka, podpisy) liczony jest raz w jednej funkcji, a trzy
+renderery tylko go rysują: SVG (HTML), reportlab Drawing (wektorowo w PDF)
+i PNG (DOCX). Gotowe wykresy trzymane są w LRU pod skrótem SHA-256 serii
+danych — raporty z tymi samymi parametrami starej/nowej instalacji używają
+jednego wyrenderowanego wykresu.
+"""
+import hashlib
+import io
+import math
+import os
+from typing import NamedTuple
+from xml.sax.saxutils import escape
+
+from cache import LRUCache
+from fonts import pdf_fonts
+
+WIDTH, HEIGHT = 450.0, 225.0  # pt — jednostki układu (SVG: px, PDF: pt)
+PNG_DPI = 200
+CHART_CACHE = LRUCache(maxsize=int(os.environ.get("PROFINSTAL_CHART_CACHE_SIZE", "256")))
+
+AUDIT_COLORS = {
+    "heat_loss": ("#ff6384", "#36a2eb"),  # jak wykresy canvas w audit_result.html
+    "costs": ("#ffce56", "#4bc0c0"),
+}
+AUDIT_LABELS = ("Stara instalacja", "Nowa instalacja")
+
+
+class BarChart(NamedTuple):
+    title: str
+    labels: tuple
+    values: tuple  # float
+    unit: str
+    colors: tuple  # "#rrggbb" na słupek
+
+
+def chart_key(chart: BarChart) -> str:
+    """Skrót SHA-256 serii danych i opisu wykresu (klucz pamięci podręcznej)."""
+    return hashlib.sha256(repr(tuple(chart)).encode("utf-8")).hexdigest()
+
+
+def audit_charts(res: dict) -> tuple:
+    """Wykresy strat ciepła i kosztów z wyniku compute_audit (wartości z dokładnością do 0,01)."""
+    return (
+        BarChart("Porównanie strat ciepła", AUDIT_LABELS,
+                 (round(float(res["Q_loss_old"]), 2), round(float(res["Q_loss_new"]), 2)),
+                 "kWh/rok", AUDIT_COLORS["heat_loss"]),
+        BarChart("Porównanie rocznych kosztów", AUDIT_LABELS,
+                 (round(float(res["cost_old"]), 2), round(float(res["cost_new"]), 2)),
+                 "zł/rok", AUDIT_COLORS["costs"]),
+    )
+
+
+def _fmt(v: float) -> str:
+    return f"{v:,.2f}".replace(",", " ")
+
+
+def _nice_step(span: float, ticks: int = 4) -> float:
+    """Krok siatki 1 / 2 / 2,5 / 5 × 10^k, dający co najwyżej `ticks` przedziałów."""
+    raw = span / ticks
+    base = 10 ** math.floor(math.log10(raw))
+    return next(m * base for m in (1, 2, 2.5, 5, 10) if m * base >= raw)
+
+
+def layout(chart: BarChart) -> dict:
+    """
+    Geometria wykresu w układzie WIDTH × HEIGHT, oś y w dół:
+    title, axis (x0, y0, x1, y1), grid [(y, etykieta)], bars [(x, y, w, h, kolor, etykieta, wartość)].
+    """
+    left, right, top, bottom = 60.0, WIDTH - 20.0, 40.0, HEIGHT - 35.0
+    step = _nice_step(max([v for v in chart.values if v > 0] or [1.0]) * 1.1)
+    n = math.ceil(max(chart.values + (0.0,)) * 1.1 / step) or 1
+    vmax = step * n
+    plot_h = bottom - top
+    tick = (lambda v: f"{v:,.0f}".replace(",", " ")) if step >= 1 else (lambda v: f"{v:g}")
+    grid = [(bottom - plot_h * i / n, tick(step * i)) for i in range(n + 1)]
+    slot = (right - left) / max(len(chart.values), 1)
+    bars = []
+    for i, (label, value) in enumerate(zip(chart.labels, chart.values)):
+        h = plot_h * max(value, 0.0) / vmax
+        w = slot * 0.5
+        bars.append((left + slot * i + (slot - w) / 2, bottom - h, w, h,
+                     chart.colors[i % len(chart.colors)], label, f"{_fmt(value)} {chart.unit}"))
+    return {"title": f"{chart.title} [{chart.unit}]", "axis": (left, bottom, right, top), "grid": grid, "bars": bars}
+
+
+def _memo(kind: str, chart: BarChart, build):
+    key = (chart_key(chart), kind)
+    value = CHART_CACHE.get(key)
+    if value is None:
+        value = build(chart)
+        CHART_CACHE.set(key, value)
+    return value
+
+
+# ===== SVG =====
+def _build_svg(chart: BarChart) -> str:
+    L = layout(chart)
+    x0, y0, x1, y1 = L["axis"]
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {WIDTH:g} {HEIGHT:g}" '
+           f'font-family="DejaVu Serif, Times New Roman, serif" role="img" aria-label="{escape(chart.title)}">',
+           f'<rect width="{WIDTH:g}" height="{HEIGHT:g}" fill="#fff"/>',
+           f'<text x="{WIDTH / 2:g}" y="20" font-size="13" font-weight="bold" text-anchor="middle">{escape(L["title"])}</text>']
+    for y, label in L["grid"]:
+        out.append(f'<line x1="{x0:g}" y1="{y:.2f}" x2="{x1:g}" y2="{y:.2f}" stroke="#ddd" stroke-width="0.5"/>'
+                   f'<text x="{x0 - 5:g}" y="{y + 3:.2f}" font-size="8" text-anchor="end" fill="#555">{escape(label)}</text>')
+    for x, y, w, h, color, label, value in L["bars"]:
+        cx = x + w / 2
+        out.append(f'<rect x="{x:.2f}" y="{y:.2f}" width="{w:.2f}" height="{h:.2f}" fill="{color}"/>'
+                   f'<text x="{cx:.2f}" y="{y - 4:.2f}" font-size="9" text-anchor="middle">{escape(value)}</text>'
+                   f'<text x="{cx:.2f}" y="{y0 + 15:.2f}" font-size="10" text-anchor="middle">{escape(label)}</text>')
+    out.append(f'<line x1="{x0:g}" y1="{y0:g}" x2="{x1:g}" y2="{y0:g}" stroke="#333"/>'
+               f'<line x1="{x0:g}" y1="{y0:g}" x2="{x0:g}" y2="{y1:g}" stroke="#333"/></svg>')
+    return "".join(out)
+
+
+def chart_svg(chart: BarChart) -> str:
+    """Wykres jako samodzielny znacznik <svg> (do wstawienia w HTML)."""
+    return _memo("svg", chart, _build_svg)
+
+
+# ===== reportlab Drawing (PDF, wektorowo) =====
+def _build_drawing(chart: BarChart):
+    from reportlab.graphics.shapes import Drawing, Line, Rect, String
+    from reportlab.lib.colors import HexColor
+
+    regular, bold_font = pdf_fonts()
+    L = layout(chart)
+    x0, y0, x1, y1 = L["axis"]
+    flip = lambda y: HEIGHT - y
+    d = Drawing(WIDTH, HEIGHT)
+    d.add(String(WIDTH / 2, flip(20), L["title"], fontName=bold_font, fontSize=13, textAnchor="middle"))
+    grey, dark = HexColor("#dddddd"), HexColor("#555555")
+    for y, label in L["grid"]:
+        d.add(Line(x0, flip(y), x1, flip(y), strokeColor=grey, strokeWidth=0.5))
+        d.add(String(x0 - 5, flip(y + 3), label, fontName=regular, fontSize=8, textAnchor="end", fillColor=dark))
+    for x, y, w, h, color, label, value in L["bars"]:
+        cx = x + w / 2
+        d.add(Rect(x, flip(y + h), w, h, fillColor=HexColor(color), strokeColor=None))
+        d.add(String(cx, flip(y - 4), value, fontName=regular, fontSize=9, textAnchor="middle"))
+        d.add(String(cx, flip(y0 + 15), label, fontName=regular, fontSize=10, textAnchor="middle"))
+    axis = HexColor("#333333")
+    d.add(Line(x0, flip(y0), x1, flip(y0), strokeColor=axis))
+    d.add(Line(x0, flip(y0), x0, flip(y1), strokeColor=axis))
+    return d
+
+
+def chart_drawing(chart: BarChart):
+    """Wspólny reportlab Drawing wykresu (WIDTH × HEIGHT pt) — rysować przez draw_on_canvas."""
+    return _memo("drawing", chart, _build_drawing)
+
+
+def draw_on_canvas(chart: BarChart, c, x: float, y: float, width: float, height: float):
+    """Rysuje wykres wektorowo na kanwie reportlab w prostokącie (x, y — lewy dolny róg)."""
+    from reportlab.graphics import renderPDF
+
+    c.saveState()
+    c.translate(x, y)
+    c.scale(width / WIDTH, height / HEIGHT)
+    renderPDF.draw(chart_drawing(chart), c, 0, 0)
+    c.restoreState()
+
+
+# ===== PNG (DOCX) =====
+def _pil_font(size: float, bold: bool):
+    from PIL import ImageFont
+    from reportlab.pdfbase import pdfmetrics
+
+    name = pdf_fonts()[1 if bold else 0]
+    path = getattr(getattr(pdfmetrics.getFont(name), "face", None), "filename", None)
+    if path and os.path.exists(path):
+        return ImageFont.truetype(path, round(size))
+    return ImageFont.load_default(round(size))
+
+
+def _build_png(chart: BarChart) -> bytes:
+    from PIL import Image, ImageDraw
+
+    s = PNG_DPI / 72
+    L = layout(chart)
+    x0, y0, x1, y1 = (v * s for v in L["axis"])
+    im = Image.new("RGB", (round(WIDTH * s), round(HEIGHT * s)), "white")
+    g = ImageDraw.Draw(im)
+    f8, f9, f10 = (_pil_font(n * s, False) for n in (8, 9, 10))
+    f13 = _pil_font(13 * s, True)
+    g.text((WIDTH / 2 * s, 20 * s), L["title"], font=f13, fill="black", anchor="ms")
+    for y, label in L["grid"]:
+        g.line((x0, y * s, x1, y * s), fill="#dddddd", width=max(1, round(0.5 * s)))
+        g.text((x0 - 5 * s, (y + 3) * s), label, font=f8, fill="#555555", anchor="rs")
+    for x, y, w, h, color, label, value in L["bars"]:
+        cx = (x + w / 2) * s
+        if h > 0:
+            g.rectangle((x * s, y * s, (x + w) * s, (y + h) * s), fill=color)
+        g.text((cx, (y - 4) * s), value, font=f9, fill="black", anchor="ms")
+        g.text((cx, y0 + 15 * s), label, font=f10, fill="black", anchor="ms")
+    g.line((x0, y0, x1, y0), fill="#333333", width=round(s))
+    g.line((x0, y0, x0, y1), fill="#333333", width=round(s))
+    out = io.BytesIO()
+    im.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+def chart_png(chart: BarChart) -> bytes:
+    """Wykres jako PNG (PNG_DPI) — dla DOCX."""
+    return _memo("png", chart, _build_png)
+
+
+def chart_stats() -> dict:
+    return CHART_CACHE.stats()
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — pamięć podręczna gotowych dokumentów (PDF / DOCX) na dysku
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Dokumenty są deterministyczne (stałe daty, kolejność wpisów ZIP, reportlab
+invariant), więc te same dane wejściowe dają te same bajty. Klucz pliku to
+SHA-256 z wyniku, stron pisma, daty, wersji szablonów i danych eksperta;
+powtórne pobranie to send_file z dysku (sendfile po stronie serwera WSGI).
+Wypieranie LRU wg łącznego rozmiaru plików; czas użycia = mtime pliku,
+więc kolejność jest wspólna dla wszystkich procesów serwera. Równoczesne
+żądania tego samego dokumentu (także z różnych procesów) czekają na jedno
+renderowanie (singleflight.py).
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from exports import EXPERT, TEMPLATE_VERSION
+from singleflight import SingleFlight
+
+DOC_CACHE_DIR = os.environ.get("PROFINSTAL_DOC_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "profinstal-docs")
+DOC_CACHE_MAX_BYTES = int(os.environ.get("PROFINSTAL_DOC_CACHE_MAX_BYTES", str(256 << 20)))  # 0 = wyłączona
+
+
+def _canon(obj):
+    """Wartości słownika w postaci stabilnej dla JSON (float → repr, -0.0 → 0.0)."""
+    if isinstance(obj, float):
+        return repr(obj + 0.0)
+    if isinstance(obj, dict):
+        return {str(k): _canon(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canon(v) for v in obj]
+    return obj
+
+
+def document_key(kind: str, doc: str, res: dict, parties: dict | None = None, today: str | None = None) -> str:
+    """Skrót SHA-256 wszystkiego, od czego zależy treść dokumentu."""
+    payload = {"kind": kind, "doc": doc, "res": res, "parties": parties or {}, "today": today,
+               "template": TEMPLATE_VERSION, "expert": EXPERT}
+    blob = json.dumps(_canon(payload), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class DocumentCache:
+    """Katalog plików <klucz[:2]>/<klucz>.<rozszerzenie> z limitem łącznego rozmiaru."""
+
+    def __init__(self, root: str = DOC_CACHE_DIR, max_bytes: int = DOC_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._index = None  # OrderedDict ścieżka → rozmiar (od najdawniej używanych), czytany leniwie
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.flight = SingleFlight(lock_dir=root)  # pliki blokad .lock-xx (pomijane w indeksie)
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.{ext}")
+
+    def _load_index(self):
+        entries = []
+        for dirpath, _, files in os.walk(self.root):
+            for fn in files:
+                if fn.startswith("."):
+                    continue
+                p = os.path.join(dirpath, fn)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, p, st.st_size))
+        entries.sort()
+        self._index = OrderedDict((p, size) for _, p, size in entries)
+        self._bytes = sum(self._index.values())
+
+    def get(self, key: str, ext: str, count_miss: bool = True) -> str | None:
+        """Ścieżka gotowego dokumentu albo None (liczy trafienia/chybienia)."""
+        path = self._path(key, ext)
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            try:
+                os.utime(path)
+            except OSError:
+                self._bytes -= self._index.pop(path, 0)
+                self.misses += count_miss
+                return None
+            if path not in self._index:  # plik dopisany przez inny proces
+                self._index[path] = os.path.getsize(path)
+                self._bytes += self._index[path]
+            self._index.move_to_end(path)
+            self.hits += 1
+            return path
+
+    def put(self, key: str, ext: str, write) -> str:
+        """Zapisuje dokument przez write(fp) (plik tymczasowy + os.replace) i zwraca ścieżkę."""
+        path = self._path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                write(fp)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        size = os.path.getsize(path)
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            self._bytes += size - self._index.pop(path, 0)
+            self._index[path] = size
+            self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: str):
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            old, size = next(iter(self._index.items()))
+            if old == keep:
+                break
+            del self._index[old]
+            self._bytes -= size
+            try:
+                os.unlink(old)
+            except OSError:
+                pass
+            self.evictions += 1
+
+    def get_or_render(self, key: str, ext: str, write) -> tuple:
+        """
+        (ścieżka, trafienie?) — dokument z dysku albo wygenerowany i zapisany.
+        Przy chybieniu renderuje tylko jedno z równoczesnych żądań o ten klucz;
+        trafienie = plik wygenerowany przez inne żądanie (w tym lub innym procesie).
+        """
+        path = self.get(key, ext)
+        if path is not None:
+            return path, True
+
+        def render() -> tuple:
+            done = self.get(key, ext, count_miss=False)  # gotowy po blokadzie → wyrenderował inny proces
+            return (done, True) if done is not None else (self.put(key, ext, write), False)
+
+        (path, hit), shared = self.flight.do(f"{key}.{ext}", render)
+        return path, hit or shared
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"enabled": self.enabled, "dir": self.root, "max_bytes": self.max_bytes,
+                "files": len(self._index or ()), "bytes": self._bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0, "single_flight": self.flight.stats()}
+
+
+DOC_CACHE = DocumentCache()
@@ -0,0 +1,478 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — niezależny od formatu model dokumentu (DOCX / PDF / HTML)
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Treść opinii budowana jest raz jako lista węzłów (nagłówki, akapity,
+tabele KPI, rysunki, wykresy), a lekkie backendy zapisują ją jako DOCX (gotowy XML
+w szablonie z docx_template.py), PDF (reportlab) i HTML. Wszystkie formaty
+pochodzą z tego samego drzewa, więc ich treść nie może się rozjechać.
+"""
+import base64
+import html
+import io
+import zipfile
+from datetime import date
+from typing import NamedTuple
+from xml.sax.saxutils import escape
+
+from charts import BarChart, audit_charts, chart_png, chart_svg, draw_on_canvas
+from docx_template import ZIP_DATE
+from exports import COPYRIGHT_NOTICE, EXPERT, docx_template
+from fonts import pdf_fonts
+
+
+# ===== WĘZŁY =====
+class Heading(NamedTuple):
+    text: str
+    level: int = 1  # 0 = tytuł dokumentu
+
+
+class Paragraph(NamedTuple):
+    text: str = ""  # "\n" = złamanie wiersza; pusty akapit = odstęp
+    bold: bool = False
+    italic: bool = False
+    size: float | None = None  # pt; None = 11 pt
+    align: str = "left"  # left / right / center
+
+
+class KpiTable(NamedTuple):
+    rows: tuple  # ((etykieta, wartość), ...)
+
+
+class Figure(NamedTuple):
+    png: bytes
+    width_mm: float
+    height_mm: float
+    caption: str = ""
+
+
+class Chart(NamedTuple):
+    chart: BarChart  # PDF: wektorowo, HTML: SVG, DOCX: PNG (charts.py)
+    width_mm: float = 160
+    height_mm: float = 80
+    caption: str = ""
+
+
+class DocModel(NamedTuple):
+    title: str
+    nodes: tuple
+
+
+BASE_SIZE = 11
+HEADING_SIZES = {0: 16, 1: 13, 2: 11.5}
+
+
+def _pl_num(x: float, digits: int = 2) -> str:
+    """Liczba z przecinkiem dziesiętnym, bez zbędnych zer: 1.23 → "1,23", 1.08 → "1,08", 1.0 → "1"."""
+    return f"{x:.{digits}f}".rstrip("0").rstrip(".").replace(".", ",")
+
+
+def _image_ext(data: bytes) -> str:
+    return "jpeg" if data[:3] == b"\xff\xd8\xff" else "png"
+
+
+# ===== TREŚĆ: OPINIA TECHNICZNO-FINANSOWA =====
+def expert_header(logo: bytes | None = None) -> list:
+    """Nota prawna, opcjonalne logo (PNG / JPEG) i blok eksperta."""
+    E = EXPERT
+    return [
+        Paragraph(COPYRIGHT_NOTICE.strip("\n"), italic=True, size=8),
+        Paragraph(),
+        *([Figure(logo, 20, 20)] if logo else []),
+        Paragraph(f"{E['company']} — {E['city']}", bold=True),
+        Paragraph(f"{E['name']} | {E['title']}\n{E['lic']}\n{E['chamber']}\n{E['contact']}"),
+        Paragraph(),
+    ]
+
+
+def signature_block() -> list:
+    """Podpis eksperta i stopka."""
+    E = EXPERT
+    return [
+        Paragraph(),
+        Paragraph(E["name"], bold=True, align="right"),
+        Paragraph(f"{E['title']}\n{E['lic']}\n{E['chamber']}\n{E['contact']}", align="right"),
+        Paragraph(),
+        Paragraph("Oprogramowanie: PROF INSTAL - Dla Mieszkańców © 2025 Maciej Ślusarczyk", size=8),
+    ]
+
+
+def expert_assessment(eta_pct: float) -> list:
+    """Ocena ekspercka zależna od sprawności (sekcja 6 opinii)."""
+    if eta_pct >= 70:
+        out = []
+        if 70 <= eta_pct <= 75:
+            out += [
+                Paragraph(),
+                Paragraph("UWAGA: Sprawność na granicy normy technicznej.", bold=True),
+                Paragraph("Mimo że instalacja osiąga akceptowalny poziom 70%, warto rozważyć niewielkie usprawnienia: "
+                          "optymalizację temperatur cyrkulacji, częściowe docieplenia najbardziej narażonych odcinków "
+                          "oraz poprawę regulacji automatyki. Działania te mogą podnieść sprawność do 75-80% "
+                          "przy relatywnie niskich nakładach finansowych."),
+            ]
+        return out + [Paragraph("Sprawność oceniona jako dobra. Rekomenduję utrzymanie parametrów, okresowe równoważenie cyrkulacji, "
+                                "monitoring temperatur (zasilanie/powrót CWU) i audyt co 12 miesięcy.")]
+    if 50 <= eta_pct < 70:
+        return [Paragraph("Sprawność umiarkowana — realny potencjał poprawy 10–30%. Priorytety: docieplenia, zawory termostatyczne i równoważenie cyrkulacji, "
+                          "korekta nastaw węzła, praca pomp wg temperatury powrotu/harmonogramu.")]
+    return [Paragraph("Sprawność niska — nadmierne straty energii. Zalecane pilne działania: pełne izolacje przewodów, "
+                      "równoważenie i sterowanie cyrkulacji, przegląd wymienników i automatyki, eliminacja przegrzewów.")]
+
+
+def build_opinion(res: dict, today: str | None = None, figures=(), logo: bytes | None = None) -> DocModel:
+    """Opinia techniczno-finansowa CWU jako DocModel — jedyna treść opinii (eksporty web i aplikacja Tk)."""
+    L = res
+    today = today or date.today().isoformat()
+    u = "zł/GJ" if L["unit"] == "GJ" else "zł/MJ"
+    total_month = L["loss_build_m"] / L["loss_per_m3"] if L["loss_per_m3"] > 0 else 0
+    cost70_calc = L["cost_theor"] / 0.70
+    cost80_calc = L["cost_theor"] / 0.80
+    P = Paragraph
+
+    nodes = expert_header(logo) + [
+        Heading("Opinia techniczno-finansowa — ciepła woda użytkowa (CWU)", 0),
+        P(f"Data: {today}"),
+        KpiTable((
+            ("Sprawność instalacji", f"{L['eta']*100:.1f} %"),
+            ("Strata na 1 m³", f"{L['loss_per_m3']:.2f} zł"),
+            ("Twoja strata / miesiąc", f"{L['loss_flat_m']:.2f} zł"),
+            ("Twoja strata / rok", f"{L['loss_flat_m']*12:.0f} zł"),
+        )),
+        *figures,
+
+        Heading("1. Metodyka i wzory obliczeniowe"),
+        P("Obliczenia wykonano według zasad bilansu cieplnego (Q = m·c·ΔT) opisanych w normach i literaturze technicznej, z autorską metodyką PROF INSTAL w zakresie interpretacji sprawności, analizy strat i symulacji scenariuszy modernizacji."),
+        P("Q = m·c·ΔT;  m = 1000 kg;  c = 4,19 kJ/(kg·K)."),
+        P("Q[GJ/m³] = (1000·4,19·ΔT) / 1 000 000;  koszt_teor [zł/m³] = Q · cena_ciepła_brutto [zł/GJ]."),
+        P("Sprawność: η = koszt_teor / stawka_rachunkowa."),
+        P("© 2025 PROF INSTAL Maciej Ślusarczyk - Model obliczeniowy objęty prawami autorskimi", italic=True, size=9),
+
+        Heading("2. Dane wejściowe i wyniki"),
+        P(f"Stawka rachunkowa: {L['bill']:.2f} zł/m³"),
+        P(f"Cena ciepła (netto): {L['heat_price']:.4f} {u}; VAT: {_pl_num(L['vat'])}%; Ciepło brutto: {L['price_GJ_brutto']:.2f} zł/GJ"),
+        P(f"ΔT: {L['dT']:.0f}°C  →  Q_teor = {L['q_per_m3']:.5f} GJ/m³;  koszt_teor = {L['cost_theor']:.2f} zł/m³"),
+        P(f"Sprawność wyliczona: {L['eta']*100:.1f}%"),
+        P(f"Strata na 1 m³: {L['loss_per_m3']:.2f} zł;  Strata budynku: {L['loss_build_m']:,.2f} zł/m-c; {L['loss_build_y']:,.2f} zł/rok."),
+
+        Heading("2.1. Szczegółowe obliczenia krok po kroku", 2),
+        P("Obliczenie zapotrzebowania na energię:"),
+        P(f"Q = 1000 · 4,19 · {L['dT']:.0f} / 1 000 000 = {L['q_per_m3']:.5f} GJ/m³"),
+        P("Cena brutto energii cieplnej:"),
+        P(f"{L['heat_price']:.2f} · {_pl_num(1 + L['vat'] / 100)} = {L['price_GJ_brutto']:.2f} zł/GJ"),
+        P("Koszt teoretyczny podgrzania 1 m³:"),
+        P(f"{L['q_per_m3']:.5f} · {L['price_GJ_brutto']:.2f} = {L['cost_theor']:.2f} zł/m³"),
+        P('Sprawność (definiowana jako "efektywność rozliczeniowa"):'),
+        P(f"η = {L['cost_theor']:.2f} / {L['bill']:.2f} = {L['eta']*100:.1f}%"),
+        P("Strata na 1 m³:"),
+        P(f"{L['bill']:.2f} - {L['cost_theor']:.2f} = {L['loss_per_m3']:.2f} zł"),
+        P("Z podanych danych wynika całkowite zużycie budynku:"),
+        P(f"~{total_month:.1f} m³/miesiąc oraz ~{total_month * 12:.1f} m³/rok"),
+
+        Heading("3. Scenariusze po modernizacji"),
+        P("Scenariusze liczone według wzoru: stawka = koszt_teor / η"),
+        P("70% sprawności:"),
+        P(f"{L['cost_theor']:.2f} / 0,7 = {cost70_calc:.2f} zł/m³ → oszczędność {L['bill']:.2f} - {cost70_calc:.2f} = {L['bill'] - cost70_calc:.2f} zł/m³"),
+        P("80% sprawności:"),
+        P(f"{L['cost_theor']:.2f} / 0,8 = {cost80_calc:.2f} zł/m³ → oszczędność {L['bill']:.2f} - {cost80_calc:.2f} = {L['bill'] - cost80_calc:.2f} zł/m³"),
+        P(f"Oszczędność budynku (mies.): 70% → {L['save70_build_m']:,.2f} zł; 80% → {L['save80_build_m']:,.2f} zł."),
+        P(f"Oszczędność budynku (rok):   70% → {L['save70_build_y']:,.2f} zł; 80% → {L['save80_build_y']:,.2f} zł."),
+
+        Heading("4. Uwagi metodyczne"),
+        P("• Sprawność rozliczeniowa obejmuje straty przesyłu, magazynowania, cyrkulacji, przegrzewy anty-Legionella itd., a nie tylko sprawność wymiennika."),
+        P("• Wartość c = 4,19 kJ/(kg·K) jest przyjęta dla zakresu temperatur 10-60°C. W precyzyjnych obliczeniach można uwzględnić zmienność c i gęstości ρ≈998 kg/m³."),
+        P("• Stawka rachunkowa i cena ciepła brutto odnoszą się do tej samej bazy podatkowej."),
+        P("• Wyniki mogą podlegać niewielkim wahaniom sezonowym ze względu na zmienność temperatury wody zimnej."),
+
+        Heading("5. Podstawy prawne i normatywne"),
+        P("• Ustawa o spółdzielniach mieszkaniowych – art. 4 ust. 2 (rzeczywiste koszty)."),
+        P("• Prawo budowlane – art. 62 (należyty stan techniczny; przeglądy okresowe)."),
+        P("• Prawo energetyczne – art. 5 (należyta staranność i efektywność usług energetycznych)."),
+        P("• Warunki Techniczne (rozp. MI) m.in. §120, §134 – instalacje wodociągowe/CWU; ograniczanie strat; cyrkulacja."),
+        P("• Taryfy ciepła zatwierdzane przez Prezesa URE – ceny energii (zł/GJ) i opłaty dystrybucyjne."),
+
+        Heading("6. Ocena ekspercka i zalecenia"),
+        *expert_assessment(L["eta"] * 100),
+
+        Heading("7. Metryka i podpis"),
+        *signature_block(),
+    ]
+    return DocModel("Opinia techniczno-finansowa — CWU", tuple(nodes))
+
+
+# ===== TREŚĆ: AUDYT STRAT INSTALACJI =====
+AUDIT_PARAM_LABELS = {
+    "Q": "Moc [kW]", "L": "Długość przewodów [m]", "d": "Średnica [mm]", "lambda": "λ izolacji [W/mK]",
+    "t_in": "Temperatura zasilania [°C]", "t_out": "Temperatura powrotu [°C]", "t_amb": "Temperatura otoczenia [°C]",
+    "ins_thick": "Grubość izolacji [mm]", "czas_pracy": "Czas pracy [h/rok]",
+}
+
+
+def build_audit_report(res: dict, params_old: dict, params_new: dict, today: str | None = None) -> DocModel:
+    """Raport audytu strat (treść jak audit_result.html) z wykresami strat i kosztów."""
+    today = today or date.today().isoformat()
+    heat_chart, cost_chart = audit_charts(res)
+    params = tuple((f"{AUDIT_PARAM_LABELS.get(k, k)}: stara / nowa", f"{params_old[k]:g} / {params_new.get(k, 0):g}")
+                   for k in params_old)
+    nodes = [
+        *expert_header(),
+        Heading("Audyt strat instalacji", 0),
+        Paragraph(f"Data: {today}", align="right"),
+        Heading("1. Parametry wejściowe"),
+        KpiTable(params),
+        Heading("2. Porównanie strat"),
+        KpiTable((
+            ("Straty starej instalacji", f"{res['Q_loss_old']:,.2f} kWh/rok"),
+            ("Straty nowej instalacji", f"{res['Q_loss_new']:,.2f} kWh/rok"),
+            ("Oszczędność energii", f"{res['oszczednosc_kWh']:,.2f} kWh/rok"),
+            ("Oszczędność procentowa", f"{res['oszczednosc_proc']:.1f}%"),
+        )),
+        Chart(heat_chart, caption="Rys. 1. Roczne straty ciepła — stara i nowa instalacja"),
+        Heading("3. Porównanie kosztów"),
+        KpiTable((
+            ("Koszt strat starej instalacji", f"{res['cost_old']:,.2f} zł/rok"),
+            ("Koszt strat nowej instalacji", f"{res['cost_new']:,.2f} zł/rok"),
+            ("Oszczędność kosztów", f"{res['cost_savings']:,.2f} zł/rok"),
+        )),
+        Chart(cost_chart, caption="Rys. 2. Roczny koszt strat — stara i nowa instalacja"),
+        Heading("4. Metryka i podpis"),
+        *signature_block(),
+    ]
+    return DocModel("Audyt strat instalacji", tuple(nodes))
+
+
+# ===== BACKEND: DOCX (gotowy XML w szablonie "body") =====
+_JC = {"right": "right", "center": "center"}
+_HEADING_STYLES = {0: "Title", 1: "Heading1", 2: "Heading2"}
+_EMU_PER_MM = 36000
+
+
+def _docx_runs(text: str, rpr: str) -> str:
+    lines = text.split("\n")
+    out = []
+    for i, line in enumerate(lines):
+        br = "<w:br/>" if i < len(lines) - 1 else ""
+        out.append(f'<w:r>{rpr}<w:t xml:space="preserve">{escape(line)}</w:t>{br}</w:r>')
+    return "".join(out)
+
+
+def _docx_paragraph(node: Paragraph) -> str:
+    ppr = f'<w:pPr><w:jc w:val="{_JC[node.align]}"/></w:pPr>' if node.align in _JC else ""
+    props = ("<w:b/>" if node.bold else "") + ("<w:i/>" if node.italic else "")
+    if node.size:
+        props += f'<w:sz w:val="{round(node.size * 2)}"/>'
+    rpr = f"<w:rPr>{props}</w:rPr>" if props else ""
+    return f"<w:p>{ppr}{_docx_runs(node.text, rpr) if node.text else ''}</w:p>"
+
+
+def _docx_table(node: KpiTable) -> str:
+    widths = (5200, 3400)
+    rows = []
+    for label, value in node.rows:
+        cells = "".join(
+            f'<w:tc><w:tcPr><w:tcW w:w="{w}" w:type="dxa"/></w:tcPr>'
+            f"<w:p>{_docx_runs(str(text), '<w:rPr><w:b/></w:rPr>' if i else '')}</w:p></w:tc>"
+            for i, (w, text) in enumerate(zip(widths, (label, value))))
+        rows.append(f"<w:tr>{cells}</w:tr>")
+    grid = "".join(f'<w:gridCol w:w="{w}"/>' for w in widths)
+    return ('<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="0" w:type="auto"/></w:tblPr>'
+            f"<w:tblGrid>{grid}</w:tblGrid>{''.join(rows)}</w:tbl><w:p/>")
+
+
+def _docx_figure(node: Figure, rid: str, pic_id: int) -> str:
+    cx, cy = round(node.width_mm * _EMU_PER_MM), round(node.height_mm * _EMU_PER_MM)
+    drawing = (
+        f'<w:drawing><wp:inline distT="0" distB="0" distL="0" distR="0"><wp:extent cx="{cx}" cy="{cy}"/>'
+        f'<wp:docPr id="{pic_id}" name="Rysunek {pic_id}"/>'
+        '<a:graphic xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">'
+        '<a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        '<pic:pic xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        f'<pic:nvPicPr><pic:cNvPr id="{pic_id}" name="rysunek{pic_id}.png"/><pic:cNvPicPr/></pic:nvPicPr>'
+        f'<pic:blipFill><a:blip xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" r:embed="{rid}"/>'
+        '<a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+        f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+        '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr>'
+        "</pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing>")
+    out = f'<w:p><w:pPr><w:jc w:val="center"/></w:pPr><w:r>{drawing}</w:r></w:p>'
+    if node.caption:
+        out += _docx_paragraph(Paragraph(node.caption, italic=True, size=9, align="center"))
+    return out
+
+
+def docx_body(doc: DocModel) -> tuple:
+    """(XML treści w:body, media) — media jak w DocxTemplate.render_to."""
+    parts, media = [], []
+    for node in doc.nodes:
+        if isinstance(node, Chart):
+            node = Figure(chart_png(node.chart), node.width_mm, node.height_mm, node.caption)
+        if isinstance(node, Heading):
+            style = _HEADING_STYLES.get(node.level, "Heading3")
+            parts.append(f'<w:p><w:pPr><w:pStyle w:val="{style}"/></w:pPr>{_docx_runs(node.text, "")}</w:p>')
+        elif isinstance(node, Paragraph):
+            parts.append(_docx_paragraph(node))
+        elif isinstance(node, KpiTable):
+            parts.append(_docx_table(node))
+        elif isinstance(node, Figure):
+            n = len(media) + 1
+            rid = f"rIdPI{n}"
+            media.append((rid, f"media/rysunek{n}.{_image_ext(node.png)}", node.png))
+            parts.append(_docx_figure(node, rid, n))
+    return "".join(parts), media
+
+
+def write_docx(doc: DocModel, fp):
+    body, media = docx_body(doc)
+    docx_template("body").render_to(fp, {"body": body}, media)
+
+
+# ===== BACKEND: PDF (reportlab) =====
+def write_pdf(doc: DocModel, fp):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import ImageReader, simpleSplit
+    from reportlab.pdfgen import canvas
+
+    regular, bold_font = pdf_fonts()
+    c = canvas.Canvas(fp, pagesize=A4, invariant=1)
+    c.setTitle(doc.title)
+    c.setAuthor(EXPERT["company"])
+    w, h = A4
+    left, right, top, bottom = 20*mm, w - 20*mm, h - 20*mm, 20*mm
+    y = top
+
+    def need(height):
+        nonlocal y
+        if y - height < bottom:
+            c.showPage()
+            y = top
+
+    def text_block(text, font, size, align="left", gap_after=1.5*mm):
+        nonlocal y
+        lh = size * 1.35
+        lines = []
+        for raw in text.split("\n"):
+            lines += simpleSplit(raw, font, size, right - left) or [""]
+        for line in lines:
+            need(lh)
+            y -= lh
+            c.setFont(font, size)
+            if align == "right":
+                c.drawRightString(right, y, line)
+            elif align == "center":
+                c.drawCentredString((left + right) / 2, y, line)
+            else:
+                c.drawString(left, y, line)
+        y -= gap_after
+
+    for node in doc.nodes:
+        if isinstance(node, Heading):
+            size = HEADING_SIZES.get(node.level, BASE_SIZE)
+            need(size * 3)
+            y -= 3*mm
+            text_block(node.text, bold_font, size, "center" if node.level == 0 else "left", 2*mm)
+        elif isinstance(node, Paragraph):
+            size = node.size or BASE_SIZE
+            if not node.text:
+                y -= size * 0.8
+                continue
+            text_block(node.text, bold_font if node.bold else regular, size, node.align)
+        elif isinstance(node, KpiTable):
+            row_h = BASE_SIZE * 1.8
+            col = left + (right - left) * 0.6
+            need(row_h * len(node.rows) + 3*mm)
+            for label, value in node.rows:
+                c.rect(left, y - row_h, right - left, row_h)
+                c.line(col, y - row_h, col, y)
+                c.setFont(regular, BASE_SIZE)
+                c.drawString(left + 2*mm, y - row_h + 0.55*BASE_SIZE, str(label))
+                c.setFont(bold_font, BASE_SIZE)
+                c.drawString(col + 2*mm, y - row_h + 0.55*BASE_SIZE, str(value))
+                y -= row_h
+            y -= 3*mm
+        elif isinstance(node, Figure):
+            fw, fh = node.width_mm * mm, node.height_mm * mm
+            need(fh + 8*mm)
+            y -= fh
+            c.drawImage(ImageReader(io.BytesIO(node.png)), (left + right - fw) / 2, y, width=fw, height=fh, mask="auto")
+            y -= 2*mm
+            if node.caption:
+                text_block(node.caption, regular, 9, "center")
+        elif isinstance(node, Chart):
+            fw, fh = node.width_mm * mm, node.height_mm * mm
+            need(fh + 8*mm)
+            y -= fh
+            draw_on_canvas(node.chart, c, (left + right - fw) / 2, y, fw, fh)
+            y -= 2*mm
+            if node.caption:
+                text_block(node.caption, regular, 9, "center")
+    c.showPage()
+    c.save()
+
+
+# ===== BACKEND: HTML =====
+_HTML_STYLE = ("body{font-family:'Times New Roman',Times,serif;font-size:11pt;max-width:820px;margin:2em auto;padding:0 1em;color:#111}"
+               "h1{text-align:center;font-size:16pt}h2{font-size:13pt}h3{font-size:11.5pt}p{margin:.3em 0}"
+               "table{border-collapse:collapse;margin:.6em 0}td{border:1px solid #888;padding:4px 10px}"
+               "figure{text-align:center;margin:1em 0}figcaption{font-style:italic;font-size:9pt}")
+
+
+def to_html(doc: DocModel) -> str:
+    out = [f'<!doctype html><html lang="pl"><head><meta charset="utf-8"><title>{html.escape(doc.title)}</title>'
+           f"<style>{_HTML_STYLE}</style></head><body>"]
+    for node in doc.nodes:
+        if isinstance(node, Heading):
+            tag = f"h{min(node.level + 1, 6)}"
+            out.append(f"<{tag}>{html.escape(node.text)}</{tag}>")
+        elif isinstance(node, Paragraph):
+            style = []
+            if node.align != "left":
+                style.append(f"text-align:{node.align}")
+            if node.size:
+                style.append(f"font-size:{node.size:g}pt")
+            if node.bold:
+                style.append("font-weight:bold")
+            if node.italic:
+                style.append("font-style:italic")
+            attr = f' style="{";".join(style)}"' if style else ""
+            text = "<br>".join(html.escape(line) for line in node.text.split("\n")) or "&nbsp;"
+            out.append(f"<p{attr}>{text}</p>")
+        elif isinstance(node, KpiTable):
+            rows = "".join(f"<tr><td>{html.escape(str(a))}</td><td><b>{html.escape(str(b))}</b></td></tr>" for a, b in node.rows)
+            out.append(f"<table>{rows}</table>")
+        elif isinstance(node, Figure):
+            src = f"data:image/{_image_ext(node.png)};base64," + base64.b64encode(node.png).decode("ascii")
+            cap = f"<figcaption>{html.escape(node.caption)}</figcaption>" if node.caption else ""
+            out.append(f'<figure><img src="{src}" style="width:{node.width_mm:g}mm" alt="{html.escape(node.caption)}">{cap}</figure>')
+        elif isinstance(node, Chart):
+            cap = f"<figcaption>{html.escape(node.caption)}</figcaption>" if node.caption else ""
+            out.append(f'<figure><div style="width:{node.width_mm:g}mm;margin:auto">{chart_svg(node.chart)}</div>{cap}</figure>')
+    out.append("</body></html>")
+    return "".join(out)
+
+
+def write_html(doc: DocModel, fp):
+    fp.write(to_html(doc).encode("utf-8"))
+
+
+# ===== WSZYSTKIE FORMATY =====
+SERIALIZERS = {"docx": write_docx, "pdf": write_pdf, "html": write_html}
+
+
+def write_all_zip(doc: DocModel, fp, basename: str = "PROF_INSTAL_opinia"):
+    """Jedno drzewo → DOCX, PDF i HTML w jednym archiwum ZIP (stała kolejność i daty)."""
+    with zipfile.ZipFile(fp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for kind, write in SERIALIZERS.items():
+            bio = io.BytesIO()
+            write(doc, bio)
+            zf.writestr(zipfile.ZipInfo(f"{basename}.{kind}", date_time=ZIP_DATE), bio.getvalue(),
+                        compress_type=zipfile.ZIP_DEFLATED)
+
+
+WRITERS = {**SERIALIZERS, "zip": write_all_zip}
+MIMETYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+    "html": "text/html; charset=utf-8",
+    "zip": "application/zip",
+}
+DOWNLOAD_NAMES = {kind: f"PROF_INSTAL_opinia.{kind}" for kind in WRITERS}
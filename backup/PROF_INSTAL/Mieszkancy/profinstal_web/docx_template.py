@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — szybkie wypełnianie szablonów DOCX na poziomie XML
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Szablon (.docx zbudowany raz, np. przez python-docx) wczytywany jest do pamięci:
+wszystkie części archiwum poza word/document.xml są raz skompresowane i przy
+każdym dokumencie kopiowane bez zmian (kompresja tylko document.xml),
+a w document.xml podmieniane są tylko znaczniki:
+    {{pole}}   — wartość tekstowa (escapowana jako XML),
+    {{*pole}}  — cały akapit powtarzany dla każdego elementu listy (pusta lista usuwa akapit),
+    {{!pole}}  — cały akapit zastępowany gotowym XML (np. treść z docmodel.py).
+Do dokumentu można dołączyć obrazy (media) — relacje i typy zawartości są dopisywane.
+Znacznik musi leżeć w jednym przebiegu (w:r) — tak jest w szablonach budowanych
+przez python-docx; przy edycji w Wordzie trzeba pilnować, by go nie rozbić.
+"""
+import io
+import re
+import struct
+import zipfile
+import zlib
+from xml.sax.saxutils import escape
+
+DOCUMENT_PART = "word/document.xml"
+RELS_PART = "word/_rels/document.xml.rels"
+TYPES_PART = "[Content_Types].xml"
+IMAGE_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+ZIP_DATE = (2025, 1, 1, 0, 0, 0)  # stała data wpisów archiwum → identyczne bajty dla identycznych danych
+
+_FIELD = re.compile(r"\{\{([*!]?)(\w+)\}\}")
+# akapit zawierający znacznik powtarzania / bloku XML (bez zagnieżdżonych w:p)
+_BLOCK_PARAGRAPH = re.compile(r"<w:p[ >](?:(?!<w:p[ >]).)*?\{\{([*!])(\w+)\}\}(?:(?!<w:p[ >]).)*?</w:p>", re.S)
+
+
+# nagłówki ZIP (APPNOTE 4.3.7 / 4.3.12 / 4.3.16)
+_LOCAL = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL = struct.Struct("<4s4B4HL2L5H2L")
+_END = struct.Struct("<4s4H2LH")
+
+
+def _deflate(data: bytes, level: int) -> bytes:
+    c = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return c.compress(data) + c.flush()
+
+
+def _dos_time(date_time) -> tuple:
+    y, mo, d, h, mi, s = date_time
+    return (h << 11) | (mi << 5) | (s // 2), ((y - 1980) << 9) | (mo << 5) | d
+
+
+class DocxTemplate:
+    """Szablon DOCX skompilowany do listy fragmentów XML i pól."""
+
+    def __init__(self, data: bytes, compresslevel: int = 6):
+        self.compresslevel = compresslevel
+        # (nazwa, CRC, rozmiar, skompresowane bajty) — w kolejności z szablonu; document.xml jako None
+        self._parts = []
+        self._raw = {}  # relacje i typy zawartości — zmieniane tylko, gdy dokument ma obrazy
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            for info in zf.infolist():
+                body = zf.read(info)
+                if info.filename == DOCUMENT_PART:
+                    self._compile(body.decode("utf-8"))
+                    self._parts.append((info.filename, None, None, None))
+                    continue
+                if info.filename in (RELS_PART, TYPES_PART):
+                    self._raw[info.filename] = body.decode("utf-8")
+                self._parts.append(self._entry(info.filename, body))
+        if not hasattr(self, "_segments"):
+            raise ValueError(f"Szablon nie zawiera {DOCUMENT_PART}")
+
+    @classmethod
+    def from_path(cls, path: str, **kw) -> "DocxTemplate":
+        with open(path, "rb") as f:
+            return cls(f.read(), **kw)
+
+    def _entry(self, name: str, body: bytes) -> tuple:
+        return name, zlib.crc32(body), len(body), _deflate(body, self.compresslevel)
+
+    def _compile(self, xml: str):
+        """Dzieli document.xml na: tekst stały, ('v', pole), ('p', pole, przed, po) i ('x', pole)."""
+        segments = []
+        pos = 0
+        for m in _BLOCK_PARAGRAPH.finditer(xml):
+            segments += self._split_fields(xml[pos:m.start()])
+            kind, name = m.group(1), m.group(2)
+            if kind == "!":
+                segments.append(("x", name))
+            else:
+                before, after = m.group(0).split("{{*" + name + "}}", 1)
+                segments.append(("p", name, before, after))
+            pos = m.end()
+        segments += self._split_fields(xml[pos:])
+        self._segments = segments
+        self.fields = sorted({s[1] for s in segments if isinstance(s, tuple)})
+
+    @staticmethod
+    def _split_fields(xml: str) -> list:
+        out = []
+        pos = 0
+        for m in _FIELD.finditer(xml):
+            if m.group(1):
+                raise ValueError(f"Znacznik {m.group(0)} poza własnym akapitem")
+            out.append(xml[pos:m.start()])
+            out.append(("v", m.group(2)))
+            pos = m.end()
+        out.append(xml[pos:])
+        return [s for s in out if s != ""]
+
+    def render_xml(self, values: dict) -> str:
+        """Treść word/document.xml z podstawionymi wartościami (brak pola → KeyError)."""
+        out = []
+        for seg in self._segments:
+            if isinstance(seg, str):
+                out.append(seg)
+            elif seg[0] == "v":
+                out.append(escape(str(values[seg[1]])))
+            elif seg[0] == "x":
+                out.append(values[seg[1]])
+            else:
+                _, name, before, after = seg
+                for line in values[name]:
+                    out.append(before + escape(str(line)) + after)
+        return "".join(out)
+
+    def _media_entries(self, media) -> tuple:
+        """Relacje, typy zawartości i części obrazów dla media = [(rId, 'media/x.png', bajty), ...]."""
+        rels = "".join(f'<Relationship Id="{rid}" Type="{IMAGE_REL}" Target="{target}"/>' for rid, target, _ in media)
+        types = self._raw[TYPES_PART]
+        for ext in sorted({target.rsplit(".", 1)[-1].lower() for _, target, _ in media}):
+            if f'Extension="{ext}"' not in types:
+                ctype = "image/jpeg" if ext in ("jpg", "jpeg") else f"image/{ext}"
+                types = types.replace("</Types>", f'<Default Extension="{ext}" ContentType="{ctype}"/></Types>')
+        changed = {RELS_PART: self._raw[RELS_PART].replace("</Relationships>", rels + "</Relationships>"),
+                   TYPES_PART: types}
+        extra = [(f"word/{target}", body) for _, target, body in media]
+        return changed, extra
+
+    def render_to(self, fp, values: dict, media=()):
+        """
+        Zapisuje wypełniony dokument do pliku lub strumienia fp (wystarczy write —
+        rozmiary znane są z góry, więc strumień nie musi być przewijalny).
+        """
+        document = self.render_xml(values).encode("utf-8")
+        parts = self._parts
+        if media:
+            changed, extra = self._media_entries(media)
+            parts = [self._entry(p[0], changed[p[0]].encode("utf-8")) if p[0] in changed else p for p in parts]
+            parts += [self._entry(name, body) for name, body in extra]
+        dtime, ddate = _dos_time(ZIP_DATE)
+        central = []
+        offset = 0
+        for name, crc, size, packed in parts:
+            if packed is None:
+                crc, size, packed = zlib.crc32(document), len(document), _deflate(document, self.compresslevel)
+            name = name.encode("utf-8")
+            header = _LOCAL.pack(b"PK\x03\x04", 20, 0, 0, zipfile.ZIP_DEFLATED, dtime, ddate,
+                                 crc, len(packed), size, len(name), 0)
+            fp.write(header + name)
+            fp.write(packed)
+            central.append(_CENTRAL.pack(b"PK\x01\x02", 20, 0, 20, 0, 0, zipfile.ZIP_DEFLATED, dtime, ddate,
+                                         crc, len(packed), size, len(name), 0, 0, 0, 0, 0, offset) + name)
+            offset += len(header) + len(name) + len(packed)
+        cd = b"".join(central)
+        fp.write(cd)
+        fp.write(_END.pack(b"PK\x05\x06", 0, 0, len(central), len(central), len(cd), offset, 0))
+
+    def render(self, values: dict, media=()) -> bytes:
+        bio = io.BytesIO()
+        self.render_to(bio, values, media)
+        return bio.getvalue()
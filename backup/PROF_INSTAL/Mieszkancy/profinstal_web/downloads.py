@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — wysyłanie wygenerowanych dokumentów o ograniczonym zużyciu pamięci
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Dokument zapisywany jest do SpooledTemporaryFile: małe pliki zostają w pamięci,
+większe (powyżej progu) przechodzą na dysk. Odpowiedź czyta plik kawałkami,
+ma Content-Length i obsługuje nagłówek Range (wznawianie / pobieranie części).
+"""
+import os
+import tempfile
+import threading
+
+from flask import current_app, request
+from werkzeug.wsgi import wrap_file
+
+SPOOL_THRESHOLD = int(os.environ.get("PROFINSTAL_SPOOL_THRESHOLD", str(1 << 20)))  # B — powyżej: plik na dysku (0 = zawsze dysk)
+SPOOL_DIR = os.environ.get("PROFINSTAL_SPOOL_DIR") or None  # None → katalog tymczasowy systemu
+CHUNK_SIZE = 64 * 1024
+
+_stats = {"memory": 0, "disk": 0, "bytes": 0}
+_stats_lock = threading.Lock()
+
+
+def spool(write, threshold: int | None = None):
+    """
+    Wywołuje write(fp) na pliku tymczasowym i zwraca go przewiniętego na początek.
+    Przy błędzie plik jest zamykany (i usuwany), a wyjątek przekazywany dalej.
+    """
+    limit = SPOOL_THRESHOLD if threshold is None else threshold
+    if limit > 0:
+        fp = tempfile.SpooledTemporaryFile(max_size=limit, dir=SPOOL_DIR)
+    else:
+        fp = tempfile.TemporaryFile(dir=SPOOL_DIR)
+    try:
+        write(fp)
+    except BaseException:
+        fp.close()
+        raise
+    size = fp.seek(0, os.SEEK_END)
+    fp.seek(0)
+    with _stats_lock:
+        _stats["disk" if limit <= 0 or size > limit else "memory"] += 1
+        _stats["bytes"] += size
+    return fp
+
+
+def send_spooled(fp, download_name: str, mimetype: str):
+    """
+    Odpowiedź Flask z pliku z spool(): strumień kawałkami po CHUNK_SIZE,
+    Content-Length, Accept-Ranges / 206 Partial Content. Plik zamykany po wysłaniu.
+    """
+    size = fp.seek(0, os.SEEK_END)
+    fp.seek(0)
+    rv = current_app.response_class(wrap_file(request.environ, fp, CHUNK_SIZE),
+                                    mimetype=mimetype, direct_passthrough=True)
+    rv.headers.set("Content-Disposition", "attachment", filename=download_name)
+    rv.content_length = size
+    rv.cache_control.no_cache = True
+    try:
+        return rv.make_conditional(request.environ, accept_ranges=True, complete_length=size)
+    except Exception:
+        fp.close()
+        raise
+
+
+def download_stats() -> dict:
+    with _stats_lock:
+        return {"threshold": SPOOL_THRESHOLD, **_stats}
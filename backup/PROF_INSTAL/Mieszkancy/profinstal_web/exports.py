@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — generowanie dokumentów (DOCX / PDF) z wyniku compute_all
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Funkcje nie zależą od Flaska (tylko od słownika wyniku), więc mogą być
+wywoływane w trasie, w puli procesów (jobs.py) albo z linii poleceń.
+python-docx i reportlab importowane są leniwie — brak modułu zgłasza ImportError.
+Dokumenty DOCX powstają z szablonów (docx_template.py): python-docx buduje
+szablon ze znacznikami raz na proces, kolejne dokumenty to tylko podmiana pól w XML.
+"""
+import io
+import os
+import threading
+from datetime import date, datetime
+
+from docx_template import DocxTemplate
+from fonts import pdf_fonts
+
+DOCX_MISSING = "Brak modułu python-docx. Zainstaluj: pip install python-docx"
+PDF_MISSING = "Brak modułu reportlab. Zainstaluj: pip install reportlab"
+
+# Nota prawna — jak w aplikacji Tkinter (Dla_mieszkancow.py)
+COPYRIGHT_NOTICE = """
+© 2025 PROF INSTAL Maciej Ślusarczyk. Wszelkie prawa zastrzeżone.
+
+Niniejsze oprogramowanie i jego kod źródłowy są własnością intelektualną 
+PROF INSTAL Maciej Ślusarczyk. Kopiowanie, dystrybucja, modyfikacja lub 
+wykorzystanie w celach komercyjnych bez pisemnej zgody autora jest zabronione.
+
+Kontakt: prof.instal@example.com
+"""
+
+# Wersja treści i układu dokumentów — zmiana unieważnia pamięć podręczną dokumentów (doccache.py)
+TEMPLATE_VERSION = "2025.4"
+# Stała data metadanych DOCX/PDF — te same dane dają te same bajty dokumentu
+DOC_DATE = datetime(2025, 1, 1)
+
+# Dane eksperta (jak EXPERT w aplikacji Tkinter)
+EXPERT = {
+    "name": "mgr inż. Maciej Ślusarczyk",
+    "title": "Ekspert HVAC / instalacje sanitarne",
+    "lic": "Uprawnienia budowlane bez ograniczeń, nr XXX/XX/XX",
+    "chamber": "Członek Małopolskiej OIIB",
+    "contact": "kontakt@profinstal.info | +48 123 456 789",
+    "company": "PROF INSTAL",
+    "city": "Kraków"
+}
+
+# Domyślne strony pisma (klucze jak App._collect_parties w aplikacji Tkinter)
+PARTY_DEFAULTS = {
+    "r_name": "Jan Kowalski", "r_addr": "", "r_email": "", "r_phone": "", "flatid": "",
+    "a_name": "Spółdzielnia Mieszkaniowa XYZ", "a_addr": "", "a_email": "", "a_nip": "",
+}
+
+MIMETYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+DOWNLOAD_NAMES = {
+    "docx": "PROF_INSTAL_wynik.docx",
+    "pdf": "PROF_INSTAL_wynik.pdf",
+}
+
+
+# ===== SZABLONY DOCX =====
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def _as_fields(text: str) -> str:
+    """'{pole}' (str.format) → '{{pole}}' (znacznik szablonu DOCX)."""
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def docx_template(name: str) -> DocxTemplate:
+    """Szablon DOCX z rejestru TEMPLATE_BUILDERS — budowany raz na proces."""
+    tpl = _templates.get(name)
+    if tpl is None:
+        with _templates_lock:
+            tpl = _templates.get(name)
+            if tpl is None:
+                bio = io.BytesIO()
+                TEMPLATE_BUILDERS[name](bio)
+                tpl = _templates[name] = DocxTemplate(bio.getvalue())
+    return tpl
+
+
+# ===== SKRÓT WYNIKU =====
+RESULT_DOCX_LINES = [
+    "Data: {today}",
+    "Rachunek: {bill} zł/m³; Cena ciepła brutto: {price_GJ_brutto} zł/GJ; ΔT: {dT}°C",
+    "Q_teor: {q_per_m3} GJ/m³ → koszt_teor: {cost_theor} zł/m³; η: {eta_pct}%",
+    "Strata: {loss_per_m3} zł/m³; Budynek: {loss_build_m} zł/m-c; {loss_build_y} zł/rok",
+]
+
+
+def result_fields(res: dict, today: str | None = None) -> dict:
+    """Sformatowane wartości wyniku do szablonów dokumentów."""
+    return {
+        "today": today or date.today().isoformat(),
+        "bill": f"{res['bill']:.2f}", "price_GJ_brutto": f"{res['price_GJ_brutto']:.2f}", "dT": f"{res['dT']:.0f}",
+        "q_per_m3": f"{res['q_per_m3']:.5f}", "cost_theor": f"{res['cost_theor']:.2f}", "eta_pct": f"{res['eta']*100:.1f}",
+        "loss_per_m3": f"{res['loss_per_m3']:.2f}", "loss_build_m": f"{res['loss_build_m']:,.2f}",
+        "loss_build_y": f"{res['loss_build_y']:,.2f}",
+    }
+
+
+def _fixed_core_properties(doc):
+    doc.core_properties.created = DOC_DATE
+    doc.core_properties.modified = DOC_DATE
+    doc.core_properties.author = EXPERT["company"]
+
+
+def _build_result_template(fp):
+    """Szablon skrótu wyniku (python-docx, znaczniki zamiast liczb)."""
+    from docx import Document
+
+    doc = Document()
+    _fixed_core_properties(doc)
+    p = doc.add_paragraph()
+    r = p.add_run("PROF INSTAL — wynik obliczeń (skrót)\n")
+    r.bold = True
+    for line in RESULT_DOCX_LINES:
+        doc.add_paragraph(_as_fields(line))
+    doc.save(fp)
+
+
+def write_result_docx(res: dict, fp, today: str | None = None):
+    """Zapisuje skrót wyniku jako DOCX do pliku lub strumienia fp."""
+    docx_template("result").render_to(fp, result_fields(res, today))
+
+
+def write_result_pdf(res: dict, fp, today: str | None = None):
+    """Zapisuje skrót wyniku jako PDF do pliku lub strumienia fp."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import mm
+
+    today = today or date.today().isoformat()
+    regular, bold_font = pdf_fonts()
+    c = canvas.Canvas(fp, pagesize=A4, invariant=1)
+    w, h = A4
+    x, y = 20*mm, h - 20*mm
+    lh = 6*mm
+    def writeln(text, bold=False, size=10):
+        nonlocal y
+        c.setFont(bold_font if bold else regular, size)
+        c.drawString(x, y, text); y -= lh
+
+    writeln("PROF INSTAL — wynik obliczeń (skrót)", bold=True)
+    writeln(f"Data: {today}")
+    writeln(f"Rachunek: {res['bill']:.2f} zł/m³ | Ciepło brutto: {res['price_GJ_brutto']:.2f} zł/GJ | ΔT: {res['dT']:.0f}°C")
+    writeln(f"Q_teor: {res['q_per_m3']:.5f} GJ/m³ → koszt_teor: {res['cost_theor']:.2f} zł/m³ | η: {res['eta']*100:.1f}%")
+    writeln(f"Strata: {res['loss_per_m3']:.2f} zł/m³ | Budynek: {res['loss_build_m']:,.2f} zł/m-c; {res['loss_build_y']:,.2f} zł/rok")
+    c.showPage(); c.save()
+
+
+# ===== PISMO REKLAMACYJNE MIESZKAŃCA =====
+LETTER_TEXT = [
+    "Jako mieszkaniec ({flatid}) składam reklamację w zakresie kosztów podgrzewu CWU. "
+    "Na podstawie niezależnej opinii eksperckiej PROF INSTAL wyliczona sprawność instalacji wspólnej "
+    "wynosi około {eta_pct}%. Realny koszt podgrzania 1 m³ powinien wynosić ok. "
+    "{cost_theor} zł/m³, podczas gdy na rachunku płacę {bill} zł/m³.",
+    "Różnica (moja strata) to {loss_per_m3} zł na każdym m³. Przy miesięcznym zużyciu "
+    "{month_m3} m³ daje to {loss_flat_m} zł/miesiąc. To są pieniądze, które wypływają, "
+    "bo instalacja po stronie zarządcy nie działa wystarczająco sprawnie.",
+    "Żądam uwzględnienia reklamacji, przedstawienia planu naprawczego (izolacje, regulacja/równoważenie cyrkulacji, "
+    "przegląd i korekta nastaw węzła) oraz korekty rozliczeń tak, aby nie obciążać mieszkańców kosztami strat. "
+    "Proszę o pisemną odpowiedź w terminie 14 dni.",
+]
+
+
+def letter_fields(res: dict, parties: dict, today: str | None = None) -> dict:
+    """Wartości pól pisma (tekst + listy linii nadawcy i adresata)."""
+    P = {**PARTY_DEFAULTS, **parties}
+    sender, addressee = _address_lines(P)
+    return {
+        **result_fields(res, today),
+        "flatid": P["flatid"], "r_name": P["r_name"],
+        "month_m3": f"{res['month_m3']:.2f}", "loss_flat_m": f"{res['loss_flat_m']:.2f}",
+        "sender": sender, "addressee": addressee,
+    }
+
+
+def letter_paragraphs(res: dict, parties: dict) -> list:
+    """Treść pisma reklamacyjnego (akapity) — wspólna dla DOCX i PDF."""
+    fields = letter_fields(res, parties)
+    return [text.format(**fields) for text in LETTER_TEXT]
+
+LETTER_TITLE = "Reklamacja dotycząca zawyżonych kosztów podgrzania ciepłej wody użytkowej"
+LETTER_LOGO = os.environ.get("PROFINSTAL_LOGO")  # opcjonalne logo w nagłówku pism PDF (ścieżka do PNG)
+LETTER_LOGO_PX = round(20 / 25.4 * 300)  # 20 mm przy 300 dpi — jak cel "pdf" w ../../logo_assets.py
+_logo = None  # logo przeskalowane raz na proces (preload: przed fork); b"" = brak
+LETTER_FOOTER = "Analiza wykonana przy użyciu: PROF INSTAL - Dla Mieszkańców © 2025 Maciej Ślusarczyk"
+
+
+def _address_lines(P: dict) -> tuple:
+    sender = [P["r_name"], P["r_addr"]]
+    if P["r_email"] or P["r_phone"]:
+        sender.append(f"{P['r_email']} | {P['r_phone']}")
+    addressee = [P["a_name"], P["a_addr"]]
+    if P["a_email"]:
+        addressee.append(P["a_email"])
+    if P["a_nip"]:
+        addressee.append(f"NIP: {P['a_nip']}")
+    return sender, addressee
+
+
+def _build_letter_template(fp):
+    """Szablon pisma reklamacyjnego — układ jak App._gen_resident_letter_docx."""
+    from docx import Document
+    from docx.shared import Pt
+    from docx.oxml.ns import qn
+
+    doc = Document()
+    _fixed_core_properties(doc)
+    style = doc.styles["Normal"]
+    style.font.name = "Times New Roman"
+    style._element.rPr.rFonts.set(qn('w:eastAsia'), 'Times New Roman')
+    style.font.size = Pt(11)
+
+    copyright_run = doc.add_paragraph().add_run(COPYRIGHT_NOTICE)
+    copyright_run.font.size = Pt(8)
+    copyright_run.italic = True
+    doc.add_paragraph("")
+
+    doc.add_paragraph("{{*sender}}")
+    doc.add_paragraph("")
+    doc.add_paragraph("{{*addressee}}")
+    doc.add_paragraph("")
+    doc.add_paragraph("Data: {{today}}")
+    doc.add_paragraph("")
+    doc.add_heading(LETTER_TITLE, 0)
+    for text in LETTER_TEXT:
+        doc.add_paragraph(_as_fields(text))
+    doc.add_paragraph("")
+    doc.add_paragraph("Z poważaniem,")
+    doc.add_paragraph("{{r_name}}")
+    doc.add_paragraph("")
+    doc.add_paragraph("Na żądanie udostępnię pełną opinię eksperta PROF INSTAL z obliczeniami.")
+    doc.add_paragraph("")
+    footer_run = doc.add_paragraph().add_run(LETTER_FOOTER)
+    footer_run.font.size = Pt(8)
+    footer_run.italic = True
+    doc.save(fp)
+
+
+def _build_body_template(fp):
+    """Pusty dokument (Times New Roman 11 pt) z blokiem {{!body}} na treść z docmodel.py."""
+    from docx import Document
+    from docx.shared import Pt
+    from docx.oxml.ns import qn
+
+    doc = Document()
+    _fixed_core_properties(doc)
+    style = doc.styles["Normal"]
+    style.font.name = "Times New Roman"
+    style._element.rPr.rFonts.set(qn('w:eastAsia'), 'Times New Roman')
+    style.font.size = Pt(11)
+    doc.add_paragraph("{{!body}}")
+    doc.save(fp)
+
+
+def write_letter_docx(res: dict, parties: dict, fp, today: str | None = None):
+    """Pismo reklamacyjne mieszkańca (DOCX) do pliku lub strumienia fp."""
+    docx_template("letter").render_to(fp, letter_fields(res, parties, today))
+
+
+def _scaled_logo(path: str) -> bytes:
+    """Logo zmniejszone do LETTER_LOGO_PX (PNG przy przezroczystości, inaczej JPEG); bez PIL — oryginał."""
+    try:
+        from PIL import Image
+    except ImportError:
+        with open(path, "rb") as f:
+            return f.read()
+    with Image.open(path) as im:
+        im.load()
+        im.thumbnail((LETTER_LOGO_PX, LETTER_LOGO_PX), Image.LANCZOS)
+        transparent = im.mode in ("RGBA", "LA", "P") and im.convert("RGBA").getextrema()[3][0] < 255
+        out = io.BytesIO()
+        if transparent:
+            im.save(out, "PNG", optimize=True)
+        else:
+            im.convert("RGB").save(out, "JPEG", quality=90, optimize=True)
+        return out.getvalue()
+
+
+def _logo_data() -> bytes:
+    global _logo
+    if _logo is None:
+        data = b""
+        if LETTER_LOGO and os.path.exists(LETTER_LOGO):
+            data = _scaled_logo(LETTER_LOGO)
+        _logo = data
+    return _logo
+
+
+def _letterhead(c, w: float, h: float, font: str):
+    """Stała część strony pisma jako Form XObject — zapisana w PDF raz, wstawiana na każdej stronie."""
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import ImageReader
+
+    c.beginForm("letterhead")
+    c.setFont(font, 8)
+    c.drawString(20*mm, h - 20*mm, "© 2025 PROF INSTAL Maciej Ślusarczyk - Wszelkie prawa zastrzeżone")
+    c.drawString(20*mm, 15*mm, LETTER_FOOTER)
+    logo = _logo_data()
+    if logo:
+        c.drawImage(ImageReader(io.BytesIO(logo)), w - 40*mm, h - 30*mm, width=20*mm, height=20*mm, preserveAspectRatio=True, mask="auto")
+    c.endForm()
+
+
+def write_letters_pdf(items, fp, today: str | None = None) -> int:
+    """
+    Pisma reklamacyjne (PDF) dla par (wynik, strony) — strona na mieszkanie w jednym pliku.
+    Nagłówek, stopka i logo są jednym Form XObject, a czcionki jednym podzbiorem
+    dla całego pliku, więc każda kolejna strona to tylko jej własny tekst.
+    Zwraca liczbę pism.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import mm
+    from reportlab.lib.utils import simpleSplit
+
+    today = today or date.today().isoformat()
+    regular, bold_font = pdf_fonts()
+    c = canvas.Canvas(fp, pagesize=A4, invariant=1, pageCompression=1)
+    w, h = A4
+    _letterhead(c, w, h, regular)
+    x = 20*mm
+    lh = 6*mm
+    count = 0
+    for res, parties in items:
+        P = {**PARTY_DEFAULTS, **parties}
+        y = h - 20*mm - lh - 2*mm
+        def writeln(text, bold=False, size=10):
+            nonlocal y
+            font = bold_font if bold else regular
+            c.setFont(font, size)
+            for line in simpleSplit(text, font, size, w - 2*x) or [""]:
+                c.drawString(x, y, line); y -= lh
+
+        c.doForm("letterhead")
+        sender, addressee = _address_lines(P)
+        for line in sender:
+            writeln(line)
+        y -= 2*mm
+        for line in addressee:
+            writeln(line)
+        y -= 2*mm
+        writeln(f"Data: {today}"); y -= 2*mm
+        writeln(LETTER_TITLE, bold=True, size=12); y -= 2*mm
+        for par in letter_paragraphs(res, P):
+            writeln(par); y -= 2*mm
+        writeln("Z poważaniem,")
+        writeln(P["r_name"]); y -= 2*mm
+        writeln("Na żądanie udostępnię pełną opinię eksperta PROF INSTAL z obliczeniami.", size=9)
+        c.showPage()
+        count += 1
+    if not count:
+        c.showPage()
+    c.save()
+    return count
+
+
+def write_letter_pdf(res: dict, parties: dict, fp, today: str | None = None):
+    """Pismo reklamacyjne mieszkańca (PDF) — ta sama treść co wersja DOCX."""
+    write_letters_pdf([(res, parties)], fp, today)
+
+
+TEMPLATE_BUILDERS = {"result": _build_result_template, "letter": _build_letter_template,
+                     "body": _build_body_template}
+WRITERS = {"docx": write_result_docx, "pdf": write_result_pdf}
+LETTER_WRITERS = {"docx": write_letter_docx, "pdf": write_letter_pdf}
+
+
+def render_result(kind: str, res: dict, today: str | None = None) -> bytes:
+    """Generuje dokument danego rodzaju ("docx" / "pdf") i zwraca jego bajty."""
+    bio = io.BytesIO()
+    WRITERS[kind](res, bio, today)
+    return bio.getvalue()
+
+
+def render_letter(kind: str, res: dict, parties: dict, today: str | None = None) -> bytes:
+    """Generuje pismo reklamacyjne ("docx" / "pdf") i zwraca jego bajty."""
+    bio = io.BytesIO()
+    LETTER_WRITERS[kind](res, parties, bio, today)
+    return bio.getvalue()
+
+
+def preload():
+    """Importuje reportlab, rejestruje czcionki, wczytuje logo i buduje szablony DOCX z góry (proces roboczy puli, serwer przed fork)."""
+    _logo_data()
+    try:
+        __import__("reportlab.pdfgen.canvas")
+        pdf_fonts()
+    except ImportError:
+        pass
+    for name in TEMPLATE_BUILDERS:
+        try:
+            docx_template(name)
+        except ImportError:
+            pass
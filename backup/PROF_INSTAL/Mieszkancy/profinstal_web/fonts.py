@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — czcionki TTF dla dokumentów PDF (polskie znaki)
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Czcionki base-14 (Times-Roman) nie mają ł, ś, ź, ³ itd. Rodzina TTF jest
+wyszukiwana i rejestrowana w reportlab raz na proces; reportlab osadza w PDF
+tylko podzbiór glifów faktycznie użytych w dokumencie. Gdy żadnej rodziny
+nie ma w systemie, zostają czcionki base-14 (jak dawniej).
+
+Jedyna kopia modułu: importuje go też aplikacja Tk (../../Dla_mieszkancow.py
+dodaje ten katalog do sys.path, a pliki .spec — do pathex).
+"""
+import os
+import sys
+import threading
+
+# (nazwa w reportlab, plik zwykły, plik pogrubiony) — w kolejności preferencji
+FONT_FAMILIES = (
+    ("PI-TimesNewRoman", "times.ttf", "timesbd.ttf"),
+    ("PI-LiberationSerif", "LiberationSerif-Regular.ttf", "LiberationSerif-Bold.ttf"),
+    ("PI-DejaVuSerif", "DejaVuSerif.ttf", "DejaVuSerif-Bold.ttf"),
+    ("PI-DejaVuSans", "DejaVuSans.ttf", "DejaVuSans-Bold.ttf"),
+)
+FALLBACK = ("Times-Roman", "Times-Bold")
+
+_fonts = None
+_lock = threading.Lock()
+
+
+def font_dirs() -> list:
+    """Katalogi przeszukiwane po kolei: PROFINSTAL_FONT_DIR, ./fonts, czcionki systemowe."""
+    # PyInstaller rozpakowuje dane do sys._MEIPASS
+    base = getattr(sys, "_MEIPASS", None) or os.path.dirname(os.path.abspath(__file__))
+    dirs = [os.environ.get("PROFINSTAL_FONT_DIR"), os.path.join(base, "fonts")]
+    if sys.platform.startswith("win"):
+        dirs.append(os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"))
+    elif sys.platform == "darwin":
+        dirs += ["/Library/Fonts", "/System/Library/Fonts/Supplemental", os.path.expanduser("~/Library/Fonts")]
+    else:
+        dirs += ["/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts")]
+    return [d for d in dirs if d and os.path.isdir(d)]
+
+
+def _find(filename: str, dirs: list) -> str | None:
+    wanted = filename.lower()
+    for d in dirs:
+        for dirpath, _, files in os.walk(d):
+            for fn in files:
+                if fn.lower() == wanted:
+                    return os.path.join(dirpath, fn)
+    return None
+
+
+def _register() -> tuple:
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    dirs = font_dirs()
+    for name, regular, bold in FONT_FAMILIES:
+        reg_path, bold_path = _find(regular, dirs), _find(bold, dirs)
+        if not reg_path:
+            continue
+        try:
+            pdfmetrics.registerFont(TTFont(name, reg_path))
+            bold_name = name
+            if bold_path:
+                bold_name = f"{name}-Bold"
+                pdfmetrics.registerFont(TTFont(bold_name, bold_path))
+            pdfmetrics.registerFontFamily(name, normal=name, bold=bold_name, italic=name, boldItalic=bold_name)
+            return name, bold_name
+        except Exception:
+            continue
+    return FALLBACK
+
+
+def pdf_fonts() -> tuple:
+    """(czcionka zwykła, pogrubiona) dla reportlab — rejestracja tylko przy pierwszym wywołaniu."""
+    global _fonts
+    if _fonts is None:
+        with _lock:
+            if _fonts is None:
+                _fonts = _register()
+    return _fonts
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — konfiguracja gunicorn (pre-fork, aplikacja ładowana przed fork)
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+    gunicorn -c gunicorn.conf.py
+
+Liczby workerów i wątków z PROFINSTAL_WORKERS / PROFINSTAL_THREADS.
+Eksport DOCX/PDF obciąża CPU, więc domyślnie jeden worker na rdzeń;
+wątki obsługują w tym czasie lekkie żądania (strony, /api/calc).
+"""
+import os
+
+_APPS = {"web": "wsgi:web()", "mieszkancy": "wsgi:mieszkancy()"}
+
+wsgi_app = _APPS[os.environ.get("PROFINSTAL_APP", "web")]
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = os.environ.get("PROFINSTAL_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("PROFINSTAL_WORKERS", str(os.cpu_count() or 1)))
+threads = int(os.environ.get("PROFINSTAL_THREADS", "8"))  # > 1 → worker gthread; podział na bramki: admission.py
+preload_app = os.environ.get("PROFINSTAL_PRELOAD", "1") != "0"
+timeout = int(os.environ.get("PROFINSTAL_TIMEOUT", "120"))  # s — duże eksporty (ZIP pism)
+graceful_timeout = 30
+keepalive = 5
+# recykling workerów (0 = wyłączony); jitter, żeby nie restartowały się naraz
+max_requests = int(os.environ.get("PROFINSTAL_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
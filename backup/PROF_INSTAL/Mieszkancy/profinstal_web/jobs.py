@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — kolejka zadań eksportu (DOCX / PDF) w lokalnej puli procesów
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Trasa przyjmuje zlecenie i od razu zwraca identyfikator zadania; dokument
+powstaje w osobnym procesie, więc ciężki eksport nie blokuje wątku obsługującego
+/calc. Procesy robocze importują python-docx i reportlab przy starcie.
+Gotowe dokumenty zapisywane są bezpośrednio do plików w katalogu zadań
+(nie w pamięci serwera) i wysyłane przez send_file z obsługą Range.
+
+Rejestr zadań żyje w pamięci procesu serwera: przy kilku procesach (np.
+gunicorn --workers N) zapytanie o status trafiające do innego procesu dostaje
+404 — kolejkę eksportu uruchamiać z jednym procesem i wątkami
+(--workers 1 --threads N) albo z przyklejaniem sesji do procesu.
+"""
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from exports import WRITERS, preload
+
+EXPORT_WORKERS = int(os.environ.get("PROFINSTAL_EXPORT_WORKERS", "2"))
+JOB_TTL = float(os.environ.get("PROFINSTAL_EXPORT_JOB_TTL", "900"))  # s — jak długo trzymamy wynik
+MAX_JOBS = 256
+JOB_DIR = os.environ.get("PROFINSTAL_EXPORT_JOB_DIR") or None  # None → katalog tymczasowy tworzony przy starcie
+
+
+def render_to_file(kind: str, res: dict, path: str, today: str | None = None) -> int:
+    """Zapisuje dokument do pliku path (w procesie roboczym) i zwraca jego rozmiar."""
+    with open(path, "wb") as fp:
+        WRITERS[kind](res, fp, today)
+        return fp.tell()
+
+
+class ExportJobs:
+    """
+    Rejestr zadań eksportu. Pula procesów tworzona jest leniwie przy pierwszym
+    zleceniu (ważne przy serwerach pre-fork — pula nie może powstać przed fork).
+    """
+
+    def __init__(self, workers: int = EXPORT_WORKERS, ttl: float = JOB_TTL):
+        self.workers = workers
+        self.ttl = ttl
+        self._pool = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._dir = JOB_DIR
+
+    def executor(self) -> ProcessPoolExecutor:
+        """Wspólna pula procesów eksportu (tworzona przy pierwszym użyciu i po awarii)."""
+        with self._lock:
+            if self._pool is not None and getattr(self._pool, "_broken", False):
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=preload)
+            return self._pool
+
+    def _reset(self, pool: ProcessPoolExecutor):
+        """Zamyka uszkodzoną pulę (np. proces roboczy zabity przez OOM); następna powstanie od nowa."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _job_dir(self) -> str:
+        with self._lock:
+            if self._dir is None:
+                self._dir = tempfile.mkdtemp(prefix="profinstal-export-")
+            os.makedirs(self._dir, exist_ok=True)
+            return self._dir
+
+    @staticmethod
+    def _discard(job: dict):
+        try:
+            os.unlink(job["path"])
+        except OSError:
+            pass
+
+    def _purge(self):
+        now = time.time()
+        with self._lock:
+            old = [jid for jid, j in self._jobs.items()
+                   if j["finished"] and now - j["finished"] > self.ttl]
+            for jid in old:
+                self._discard(self._jobs.pop(jid))
+            while len(self._jobs) >= MAX_JOBS:
+                done = [jid for jid, j in self._jobs.items() if j["finished"]]
+                if not done:
+                    raise RuntimeError("Kolejka eksportu jest pełna")
+                self._discard(self._jobs.pop(min(done, key=lambda jid: self._jobs[jid]["finished"])))
+
+    def submit(self, kind: str, res: dict, today: str | None = None) -> str:
+        """Dodaje zadanie generowania dokumentu i zwraca jego identyfikator."""
+        self._purge()
+        job_id = uuid.uuid4().hex
+        path = os.path.join(self._job_dir(), f"{job_id}.{kind}")
+        job = {"id": job_id, "kind": kind, "created": time.time(), "finished": None,
+               "error": None, "path": path, "size": None, "future": None}
+        with self._lock:
+            self._jobs[job_id] = job
+        for retry in (True, False):
+            pool = self.executor()
+            try:
+                fut = pool.submit(render_to_file, kind, res, path, today)
+                break
+            except BrokenProcessPool:
+                self._reset(pool)
+                if not retry:
+                    with self._lock:
+                        self._jobs.pop(job_id, None)
+                    raise
+        job["future"] = fut
+        fut.add_done_callback(lambda f, job=job: self._on_done(job, f))
+        return job_id
+
+    def _on_done(self, job: dict, fut):
+        try:
+            job["size"] = fut.result()
+        except Exception as e:
+            job["error"] = f"{type(e).__name__}: {e}"
+        job["finished"] = time.time()
+
+    def get(self, job_id: str) -> dict | None:
+        return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> dict | None:
+        """
+        Stan zadania: queued → running → done / failed. Dokument powstaje jednym
+        wywołaniem w procesie roboczym, więc postęp jest zgrubny: 0, 0.5 albo 1.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        fut = job["future"]
+        if job["finished"]:
+            state = "failed" if job["error"] else "done"
+            progress = 1.0
+        elif fut is not None and fut.running():
+            state, progress = "running", 0.5
+        else:
+            state, progress = "queued", 0.0
+        out = {"id": job_id, "kind": job["kind"], "status": state, "progress": progress,
+               "created": job["created"], "finished": job["finished"]}
+        if job["error"]:
+            out["error"] = job["error"]
+        if job["size"] is not None:
+            out["size"] = job["size"]
+        return out
+
+    def stats(self) -> dict:
+        states = [self.status(jid)["status"] for jid in list(self._jobs)]
+        return {"workers": self.workers, "jobs": len(states),
+                **{s: states.count(s) for s in ("queued", "running", "done", "failed")}}
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            for job in self._jobs.values():
+                self._discard(job)
+            self._jobs.clear()
+
+
+EXPORT_JOBS = ExportJobs()
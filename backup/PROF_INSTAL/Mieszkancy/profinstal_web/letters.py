@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — masowe pisma reklamacyjne (jedno na mieszkanie) jako strumień ZIP
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Lista mieszkańców (CSV / NDJSON: name, address, flat_id, month_m3, opcjonalnie
+email, phone) jest czytana strumieniowo, pisma generowane równolegle w puli
+procesów eksportu, a gotowe pliki od razu dopisywane do archiwum ZIP wysyłanego
+klientowi. W pamięci jest tylko kilka pism naraz (okno zadań w locie).
+Alternatywnie combined_letters_pdf składa wszystkie pisma w jeden PDF do druku
+(strona na mieszkanie, wspólne czcionki i nagłówek).
+
+Użycie z linii poleceń:
+    python letters.py mieszkancy.csv pisma.zip --bill 49 --heat-price 73.69 --units 65
+    python letters.py mieszkancy.csv pisma.pdf --combined
+"""
+import re
+import zipfile
+from collections import deque
+from datetime import date
+
+from batch_io import STREAM_ERRORS
+from cache import cached_compute_all
+from exports import render_letter, write_letters_pdf
+
+# Nazwy kolumn listy mieszkańców → klucze stron pisma (exports.PARTY_DEFAULTS)
+RESIDENT_COLUMNS = {"name": "r_name", "address": "r_addr", "flat_id": "flatid",
+                    "email": "r_email", "phone": "r_phone"}
+ADDRESSEE_KEYS = ("a_name", "a_addr", "a_email", "a_nip")
+
+
+class _ZipSink:
+    """Nieprzewijalny bufor dla zipfile — zbiera zapisane bajty do oddania klientowi."""
+
+    def __init__(self):
+        self._parts = []
+        self._pos = 0
+
+    def write(self, b):
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _safe_name(s: str) -> str:
+    return re.sub(r"[^0-9A-Za-z._-]+", "_", s).strip("_")[:60] or "lokal"
+
+
+def letter_tasks(residents, building: dict, addressee: dict):
+    """
+    Generator (nazwa_pliku, wynik_compute_all, strony) albo (nazwa, None, błąd)
+    dla kolejnych mieszkańców. building: bill, heat_price, unit, vat, units, dT.
+    """
+    for i, rec in enumerate(residents, start=1):
+        parties = {key: str(rec.get(col) or "").strip() for col, key in RESIDENT_COLUMNS.items()}
+        parties.update({k: v for k, v in addressee.items() if k in ADDRESSEE_KEYS})
+        name = f"{i:04d}_{_safe_name(parties['flatid'] or parties['r_name'])}"
+        try:
+            if "_error" in rec:
+                raise ValueError(rec["_error"])
+            res = cached_compute_all(building["bill"], building["heat_price"], building.get("unit", "GJ"),
+                                     building.get("vat", 23.0), rec["month_m3"], building["units"], building["dT"])
+        except (KeyError, TypeError, ValueError) as e:
+            yield name, None, f"{type(e).__name__}: {e}"
+            continue
+        yield name, res, parties
+
+
+def iter_letters_zip(tasks, kind: str, executor=None, window: int = 8, today: str | None = None):
+    """
+    Generator kawałków archiwum ZIP z pismami. executor — pula (np. procesów);
+    bez niej pisma generowane są po kolei w bieżącym wątku. Kolejność plików
+    w archiwum odpowiada kolejności mieszkańców; błędne wiersze trafiają do BLEDY.txt.
+    Błąd odczytu listy (STREAM_ERRORS, np. zły UTF-8) kończy ją: pisma przeczytanych
+    wierszy są dopisywane, błąd trafia do BLEDY.txt, a archiwum jest poprawnie zamykane.
+    """
+    today = today or date.today().isoformat()
+    sink = _ZipSink()
+    zf = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+    errors = []
+    pending = deque()
+
+    def write_one(name, fut):
+        try:
+            data = fut.result() if executor is not None else fut()
+        except Exception as e:
+            errors.append(f"{name}: {type(e).__name__}: {e}")
+            return
+        zf.writestr(zipfile.ZipInfo(f"{name}.{kind}", date_time=(2025, 1, 1, 0, 0, 0)), data,
+                    compress_type=zipfile.ZIP_DEFLATED)
+
+    try:
+        for name, res, parties in tasks:
+            if res is None:
+                errors.append(f"{name}: {parties}")
+                continue
+            if executor is not None:
+                pending.append((name, executor.submit(render_letter, kind, res, parties, today)))
+            else:
+                pending.append((name, lambda res=res, parties=parties: render_letter(kind, res, parties, today)))
+            if len(pending) >= window:
+                write_one(*pending.popleft())
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+    except STREAM_ERRORS as e:
+        errors.append(f"Błąd odczytu listy mieszkańców (dalsze wiersze pominięte): {type(e).__name__}: {e}")
+    while pending:
+        write_one(*pending.popleft())
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    if errors:
+        zf.writestr("BLEDY.txt", "\n".join(errors) + "\n")
+    zf.close()
+    yield sink.drain()
+
+
+def combined_letters_pdf(tasks, fp, today: str | None = None) -> tuple:
+    """
+    Wszystkie poprawne pisma z letter_tasks jako jeden wielostronicowy PDF.
+    Zwraca (liczba pism, lista błędów w formacie BLEDY.txt).
+    """
+    errors = []
+
+    def items():
+        for name, res, parties in tasks:
+            if res is None:
+                errors.append(f"{name}: {parties}")
+                continue
+            yield res, parties
+
+    count = write_letters_pdf(items(), fp, today)
+    return count, errors
+
+
+def main(argv=None):
+    import argparse
+    from batch_io import iter_input_rows
+
+    ap = argparse.ArgumentParser(description="Masowe pisma reklamacyjne PROF INSTAL (ZIP)")
+    ap.add_argument("residents", help="lista mieszkańców: CSV lub NDJSON")
+    ap.add_argument("output", help="plik wynikowy .zip (lub .pdf przy --combined)")
+    ap.add_argument("--format", choices=("docx", "pdf"), default="docx")
+    ap.add_argument("--bill", type=float, default=49.0)
+    ap.add_argument("--heat-price", type=float, default=73.69)
+    ap.add_argument("--unit", default="GJ")
+    ap.add_argument("--vat", type=float, default=23.0)
+    ap.add_argument("--units", type=int, default=65)
+    ap.add_argument("--dT", type=float, default=45.0)
+    ap.add_argument("--addressee", default="Spółdzielnia Mieszkaniowa XYZ")
+    ap.add_argument("--combined", action="store_true", help="jeden wielostronicowy PDF zamiast ZIP")
+    ap.add_argument("--workers", type=int, default=None, help="liczba procesów (domyślnie wszystkie rdzenie)")
+    args = ap.parse_args(argv)
+
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+    from exports import preload
+
+    building = dict(bill=args.bill, heat_price=args.heat_price, unit=args.unit, vat=args.vat,
+                    units=args.units, dT=args.dT)
+    fmt = "csv" if args.residents.lower().endswith(".csv") else "ndjson"
+    if args.combined:
+        with open(args.residents, encoding="utf-8-sig", newline="") as src, open(args.output, "wb") as out:
+            tasks = letter_tasks(iter_input_rows(src, fmt), building, {"a_name": args.addressee})
+            count, errors = combined_letters_pdf(tasks, out)
+        print(f"Pism: {count}, błędnych wierszy: {len(errors)}")
+        for line in errors:
+            print(line)
+        return
+    workers = args.workers or os.cpu_count() or 1
+    with open(args.residents, encoding="utf-8-sig", newline="") as src, open(args.output, "wb") as out, \
+            ProcessPoolExecutor(max_workers=workers, initializer=preload) as ex:
+        tasks = letter_tasks(iter_input_rows(src, fmt), building, {"a_name": args.addressee})
+        for chunk in iter_letters_zip(tasks, args.format, ex, window=2 * workers):
+            out.write(chunk)
+
+
+if __name__ == "__main__":
+    main()
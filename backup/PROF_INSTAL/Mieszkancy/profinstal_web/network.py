@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — audyt strat sieci przewodów (wiele odcinków naraz, NumPy)
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Rozszerzenie calc.compute_audit z jednego przewodu na całą instalację:
+tabela odcinków (średnica, długość, izolacja, λ, temperatury) liczona
+jednym wywołaniem NumPy, z sumami dla pionów / kondygnacji / stref.
+"""
+import numpy as np
+
+from calc import price_GJ_brutto
+
+# Kolumny liczbowe odcinka (jak klucze params w compute_audit, bez 'Q')
+SEGMENT_FIELDS = ("L", "d", "lambda", "t_in", "t_out", "t_amb", "ins_thick", "czas_pracy")
+# Kolumny etykiet, po których można sumować straty
+GROUP_FIELDS = ("riser", "floor", "zone")
+
+KWH_TO_GJ = 0.0036
+
+
+def segment_table(segments, defaults: dict | None = None) -> dict:
+    """
+    Normalizuje tabelę odcinków do słownika kolumn NumPy.
+    segments: lista słowników (jeden na odcinek) albo słownik kolumn.
+    defaults: wartości dla brakujących kolumn (np. AUDIT_DEFAULTS_OLD).
+    Kolumny etykiet (GROUP_FIELDS, 'id') są przenoszone jako tablice tekstów.
+    Wynik tej funkcji można podać ponownie — zostanie zwrócony w tej samej postaci.
+    """
+    if isinstance(segments, dict):
+        cols = dict(segments)
+    else:
+        segments = list(segments)
+        keys = {k for s in segments for k in s}
+        cols = {k: [s.get(k) for s in segments] for k in keys}
+    n = max((np.size(v) for v in cols.values()), default=0)
+    defaults = defaults or {}
+
+    table = {}
+    for k in SEGMENT_FIELDS:
+        if k in cols:
+            col = np.atleast_1d(np.asarray(cols[k], dtype=np.float64))  # None → NaN
+            if k in defaults:
+                col = np.where(np.isnan(col), float(defaults[k]), col)
+        elif k in defaults:
+            col = np.full(n, float(defaults[k]))
+        else:
+            raise ValueError(f"Brak kolumny '{k}' w tabeli odcinków")
+        table[k] = np.broadcast_to(col, (n,)).copy()
+    for k in GROUP_FIELDS + ("id",):
+        if k in cols:
+            table[k] = np.atleast_1d(np.asarray(cols[k])).astype(str)
+    return table
+
+
+def apply_overrides(table: dict, **overrides) -> dict:
+    """
+    Kopia tabeli z podmienionymi kolumnami — wygodne do wariantu „nowego”
+    (np. apply_overrides(old, ins_thick=30.0, **{'lambda': 0.025})).
+    """
+    out = dict(table)
+    n = len(table["L"])
+    for k, v in overrides.items():
+        out[k] = np.broadcast_to(np.asarray(v, dtype=np.float64), (n,)).copy()
+    return out
+
+
+def check_segments(table: dict):
+    """
+    Rzuca ValueError z numerami błędnych odcinków (wartości nieskończone,
+    d <= 0 lub ins_thick <= 0 — dla nich wzór logarytmiczny nie ma sensu).
+    """
+    bad = np.zeros(len(table["L"]), dtype=bool)
+    for k in SEGMENT_FIELDS:
+        bad |= ~np.isfinite(table[k])
+    with np.errstate(invalid="ignore"):
+        bad |= ~(table["d"] > 0) | ~(table["ins_thick"] > 0)
+    if bad.any():
+        idx = np.flatnonzero(bad)
+        shown = ", ".join(str(i) for i in idx[:10]) + (" …" if idx.size > 10 else "")
+        raise ValueError(f"Niepoprawne parametry odcinków: {shown}")
+
+
+def heat_loss_segments(table: dict) -> np.ndarray:
+    """
+    Roczna strata ciepła każdego odcinka [kWh/rok] — ten sam wzór co
+    heat_loss w compute_audit (PN-EN 12831, PN-EN 15316):
+    q = 2·π·λ·(t_sr − t_amb) / ln((d + 2·ins) / d)
+    """
+    d_m = table["d"] / 1000.0
+    ins_m = table["ins_thick"] / 1000.0
+    d_ext = d_m + 2*ins_m
+    t_sr = (table["t_in"] + table["t_out"]) / 2.0
+    q = 2 * np.pi * table["lambda"] * (t_sr - table["t_amb"]) / np.log(d_ext/d_m)
+    return q * table["L"] * table["czas_pracy"] / 1000.0
+
+
+def _group_sums(labels: np.ndarray, columns: dict) -> dict:
+    keys, inv = np.unique(labels, return_inverse=True)
+    sums = {name: np.bincount(inv, weights=col, minlength=keys.size) for name, col in columns.items()}
+    return {str(key): {name: float(s[i]) for name, s in sums.items()} for i, key in enumerate(keys)}
+
+
+def audit_summary(loss_old: float, loss_new: float, price_gj_brutto: float) -> dict:
+    """
+    Słownik w formacie compute_audit dla danych strat [kWh/rok] i ceny brutto [zł/GJ].
+    """
+    oszczednosc = loss_old - loss_new
+    cost_old = loss_old * KWH_TO_GJ * price_gj_brutto
+    cost_new = loss_new * KWH_TO_GJ * price_gj_brutto
+    return {
+        'Q_loss_old': loss_old,
+        'Q_loss_new': loss_new,
+        'oszczednosc_kWh': oszczednosc,
+        'oszczednosc_proc': 100.0 * oszczednosc / loss_old if loss_old else 0.0,
+        'cost_old': cost_old,
+        'cost_new': cost_new,
+        'cost_savings': cost_old - cost_new,
+    }
+
+
+def compute_network_audit(segments_old, segments_new, heat_price: float = 73.69, unit: str = "GJ",
+                          vat: float = 23.0, group_by=GROUP_FIELDS, defaults: dict | None = None) -> dict:
+    """
+    Porównuje straty starej i nowej instalacji dla całej sieci odcinków.
+    segments_old, segments_new: tabele odcinków tej samej długości
+        (patrz segment_table); etykiety grup brane są z segments_old.
+    group_by: kolumny etykiet (z GROUP_FIELDS; napis = jedna kolumna), dla których
+        liczone są sumy (pomijane, jeśli brak w danych); nieznana nazwa → ValueError.
+    Zwraca słownik:
+        - klucze jak w compute_audit — sumy dla całego budynku,
+        - 'segments' — kolumny per odcinek (straty i koszty, stare/nowe),
+        - 'groups'   — {kolumna: {etykieta: sumy jak w compute_audit}}.
+    """
+    if isinstance(group_by, str):
+        group_by = (group_by,)
+    unknown = [k for k in group_by if k not in GROUP_FIELDS]
+    if unknown:
+        raise ValueError(f"Nieznane kolumny group_by: {', '.join(map(str, unknown))} (dozwolone: {', '.join(GROUP_FIELDS)})")
+    old = segment_table(segments_old, defaults)
+    new = segment_table(segments_new, defaults)
+    if len(old["L"]) != len(new["L"]):
+        raise ValueError("Tabele odcinków starej i nowej instalacji mają różną liczbę wierszy")
+    check_segments(old)
+    check_segments(new)
+
+    price_gj_brutto = price_GJ_brutto(heat_price, unit, vat)
+    loss_old = heat_loss_segments(old)
+    loss_new = heat_loss_segments(new)
+
+    res = audit_summary(float(loss_old.sum()), float(loss_new.sum()), price_gj_brutto)
+    res['segments'] = {
+        'Q_loss_old': loss_old,
+        'Q_loss_new': loss_new,
+        'cost_old': loss_old * KWH_TO_GJ * price_gj_brutto,
+        'cost_new': loss_new * KWH_TO_GJ * price_gj_brutto,
+    }
+    res['groups'] = {}
+    for key in group_by:
+        if key in old:
+            sums = _group_sums(old[key], {'Q_loss_old': loss_old, 'Q_loss_new': loss_new})
+            res['groups'][key] = {label: audit_summary(s['Q_loss_old'], s['Q_loss_new'], price_gj_brutto)
+                                  for label, s in sums.items()}
+    return res
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — szablony kompilowane raz i gotowe strony startowe
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Jinja trzyma skompilowane szablony w pamięci procesu, a bajtkod zapisuje
+na dysk (FileSystemBytecodeCache), więc restart serwera i kolejne procesy
+nie kompilują szablonów od nowa. Strony GET budowane wyłącznie ze stałych
+(panel główny, formularz audytu) renderowane są raz: w pamięci leży gotowy
+HTML, jego wersja gzip i ETag. Gdy w sesji czeka komunikat flash, strona
+renderowana jest normalnie.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from typing import NamedTuple
+
+from flask import Response, request, session
+from jinja2 import FileSystemBytecodeCache
+
+JINJA_CACHE_DIR = os.environ.get("PROFINSTAL_JINJA_CACHE") or None  # None → katalog tymczasowy użytkownika (Jinja)
+PAGE_CACHE_ENABLED = os.environ.get("PROFINSTAL_PAGE_CACHE", "1") != "0"
+
+
+def init_templates(app, directory: str | None = JINJA_CACHE_DIR):
+    """Włącza dyskowy bajtkod szablonów aplikacji (klucz: nazwa + suma kontrolna źródła)."""
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+class StaticPage(NamedTuple):
+    body: bytes
+    gz: bytes
+    etag: str
+
+
+class PageCache:
+    """Gotowe strony pod (nazwa, script_root) — url_for w szablonach zależy od prefiksu aplikacji."""
+
+    def __init__(self):
+        self._pages = {}
+        self._lock = threading.Lock()
+        self.hits = self.renders = self.bypass = 0
+
+    def _page(self, name: str, render) -> StaticPage:
+        key = (name, request.script_root)
+        page = self._pages.get(key)
+        if page is None:
+            body = render().encode("utf-8")
+            page = StaticPage(body, gzip.compress(body, 9, mtime=0), hashlib.sha256(body).hexdigest()[:32])
+            with self._lock:
+                page = self._pages.setdefault(key, page)
+                self.renders += 1
+        else:
+            self.hits += 1
+        return page
+
+    def send(self, name: str, render):
+        """Odpowiedź ze strony `name`; render() (→ str) wywoływane tylko przy pierwszym żądaniu."""
+        if not PAGE_CACHE_ENABLED or session.get("_flashes"):
+            self.bypass += 1
+            return render()
+        page = self._page(name, render)
+        use_gzip = request.accept_encodings["gzip"] > 0
+        rv = Response(page.gz if use_gzip else page.body, mimetype="text/html")
+        if use_gzip:
+            rv.headers["Content-Encoding"] = "gzip"
+        rv.vary.add("Accept-Encoding")
+        rv.set_etag(page.etag + ("-gz" if use_gzip else ""))
+        return rv.make_conditional(request)
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def stats(self) -> dict:
+        return {"pages": len(self._pages), "hits": self.hits, "renders": self.renders, "bypass": self.bypass}
+
+
+PAGE_CACHE = PageCache()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — przechowywanie wyników /calc po stronie serwera (tokeny wyniku)
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+/calc zapisuje wynik compute_all pod identyfikatorem (SHA-256 treści) i
+zwraca podpisany token (itsdangerous, klucz aplikacji, z czasem wystawienia).
+Eksporty z tokenem biorą gotowy wynik zamiast ponownie parsować formularz
+i liczyć. Wyniki leżą w LRU w pamięci, a opcjonalnie także w SQLite
+(PROFINSTAL_RESULT_DB): zapis przechodzi do bazy, więc token wystawiony
+przez jeden proces serwera działa w pozostałych i po wyparciu z pamięci.
+Nieznany lub wygasły token → None (eksport wraca do pól formularza).
+Klucz podpisu z PROFINSTAL_SECRET_KEY; przy domyślnym (jawnym w kodzie)
+kluczu tokeny dałoby się podrobić, więc nie są wystawiane ani przyjmowane.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from cache import LRUCache
+
+RESULT_TTL = float(os.environ.get("PROFINSTAL_RESULT_TTL") or 3600)  # s — ważność tokenu i wpisu (0 = bez limitu)
+RESULT_CACHE_SIZE = int(os.environ.get("PROFINSTAL_RESULT_CACHE_SIZE") or 2048)
+RESULT_CACHE_POLICY = os.environ.get("PROFINSTAL_RESULT_CACHE_POLICY", "lru")
+RESULT_DB = os.environ.get("PROFINSTAL_RESULT_DB") or None  # ścieżka pliku SQLite; None → tylko pamięć
+TOKEN_SALT = "profinstal-result"
+DEFAULT_SECRET_KEY = "change-me"  # app.secret_key bez PROFINSTAL_SECRET_KEY — tokeny wyłączone
+PURGE_EVERY = 256  # co tyle zapisów usuwane są wygasłe wiersze bazy
+
+
+def result_id(res: dict) -> str:
+    blob = json.dumps(res, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+
+class ResultStore:
+    """Wyniki pod identyfikatorem: LRU (TTL) w pamięci + opcjonalnie tabela SQLite."""
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE, ttl: float = RESULT_TTL,
+                 db_path: str | None = RESULT_DB, policy: str = RESULT_CACHE_POLICY):
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl or None, policy=policy)
+        self.db_path = db_path
+        self._db = None
+        self._db_pid = None
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        self.db_hits = self.db_writes = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        """Połączenie tworzone leniwie w każdym procesie (nie dziedziczone przez fork)."""
+        if self._db is None or self._db_pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            db = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS results (id TEXT PRIMARY KEY, created REAL NOT NULL, data TEXT NOT NULL)")
+            self._db, self._db_pid = db, os.getpid()
+        return self._db
+
+    def put(self, res: dict) -> str:
+        rid = result_id(res)
+        self.memory.set(rid, dict(res))
+        if self.db_path:
+            with self._db_lock:
+                db = self._conn()
+                db.execute("INSERT OR REPLACE INTO results (id, created, data) VALUES (?, ?, ?)",
+                           (rid, time.time(), json.dumps(res, ensure_ascii=False)))
+                self.db_writes += 1
+                self._writes += 1
+                if self.ttl and self._writes % PURGE_EVERY == 0:
+                    db.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl,))
+        return rid
+
+    def get(self, rid: str) -> dict | None:
+        """Kopia wyniku albo None (brak / wygasły)."""
+        res = self.memory.get(rid)
+        if res is None and self.db_path:
+            with self._db_lock:
+                row = self._conn().execute("SELECT created, data FROM results WHERE id = ?", (rid,)).fetchone()
+            if row is None or (self.ttl and row[0] < time.time() - self.ttl):
+                return None
+            res = json.loads(row[1])
+            self.memory.set(rid, res)
+            self.db_hits += 1
+        return dict(res) if res is not None else None
+
+    def stats(self) -> dict:
+        return {**self.memory.stats(), "db": self.db_path, "db_hits": self.db_hits, "db_writes": self.db_writes}
+
+
+RESULTS = ResultStore()
+
+
+def tokens_enabled() -> bool:
+    return bool(current_app.secret_key) and current_app.secret_key != DEFAULT_SECRET_KEY
+
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(current_app.secret_key, salt=TOKEN_SALT)
+
+
+def issue_token(res: dict) -> str | None:
+    """Zapisuje wynik i zwraca podpisany token (do pola result_token formularzy eksportu); None przy domyślnym kluczu."""
+    if not tokens_enabled():
+        return None
+    return _serializer().dumps(RESULTS.put(res))
+
+
+def result_from_token(token: str) -> dict | None:
+    """Wynik dla tokenu albo None (zły podpis, wygasły, wyparty, tokeny wyłączone)."""
+    if not tokens_enabled():
+        return None
+    try:
+        rid = _serializer().loads(token, max_age=RESULT_TTL or None)
+    except BadSignature:  # także SignatureExpired
+        return None
+    return RESULTS.get(rid)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — scalanie równoczesnych identycznych żądań (single-flight)
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Gdy kilka osób pobiera naraz ten sam dokument, renderuje go tylko pierwsze
+żądanie (lider), a pozostałe czekają na jego wynik. W obrębie procesu
+oczekiwanie to threading.Event; między procesami serwera lider trzyma blokadę
+pliku (flock, w Windows msvcrt.locking) — lider z innego procesu czeka na nią
+i po jej przejęciu sprawdza, czy wynik już powstał (np. plik w DOC_CACHE).
+Pliki blokad to 256 stałych pasów wg pierwszych znaków klucza, więc nie trzeba
+ich usuwać; rzadkie kolizje różnych kluczy tylko szeregują renderowanie.
+"""
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _lock(fd: int):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return
+    os.lseek(fd, 0, os.SEEK_SET)
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)  # ponawia przez ok. 10 s, potem OSError
+            return
+        except OSError:
+            continue
+
+
+def _unlock(fd: int):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """do(klucz, fn): jedno wywołanie fn na klucz naraz; pozostali dostają ten sam wynik (albo wyjątek)."""
+
+    def __init__(self, lock_dir: str | None = None):
+        self.lock_dir = lock_dir  # None → tylko w obrębie procesu
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = self.shared = self.in_flight_peak = 0
+
+    def _lock_path(self, key: str) -> str:
+        return os.path.join(self.lock_dir, f".lock-{key[:2]}")
+
+    def do(self, key: str, fn) -> tuple:
+        """(wynik, współdzielony?) — współdzielony = wynik cudzego wywołania w tym procesie."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                self.in_flight_peak = max(self.in_flight_peak, len(self._calls))
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            call.value = self._run_locked(key, fn) if self.lock_dir else fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    def _run_locked(self, key: str, fn):
+        os.makedirs(self.lock_dir, exist_ok=True)
+        fd = os.open(self._lock_path(key), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            _lock(fd)
+            try:
+                return fn()
+            finally:
+                _unlock(fd)
+        finally:
+            os.close(fd)
+
+    def stats(self) -> dict:
+        return {"leaders": self.leaders, "shared": self.shared, "in_flight": len(self._calls),
+                "in_flight_peak": self.in_flight_peak}
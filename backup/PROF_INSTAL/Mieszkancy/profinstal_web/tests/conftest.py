@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — wspólne ustawienia testów (pytest)
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+    cd profinstal_web && python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+# pliki podręczne testów poza katalogiem użytkownika (przed importem app)
+os.environ.setdefault("PROFINSTAL_DOC_CACHE_DIR", os.path.join(tempfile.gettempdir(), "profinstal-test-docs"))
+
+CALC_FORM = {"bill": "49", "heat_price": "73.69", "unit": "GJ", "vat": "23", "month_m3": "7.42", "dT": "45", "units": "65"}
+
+
+@pytest.fixture
+def app():
+    from app import app
+
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
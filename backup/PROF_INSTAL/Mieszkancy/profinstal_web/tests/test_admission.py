@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""Bramki żądań: zwalnianie miejsca i adres klienta za proxy (admission.py)."""
+from admission import GATES, client_id
+from conftest import CALC_FORM
+
+
+def test_send_file_releases_heavy_slot(client):
+    # per_client = 2: wyciek miejsca po send_file dałby 429 najpóźniej przy trzecim żądaniu
+    for _ in range(GATES["heavy"].per_client + 2):
+        rv = client.post("/export/pdf", data=CALC_FORM)
+        assert rv.status_code == 200
+        assert GATES["heavy"].active == 0  # przed close: serwer nie wywoła call_on_close dla pliku
+        rv.close()
+
+
+def test_streamed_response_releases_after_close(client):
+    rv = client.post("/api/calc/batch?format=ndjson", data=b'{"bill": 49, "heat_price": 73.69}\n',
+                     content_type="application/x-ndjson", buffered=False)
+    assert GATES["heavy"].active == 1  # generator jeszcze nie wysłany
+    rv.get_data()
+    rv.close()
+    assert GATES["heavy"].active == 0
+
+
+def test_forwarded_request_without_trusted_proxy_has_no_client(app):
+    with app.test_request_context("/", headers={"X-Forwarded-For": "203.0.113.7"}, environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+        assert client_id() is None
+    with app.test_request_context("/", environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+        assert client_id() == "10.0.0.1"
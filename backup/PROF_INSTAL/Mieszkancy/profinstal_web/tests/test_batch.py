@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Obliczenia wsadowe: błędy strumienia wejściowego i wyniki spoza JSON (/api/calc/batch)."""
+import gzip
+import json
+
+CSV = "bill;heat_price;unit;vat;month_m3;units;dT\n49;73,69;GJ;23;7,42;65;45\n"
+
+
+def _lines(rv) -> list:
+    text = rv.get_data(as_text=True)
+    rv.close()  # zwolnienie bramki (odpowiedź strumieniowa)
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_csv_rows(client):
+    rows = _lines(client.post("/api/calc/batch?format=csv", data=CSV.encode("utf-8")))
+    assert len(rows) == 1 and rows[0]["row"] == 1 and "error" not in rows[0]
+
+
+def test_invalid_utf8_ends_with_error_line(client):
+    body = CSV.encode("utf-8") + "50;73,69;GJ;23;7,42;65;45\n".encode("cp1250") + "Łódź;1;GJ;23;1;1;45\n".encode("cp1250")
+    rows = _lines(client.post("/api/calc/batch?format=csv", data=body))
+    assert "error" in rows[-1] and "row" not in rows[-1]
+
+
+def test_corrupt_gzip_ends_with_error_line(client):
+    packed = gzip.compress(CSV.encode("utf-8"))
+    body = packed[:len(packed) // 2] + b"\x00" * 16
+    rv = client.post("/api/calc/batch?format=csv", data=body, headers={"Content-Encoding": "gzip"})
+    assert rv.status_code == 200
+    rows = _lines(rv)
+    assert "error" in rows[-1] and "rows_read" in rows[-1]
+
+
+def test_non_finite_result_is_row_error(client):
+    body = b'{"id": "big", "bill": 1e308, "heat_price": 1e308, "month_m3": 1e308, "units": 1, "dT": 45}\n'
+    rv = client.post("/api/calc/batch?format=ndjson", data=body, content_type="application/x-ndjson")
+    (row,) = _lines(rv)
+    assert "Infinity" not in rv.get_data(as_text=True)
+    assert row["id"] == "big" and "error" in row
+
+
+def test_out_of_range_units_is_row_error(client):
+    body = (b'{"id": "a", "bill": 49, "heat_price": 73.69, "month_m3": 7.42, "units": 1e20, "dT": 45}\n'
+            b'{"id": "b", "bill": 49, "heat_price": 73.69, "month_m3": 7.42, "units": 65, "dT": 45}\n')
+    rv = client.post("/api/calc/batch?format=ndjson", data=body, content_type="application/x-ndjson")
+    first, second = _lines(rv)
+    assert first["id"] == "a" and "units" in first["error"]
+    assert second["id"] == "b" and "error" not in second
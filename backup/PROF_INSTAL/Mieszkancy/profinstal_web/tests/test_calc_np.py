@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Wersja wektorowa (calc_np) a skalarna calc.compute_all — zgodność bit w bit."""
+import math
+
+import numpy as np
+import pytest
+
+from calc import compute_all
+from calc_np import RESULT_FIELDS, compute_all_batch, iter_rows, scenario_grid
+
+
+def _random_rows(n: int, seed: int = 2025) -> dict:
+    rng = np.random.default_rng(seed)
+    bill = rng.uniform(-10, 200, n)
+    return {
+        "bill": np.where(rng.random(n) < 0.5, bill.round(2), bill),  # kwoty z rachunku i dowolne
+        "heat_price": rng.uniform(0, 200, n),
+        "unit": rng.choice(["GJ", "MJ", "gj"], n),
+        "vat": rng.choice([0.0, 5.0, 8.0, 23.0, rng.uniform(0, 30)], n),
+        "month_m3": rng.uniform(0, 30, n),
+        "units": rng.integers(1, 500, n),
+        "dT": rng.uniform(-5, 80, n),
+    }
+
+
+def test_batch_matches_scalar_bit_for_bit():
+    cols = _random_rows(5000)
+    cols["bill"][:50] = 0.0  # gałąź bill == 0
+    batch = compute_all_batch(**cols)
+    assert batch["valid"].all()
+    for i, row in enumerate(iter_rows(batch)):
+        ref = compute_all(*(cols[k][i].item() for k in ("bill", "heat_price", "unit", "vat", "month_m3", "units", "dT")))
+        for k in RESULT_FIELDS:
+            a, b = row[k], ref[k]
+            if isinstance(b, float):
+                assert math.isnan(a) and math.isnan(b) or a.hex() == b.hex(), (i, k, a, b)
+            else:
+                assert a == b, (i, k, a, b)
+
+
+def test_invalid_rows_match_scalar_errors():
+    cols = _random_rows(6)
+    cols["bill"][0] = np.nan
+    cols["dT"][1] = np.inf
+    cols["units"][2] = 0
+    batch = compute_all_batch(**cols)
+    assert batch["valid"].tolist() == [False, False, False, True, True, True]
+    for i in range(3):
+        with pytest.raises(ValueError):
+            compute_all(*(cols[k][i].item() for k in ("bill", "heat_price", "unit", "vat", "month_m3", "units", "dT")))
+
+
+def test_scenario_grid_matches_fixed_scenarios():
+    ref = compute_all(49.0, 73.69, "GJ", 23.0, 7.42, 65, 45.0)
+    grid = scenario_grid(49.0, 7.42, 65, eff=[0.70, 0.80], heat_price=73.69, dT=45.0)
+    assert grid["cost_m3"][:, 0, 0].tolist() == [ref["cost70"], ref["cost80"]]
+    assert grid["save_build_y"][:, 0, 0].tolist() == [ref["save70_build_y"], ref["save80_build_y"]]
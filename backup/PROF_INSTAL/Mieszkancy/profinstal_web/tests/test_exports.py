@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""Rozmiar pism PDF z logo w nagłówku (exports.py)."""
+import os
+
+import exports
+from cache import cached_compute_all
+
+LOGO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "LOGO512x512.png")
+
+
+def test_letter_pdf_embeds_scaled_logo(monkeypatch):
+    assert os.path.getsize(LOGO) > 1_000_000  # oryginał ~1,6 MB
+    monkeypatch.setattr(exports, "LETTER_LOGO", LOGO)
+    monkeypatch.setattr(exports, "_logo", None)
+    res = cached_compute_all(49.0, 73.69, "GJ", 23.0, 7.42, 65, 45.0)
+    pdf = exports.render_letter("pdf", res, {})
+    assert b"/Subtype /Image" in pdf
+    assert f"/Width {exports.LETTER_LOGO_PX}".encode() in pdf
+    assert len(pdf) < 250_000  # z oryginałem ~2,4 MB
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Kolejka zadań eksportu (jobs.ExportJobs, /export/jobs)."""
+import os
+import time
+
+import pytest
+
+from conftest import CALC_FORM
+from jobs import ExportJobs
+
+
+def _wait(client, url, timeout=60):
+    deadline = time.time() + timeout
+    while True:
+        st = client.get(url).get_json()
+        if st["status"] in ("done", "failed") or time.time() > deadline:
+            return st
+        time.sleep(0.05)
+
+
+def test_job_lifecycle(client):
+    rv = client.post("/export/jobs", data={**CALC_FORM, "format": "pdf"})
+    assert rv.status_code == 202
+    job = rv.get_json()
+    st = _wait(client, job["status_url"])
+    assert st["status"] == "done" and st["progress"] == 1.0
+    rv = client.get(job["download_url"])
+    try:
+        assert rv.status_code == 200
+        assert rv.data.startswith(b"%PDF")
+        assert len(rv.data) == st["size"]
+    finally:
+        rv.close()
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/export/jobs/nope").status_code == 404
+    assert client.get("/export/jobs/nope/download").status_code == 404
+
+
+def test_pool_recreated_after_worker_crash(tmp_path):
+    from app import _form_result, app
+
+    jobs = ExportJobs(workers=1)
+    jobs._dir = str(tmp_path)
+    try:
+        broken = jobs.executor()
+        with pytest.raises(Exception):
+            broken.submit(os._exit, 1).result(timeout=30)  # proces roboczy ginie → pula uszkodzona
+        with app.test_request_context(data=CALC_FORM, method="POST"):
+            res = _form_result()
+        job_id = jobs.submit("pdf", res, "2025-01-01")
+        jobs.get(job_id)["future"].result(timeout=60)
+        assert jobs.executor() is not broken
+        assert jobs.status(job_id)["status"] == "done"
+    finally:
+        jobs.shutdown()
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Masowe pisma: uszkodzona lista mieszkańców (/export/letters.zip, /export/letters.pdf)."""
+import io
+import zipfile
+
+from conftest import CALC_FORM
+
+HEADER = "name;address;flat_id;month_m3\n"
+GOOD = "Jan Kowalski;ul. Przykładowa 1/1;1;7,42\n"
+# cp1250 „ó” (0xF3) za pierwszą paczką wierszy — błąd dekodowania już po rozpoczęciu odpowiedzi
+CORRUPT = (HEADER + GOOD * 3).encode("utf-8") + b"x" * 9000 + "\nAnna Wójcik;ul. Długa 2;2;5\n".encode("cp1250")
+
+
+def _post(client, path, body: bytes, **fields):
+    data = {**CALC_FORM, **fields, "residents": (io.BytesIO(body), "mieszkancy.csv", "text/csv")}
+    return client.post(path, data=data, content_type="multipart/form-data")
+
+
+def test_zip_with_corrupt_upload_is_complete_archive(client):
+    rv = _post(client, "/export/letters.zip", CORRUPT, format="pdf")
+    assert rv.status_code == 200
+    body = rv.get_data()
+    rv.close()
+    with zipfile.ZipFile(io.BytesIO(body)) as zf:
+        assert zf.testzip() is None
+        names = zf.namelist()
+        assert "BLEDY.txt" in names
+        assert "Błąd odczytu" in zf.read("BLEDY.txt").decode("utf-8")
+    assert sum(n.endswith(".pdf") for n in names) == 3
+
+
+def test_combined_pdf_with_corrupt_upload_is_400(client):
+    rv = _post(client, "/export/letters.pdf", CORRUPT)
+    assert rv.status_code == 400
+    assert "error" in rv.get_json()
+
+
+def test_combined_pdf(client):
+    rv = _post(client, "/export/letters.pdf", (HEADER + GOOD * 2).encode("utf-8"))
+    assert rv.status_code == 200 and rv.headers["X-Letters-Count"] == "2"
+    rv.close()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Sieć budynku: edycja przyrostowa (topology.py, /api/network)."""
+import pytest
+
+from app import AUDIT_DEFAULTS_NEW, AUDIT_DEFAULTS_OLD
+from topology import BuildingNetwork
+
+SEGMENTS = [
+    {"id": "main", "kind": "main", "L": 30, "d": 50},
+    {"id": "P1", "parent": "main", "kind": "riser", "L": 15, "d": 32},
+    {"id": "P2", "parent": "main", "kind": "riser", "L": 12, "d": 25},
+]
+
+
+def _net() -> BuildingNetwork:
+    return BuildingNetwork.from_segments(SEGMENTS, defaults_old=AUDIT_DEFAULTS_OLD, defaults_new=AUDIT_DEFAULTS_NEW)
+
+
+def test_update_matches_rebuild():
+    net = _net()
+    net.update("P1", new={"ins_thick": 40})
+    edited = [dict(s) for s in SEGMENTS]
+    edited[1]["new"] = {"L": 15, "d": 32, "ins_thick": 40}
+    rebuilt = BuildingNetwork.from_segments(edited, defaults_old=AUDIT_DEFAULTS_OLD, defaults_new=AUDIT_DEFAULTS_NEW)
+    assert net.summary() == pytest.approx(rebuilt.summary())
+
+
+def test_failed_update_leaves_state_unchanged():
+    net = _net()
+    before = (net.nodes["P1"].new, net.summary(), net.summary("main"))
+    for bad in ({"ins_thick": 0}, {"L": "nan"}, {"d": float("inf")}, {"lambda": "1e400"}):
+        with pytest.raises(ValueError):
+            net.update("P1", new=bad)
+        assert (net.nodes["P1"].new, net.summary(), net.summary("main")) == before
+
+
+def test_api_create_and_patch(client):
+    rv = client.post("/api/network", json={"segments": SEGMENTS})
+    assert rv.status_code == 201
+    created = rv.get_json()
+    url = created["url"]
+
+    rv = client.patch(url, json={"id": "P1", "new": {"ins_thick": 60}})
+    assert rv.status_code == 200
+    body = rv.get_json()
+    assert set(body["ancestors"]) == {"main"}
+    assert body["summary"]["Q_loss_new"] < created["summary"]["Q_loss_new"]
+
+    assert client.patch(url, json={"id": "P1", "new": {"ins_thick": 0}}).status_code == 400
+    assert client.get(url).get_json()["summary"] == body["summary"]
+    assert client.patch(url, json={"id": "nope", "new": {}}).status_code == 404
+
+
+def test_api_non_finite_edit_then_revert(client):
+    url = client.post("/api/network", json={"segments": SEGMENTS}).get_json()["url"]
+    before = client.get(url).get_json()["summary"]
+    rv = client.patch(url, json={"id": "P1", "new": {"L": "nan"}})
+    assert rv.status_code == 400
+    assert "NaN" not in rv.get_data(as_text=True)
+    assert client.get(url).get_json()["summary"] == before
+    rv = client.patch(url, json={"id": "P1", "new": {"L": 15}})
+    assert rv.status_code == 200
+    assert rv.get_json()["summary"] == pytest.approx(before)
+    assert client.get("/api/network/nieznana").status_code == 404
+
+
+AUDIT_SEGMENTS = [{"L": 10, "d": 32, "riser": "P1", "floor": "1"}, {"L": 12, "d": 32, "riser": "P2", "floor": "1"}]
+
+
+def test_audit_group_by_string_is_one_column(client):
+    rv = client.post("/api/audit/network", json={"segments_old": AUDIT_SEGMENTS, "group_by": "riser"})
+    assert rv.status_code == 200
+    assert set(rv.get_json()["groups"]) == {"riser"}
+    assert set(rv.get_json()["groups"]["riser"]) == {"P1", "P2"}
+
+
+@pytest.mark.parametrize("group_by", ["pion", ["riser", "nope"], 5])
+def test_audit_group_by_unknown_is_400(client, group_by):
+    rv = client.post("/api/audit/network", json={"segments_old": AUDIT_SEGMENTS, "group_by": group_by})
+    assert rv.status_code == 400
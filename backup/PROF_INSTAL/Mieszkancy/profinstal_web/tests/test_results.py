@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Tokeny wyniku /calc w eksportach: powrót do pól formularza i wynik wygasły (results.py)."""
+import re
+
+import pytest
+
+from conftest import CALC_FORM
+from results import RESULTS
+
+
+def _token(client):
+    html = client.post("/calc", data=CALC_FORM).get_data(as_text=True)
+    m = re.search(r'name="result_token" value="([^"]+)"', html)
+    return m.group(1) if m else None
+
+
+@pytest.fixture
+def keyed(app, monkeypatch):
+    monkeypatch.setattr(app, "secret_key", "test-secret")
+    return app
+
+
+def test_no_token_with_default_secret(client):
+    assert _token(client) is None
+
+
+def test_export_with_token(keyed, client):
+    token = _token(client)
+    assert token
+    rv = client.post("/export/pdf", data={"result_token": token})
+    assert rv.status_code == 200
+    rv.close()
+
+
+def test_tampered_token_without_fields_is_410(keyed, client):
+    rv = client.post("/export/opinion", data={"result_token": _token(client) + "x", "format": "html"})
+    assert rv.status_code == 410
+    assert "przelicz" in rv.get_json()["error"]
+
+
+def test_evicted_result_without_fields_is_410(keyed, client):
+    token = _token(client)
+    RESULTS.memory.clear()
+    for path in ("/export/pdf", "/export/docx"):
+        assert client.post(path, data={"result_token": token}).status_code == 410
+
+
+def test_bad_token_falls_back_to_form_fields(keyed, client):
+    rv = client.post("/export/pdf", data={**CALC_FORM, "result_token": "nieważny"})
+    assert rv.status_code == 200
+    rv.close()
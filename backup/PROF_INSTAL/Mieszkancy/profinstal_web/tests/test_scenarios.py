@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Walidacja parametrów siatki scenariuszy (/api/scenarios)."""
+import pytest
+
+from app import SCENARIO_MAX_CELLS
+from calc_np import efficiency_axis
+
+
+@pytest.mark.parametrize("query", [
+    "eff_step=0", "eff_step=-0.01", "eff_min=0.9&eff_max=0.5", "eff_step=nan",
+    f"eff_min=0.01&eff_max=1&eff_step={1 / SCENARIO_MAX_CELLS}",
+    "heat_price=;", "eff_step=1e-320", "units=1e400",
+])
+def test_invalid_grid_is_400(client, query):
+    rv = client.get(f"/api/scenarios?{query}")
+    assert rv.status_code == 400
+    assert "error" in rv.get_json()
+
+
+def test_default_grid(client):
+    rv = client.get("/api/scenarios")
+    assert rv.status_code == 200
+
+
+def test_efficiency_axis():
+    assert efficiency_axis(0.7, 0.8, 0.05).tolist() == [0.7, 0.75, 0.8]
+    assert efficiency_axis(0.7, 0.7, 0.05).tolist() == [0.7]
+    with pytest.raises(ValueError):
+        efficiency_axis(0.7, 0.8, 0)
+
+
+@pytest.mark.parametrize("body", [[1, 2], "x", {"eff_step": 1e-320}, {"units": 1e400}])
+def test_invalid_json_body_is_400(client, body):
+    rv = client.post("/api/scenarios", json=body)
+    assert rv.status_code == 400
+
+
+def test_decimal_comma_in_efficiency_axis(client):
+    rv = client.get("/api/scenarios?eff_min=0,7&eff_max=0,8&eff_step=0,05&heat_price=73,69")
+    assert rv.status_code == 200
+    assert rv.get_json() == client.get("/api/scenarios?eff_min=0.7&eff_max=0.8&eff_step=0.05&heat_price=73.69").get_json()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Monte Carlo (uncertainty.monte_carlo, /api/calc/uncertainty)."""
+import numpy as np
+import pytest
+
+from calc_np import compute_all_batch
+from uncertainty import monte_carlo
+
+INPUTS = {
+    "bill": {"dist": "normal", "mean": 49, "sd": 5, "low": 0},
+    "heat_price": {"dist": "choice", "values": [65.5, 73.69, 85]},
+    "unit": "GJ", "vat": 23,
+    "month_m3": {"dist": "triangular", "low": 6, "mode": 7.42, "high": 9},
+    "units": 65,
+    "dT": {"dist": "uniform", "low": 40, "high": 50},
+}
+
+
+def test_same_seed_same_result():
+    a = monte_carlo(INPUTS, n=5000, seed=7, shard_size=1000)
+    assert a == monte_carlo(INPUTS, n=5000, seed=7, shard_size=1000)
+    assert a != monte_carlo(INPUTS, n=5000, seed=8, shard_size=1000)
+
+
+def test_result_independent_of_workers():
+    a = monte_carlo(INPUTS, n=3000, seed=3, shard_size=1000)
+    assert a == monte_carlo(INPUTS, n=3000, seed=3, shard_size=1000, workers=2)
+
+
+def test_percentiles_ordered():
+    res = monte_carlo(INPUTS, n=5000, seed=1)
+    assert res["n_valid"] == 5000
+    for k, pct in res["percentiles"].items():
+        values = [pct[f"p{p}"] for p in (5, 25, 50, 75, 95)]
+        assert values == sorted(values), k
+
+
+def test_constant_inputs_match_batch():
+    inputs = {"bill": 49, "heat_price": 73.69, "unit": "GJ", "vat": 23, "month_m3": 7.42, "units": 65, "dT": 45}
+    res = monte_carlo(inputs, n=100, percentiles=(5, 95))
+    ref = compute_all_batch(**{k: np.array([v]) for k, v in inputs.items()})
+    for k in ("eta", "loss_build_y"):
+        assert res["percentiles"][k]["p5"] == pytest.approx(float(ref[k][0]))
+        assert res["percentiles"][k]["p95"] == pytest.approx(float(ref[k][0]))
+        assert res["mean"][k] == pytest.approx(float(ref[k][0]))
+
+
+def test_no_valid_sample_raises():
+    with pytest.raises(ValueError):
+        monte_carlo({**INPUTS, "units": 0}, n=100)
+
+
+@pytest.mark.parametrize("body", [
+    {"inputs": {"units": 0}, "n": 100},
+    {"inputs": {"bill": 1e308, "month_m3": 1}, "n": 100},
+    {"n": 100, "percentiles": [150]},
+    [1, 2],
+])
+def test_api_invalid_is_400(client, body):
+    rv = client.post("/api/calc/uncertainty", json=body)
+    assert rv.status_code == 400
+    assert "error" in rv.get_json()
+
+
+def test_api_ok(client):
+    rv = client.post("/api/calc/uncertainty", json={"inputs": {"bill": {"dist": "uniform", "low": 40, "high": 60}},
+                                                    "n": 1000, "percentiles": [5, 95]})
+    assert rv.status_code == 200
+    data = rv.get_json()
+    assert data["n_valid"] == 1000
+    assert data["percentiles"]["eta"]["p5"] <= data["percentiles"]["eta"]["p95"]
+
+
+def test_api_overflowing_mean_is_null(client):
+    rv = client.post("/api/calc/uncertainty", json={"inputs": {"bill": 1e308, "month_m3": 2e-3}, "n": 100})
+    assert rv.status_code == 200
+    assert b"Infinity" not in rv.data and b"NaN" not in rv.data
+    assert rv.get_json()["mean"]["loss_build_y"] is None
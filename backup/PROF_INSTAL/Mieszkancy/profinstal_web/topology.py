@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — model instalacji budynku jako drzewa odcinków
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Sieć przewodów trzymana jest jako drzewo (poziom → pion → gałązka), a każdy
+węzeł pamięta własną stratę i sumę strat całego poddrzewa. Zmiana jednego
+odcinka przelicza tylko ten odcinek i poprawia sumy jego przodków, więc
+koszt edycji to O(głębokość drzewa), a nie O(liczba odcinków).
+
+API (/api/network) trzyma sieci w NETWORKS pod losowym identyfikatorem —
+w pamięci procesu, więc przy kilku workerach potrzebne są sesje przypisane
+do workera; nieznany lub wygasły identyfikator → klient wysyła sieć ponownie.
+"""
+import math
+import secrets
+import threading
+
+from cache import LRUCache, _env_num
+from calc import heat_loss, price_GJ_brutto
+from network import audit_summary
+
+PARAM_KEYS = ("L", "d", "lambda", "t_in", "t_out", "t_amb", "ins_thick", "czas_pracy")
+
+
+class Node:
+    """Węzeł drzewa instalacji: odcinek przewodu albo węzeł grupujący (bez params)."""
+    __slots__ = ("id", "parent", "kind", "children", "old", "new",
+                 "loss_old", "loss_new", "sub_old", "sub_new")
+
+    def __init__(self, node_id, parent, kind):
+        self.id = node_id
+        self.parent = parent
+        self.kind = kind
+        self.children = []
+        self.old = None
+        self.new = None
+        self.loss_old = self.loss_new = 0.0
+        self.sub_old = self.sub_new = 0.0
+
+
+def _segment_loss(params: dict | None) -> float:
+    if not params:
+        return 0.0
+    return heat_loss(None, params['L'], params['d'], params['lambda'], params['t_in'],
+                     params['t_out'], params['t_amb'], params['ins_thick'], params['czas_pracy'])
+
+
+class BuildingNetwork:
+    """
+    Instalacja budynku z buforowanymi sumami strat dla starej i nowej wersji.
+
+    net = BuildingNetwork(defaults_old=AUDIT_DEFAULTS_OLD, defaults_new=AUDIT_DEFAULTS_NEW)
+    net.add("main", kind="main", old={"L": 30, "d": 50})
+    net.add("P1", parent="main", kind="riser", old={"L": 15, "d": 32})
+    net.update("P1", new={"ins_thick": 40})   # przelicza P1, main i sumę budynku
+    net.summary("P1")                          # słownik jak z compute_audit
+    """
+
+    def __init__(self, heat_price: float = 73.69, unit: str = "GJ", vat: float = 23.0,
+                 defaults_old: dict | None = None, defaults_new: dict | None = None):
+        self.price_gj_brutto = price_GJ_brutto(heat_price, unit, vat)
+        self.defaults_old = dict(defaults_old or {})
+        self.defaults_new = dict(defaults_new or {})
+        self.nodes = {}
+        self.roots = []
+        self.total_old = 0.0
+        self.total_new = 0.0
+
+    # --- budowa i edycja ---
+    def _params(self, defaults: dict, current: dict | None, changes: dict | None) -> dict | None:
+        if current is None and changes is None:
+            return None
+        p = dict(defaults) if current is None else dict(current)
+        p.update(changes or {})
+        missing = [k for k in PARAM_KEYS if k not in p]
+        if missing:
+            raise ValueError(f"Brak parametrów odcinka: {', '.join(missing)}")
+        out = {k: float(p[k]) for k in PARAM_KEYS}
+        # jak network.check_segments: NaN/inf trwale zepsułyby sumy przodków (zmiany liczone przyrostowo)
+        bad = [k for k, v in out.items() if not math.isfinite(v)]
+        bad += [k for k in ("d", "ins_thick") if k not in bad and out[k] <= 0]
+        if bad:
+            raise ValueError(f"Niepoprawne parametry odcinka: {', '.join(bad)}")
+        return out
+
+    def _propagate(self, node: Node, d_old: float, d_new: float):
+        # delta od węzła w górę do korzenia + suma budynku
+        n = node
+        while n is not None:
+            n.sub_old += d_old
+            n.sub_new += d_new
+            n = self.nodes[n.parent] if n.parent is not None else None
+        self.total_old += d_old
+        self.total_new += d_new
+
+    def add(self, node_id, parent=None, kind: str = "segment", old: dict | None = None, new: dict | None = None):
+        """
+        Dodaje węzeł. old/new: parametry odcinka (brakujące klucze z defaults_*);
+        bez old i new węzeł tylko grupuje dzieci. Gdy podano tylko old,
+        nowa wersja dziedziczy parametry starej nałożone na defaults_new.
+        """
+        if node_id in self.nodes:
+            raise ValueError(f"Węzeł '{node_id}' już istnieje")
+        if parent is not None and parent not in self.nodes:
+            raise ValueError(f"Nieznany węzeł nadrzędny '{parent}'")
+        node = Node(node_id, parent, kind)
+        node.old = self._params(self.defaults_old, None, old)
+        if new is None and old is not None:
+            new = {k: v for k, v in old.items() if k not in ("lambda", "ins_thick")}
+        node.new = self._params(self.defaults_new, None, new)
+        node.loss_old = _segment_loss(node.old)
+        node.loss_new = _segment_loss(node.new)
+        self.nodes[node_id] = node
+        if parent is None:
+            self.roots.append(node_id)
+        else:
+            self.nodes[parent].children.append(node_id)
+        self._propagate(node, node.loss_old, node.loss_new)
+        return node
+
+    def update(self, node_id, old: dict | None = None, new: dict | None = None):
+        """
+        Zmienia parametry jednego odcinka (tylko podane klucze) i poprawia
+        sumy przodków — O(głębokość).
+        """
+        node = self.nodes[node_id]
+        p_old = node.old if old is None else self._params(self.defaults_old, node.old, old)
+        p_new = node.new if new is None else self._params(self.defaults_new, node.new, new)
+        # najpierw straty (mogą zgłosić wyjątek), potem zmiana stanu — przy błędzie węzeł bez zmian
+        loss_old, loss_new = _segment_loss(p_old), _segment_loss(p_new)
+        d_old, d_new = loss_old - node.loss_old, loss_new - node.loss_new
+        node.old, node.new = p_old, p_new
+        node.loss_old, node.loss_new = loss_old, loss_new
+        self._propagate(node, d_old, d_new)
+        return node
+
+    def remove(self, node_id):
+        """Usuwa węzeł razem z poddrzewem."""
+        node = self.nodes[node_id]
+        if node.parent is None:
+            self.roots.remove(node_id)
+        else:
+            parent = self.nodes[node.parent]
+            parent.children.remove(node_id)
+            self._propagate(parent, -node.sub_old, -node.sub_new)
+        if node.parent is None:
+            self.total_old -= node.sub_old
+            self.total_new -= node.sub_new
+        stack = [node_id]
+        while stack:
+            stack.extend(self.nodes.pop(stack.pop()).children)
+
+    def refresh(self):
+        """
+        Pełne przeliczenie wszystkich sum (O(liczba odcinków)) — usuwa
+        ewentualny dryf zaokrągleń po bardzo długiej serii edycji.
+        """
+        self.total_old = self.total_new = 0.0
+        for root in self.roots:
+            order, stack = [], [root]
+            while stack:
+                nid = stack.pop()
+                order.append(nid)
+                stack.extend(self.nodes[nid].children)
+            for nid in reversed(order):
+                n = self.nodes[nid]
+                n.sub_old = n.loss_old + sum(self.nodes[c].sub_old for c in n.children)
+                n.sub_new = n.loss_new + sum(self.nodes[c].sub_new for c in n.children)
+            self.total_old += self.nodes[root].sub_old
+            self.total_new += self.nodes[root].sub_new
+
+    # --- odczyt ---
+    def ancestors(self, node_id) -> list:
+        """Identyfikatory przodków od rodzica do korzenia."""
+        out, n = [], self.nodes[node_id]
+        while n.parent is not None:
+            out.append(n.parent)
+            n = self.nodes[n.parent]
+        return out
+
+    def depth(self, node_id) -> int:
+        d, n = 0, self.nodes[node_id]
+        while n.parent is not None:
+            n = self.nodes[n.parent]; d += 1
+        return d
+
+    def summary(self, node_id=None) -> dict:
+        """
+        Porównanie strat/kosztów w formacie compute_audit dla poddrzewa
+        węzła (node_id=None — cały budynek). Odczyt z bufora, O(1).
+        """
+        if node_id is None:
+            return audit_summary(self.total_old, self.total_new, self.price_gj_brutto)
+        n = self.nodes[node_id]
+        return audit_summary(n.sub_old, n.sub_new, self.price_gj_brutto)
+
+    @classmethod
+    def from_segments(cls, segments, **kwargs) -> "BuildingNetwork":
+        """
+        Buduje sieć z listy słowników z kluczami 'id', 'parent', 'kind'
+        oraz parametrami odcinka ('old' / 'new' lub płasko jako stara wersja).
+        Rodzic musi wystąpić na liście przed dziećmi.
+        """
+        net = cls(**kwargs)
+        for s in segments:
+            old = s.get("old")
+            if old is None:
+                flat = {k: s[k] for k in PARAM_KEYS if k in s}
+                old = flat or None
+            net.add(s["id"], parent=s.get("parent"), kind=s.get("kind", "segment"), old=old, new=s.get("new"))
+        return net
+
+
+class NetworkStore:
+    """Sieci edytowane przez API: identyfikator → (BuildingNetwork, blokada); LRU z TTL od ostatniego użycia."""
+
+    def __init__(self, maxsize: int = 256, ttl: float | None = 3600.0):
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def put(self, net: BuildingNetwork) -> str:
+        network_id = secrets.token_urlsafe(12)
+        self.memory.set(network_id, (net, threading.Lock()))
+        return network_id
+
+    def get(self, network_id: str):
+        """(sieć, blokada) albo None; odczyt przedłuża ważność."""
+        entry = self.memory.get(network_id)
+        if entry is not None:
+            self.memory.set(network_id, entry)
+        return entry
+
+    def stats(self) -> dict:
+        return self.memory.stats()
+
+
+NETWORKS = NetworkStore(maxsize=_env_num("PROFINSTAL_NETWORK_STORE_SIZE", 256),
+                        ttl=_env_num("PROFINSTAL_NETWORK_TTL", 3600.0, float) or None)
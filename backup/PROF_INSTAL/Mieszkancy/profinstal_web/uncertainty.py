@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — pasma niepewności (Monte Carlo) dla strat i oszczędności
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+Wejścia compute_all opisuje się rozkładami (np. zużycie month_m3 ~ normalny,
+ΔT zależne od sezonu, taryfa zmieniana w trakcie roku), losuje N próbek
+i liczy je wektorowo przez calc_np.compute_all_batch. Losowanie jest
+dzielone na porcje o stałej wielkości z własnym ziarnem (SeedSequence.spawn),
+więc wynik zależy tylko od seed i n — nie od liczby procesów.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from calc_np import INPUT_FIELDS, compute_all_batch
+
+OUTPUT_FIELDS = ("eta", "loss_build_y", "save70_build_y", "save80_build_y")
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+SHARD_SIZE = 100_000  # próbek na porcję (stała → powtarzalność niezależna od liczby procesów)
+
+
+def sample(rng: np.random.Generator, spec, n: int) -> np.ndarray:
+    """
+    Losuje n wartości wg opisu rozkładu:
+        liczba / tekst                                   — stała,
+        {"dist": "normal", "mean", "sd", ["low"], ["high"]} — normalny (opcjonalnie przycięty),
+        {"dist": "uniform", "low", "high"}               — jednostajny,
+        {"dist": "triangular", "low", "mode", "high"}    — trójkątny,
+        {"dist": "choice", "values", ["p"]}              — wybór z listy (np. taryfy w roku).
+    """
+    if not isinstance(spec, dict):
+        return np.full(n, spec)
+    dist = spec.get("dist", "const")
+    if dist == "const":
+        return np.full(n, spec["value"])
+    if dist == "normal":
+        out = rng.normal(spec["mean"], spec["sd"], n)
+        if "low" in spec or "high" in spec:
+            out = np.clip(out, spec.get("low", -np.inf), spec.get("high", np.inf))
+        return out
+    if dist == "uniform":
+        return rng.uniform(spec["low"], spec["high"], n)
+    if dist == "triangular":
+        return rng.triangular(spec["low"], spec["mode"], spec["high"], n)
+    if dist == "choice":
+        return rng.choice(np.asarray(spec["values"]), size=n, p=spec.get("p"))
+    raise ValueError(f"Nieznany rozkład: {dist!r}")
+
+
+def _finite(x):
+    """float albo None (JSON null) dla NaN/inf — jsonify zapisałby niepoprawne NaN/Infinity."""
+    x = float(x)
+    return x if math.isfinite(x) else None
+
+
+def _run_shard(args):
+    inputs, seed_seq, n = args
+    rng = np.random.default_rng(seed_seq)
+    cols = {k: sample(rng, inputs[k], n) for k in INPUT_FIELDS}
+    cols["units"] = np.rint(cols["units"]).astype(np.int64) if cols["units"].dtype.kind == "f" else cols["units"]
+    batch = compute_all_batch(**cols)
+    valid = batch["valid"].copy()
+    for k in OUTPUT_FIELDS:  # przepełnienie (ogromne wejścia) → inf; takie próbki też odrzucane
+        valid &= np.isfinite(batch[k])
+    return {k: batch[k][valid] for k in OUTPUT_FIELDS}
+
+
+def monte_carlo(inputs: dict, n: int = 100_000, seed: int = 0, percentiles=DEFAULT_PERCENTILES,
+                workers: int | None = None, shard_size: int = SHARD_SIZE) -> dict:
+    """
+    Symulacja Monte Carlo wejść compute_all.
+    inputs: {pole: stała lub opis rozkładu (patrz sample)} dla pól
+        bill, heat_price, unit, vat, month_m3, units, dT.
+    workers: >1 — porcje liczone w puli procesów (dla bardzo dużych n).
+    Zwraca {'n', 'n_valid', 'seed', 'percentiles': {pole: {'p5': ...}}, 'mean': {pole: ...}}
+    dla pól OUTPUT_FIELDS. Próbki odrzucone przez walidację albo z wynikiem
+    nieskończonym są pomijane; gdy nie zostaje żadna — ValueError.
+    """
+    missing = [k for k in INPUT_FIELDS if k not in inputs]
+    if missing:
+        raise ValueError(f"Brak wejść: {', '.join(missing)}")
+    if n <= 0:
+        raise ValueError("n musi być dodatnie")
+
+    n_shards = math.ceil(n / shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_shards)
+    tasks = [(inputs, seeds[i], min(shard_size, n - i*shard_size)) for i in range(n_shards)]
+    if workers and workers > 1 and n_shards > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, n_shards)) as ex:
+            parts = list(ex.map(_run_shard, tasks))
+    else:
+        parts = [_run_shard(t) for t in tasks]
+
+    out = {k: np.concatenate([p[k] for p in parts]) for k in OUTPUT_FIELDS}
+    n_valid = int(out["eta"].size)
+    if not n_valid:
+        raise ValueError("Żadna próbka nie przeszła walidacji wejść")
+    res = {"n": n, "n_valid": n_valid, "seed": seed, "percentiles": {}, "mean": {}}
+    for k, v in out.items():
+        with np.errstate(over="ignore"):  # przepełniona średnia → None
+            pct = np.percentile(v, percentiles)
+            mean = v.mean()
+        res["percentiles"][k] = {f"p{p:g}": _finite(x) for p, x in zip(percentiles, pct)}
+        res["mean"][k] = _finite(mean)
+    return res
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL — punkt wejścia serwera produkcyjnego (WSGI)
+© 2025 Maciej Ślusarczyk. All rights reserved.
+
+    gunicorn -c gunicorn.conf.py                              # ta aplikacja (wsgi:web())
+    PROFINSTAL_APP=mieszkancy gunicorn -c gunicorn.conf.py    # ../MIESZKANCY_08_17.py
+
+Z preload_app fabryka działa raz, w procesie nadrzędnym przed fork:
+importuje python-docx i reportlab, rejestruje czcionki, buduje szablony DOCX,
+wczytuje logo, renderuje strony startowe oraz po jednym PDF i DOCX na danych
+domyślnych. Na końcu gc.freeze() przenosi te obiekty poza GC, więc workery
+dzielą ich strony pamięci (copy-on-write) i pierwszy użytkownik nie czeka
+na zimny start. PROFINSTAL_WARMUP=0 wyłącza rozgrzewanie.
+"""
+import gc
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WARMUP = os.environ.get("PROFINSTAL_WARMUP", "1") != "0"
+
+
+def warm_pages(app, paths):
+    """Strony GET przez klienta testowego — trafiają do pamięci szablonów i PAGE_CACHE."""
+    client = app.test_client()
+    for path in paths:
+        client.get(path, headers={"Accept-Encoding": "gzip"}).close()  # close → zwolnienie bramki (admission.py)
+
+
+def warm_documents():
+    """Szablony, czcionki, logo oraz jeden PDF i jeden DOCX z DEFAULTS (poza DOC_CACHE)."""
+    from app import DEFAULTS
+    from cache import cached_compute_all
+    from exports import preload, render_result
+
+    preload()
+    d = DEFAULTS
+    res = cached_compute_all(d["bill"], d["heat_price"], d["unit"], d["vat"], d["month_m3"], d["units"], d["dT"])
+    for kind in ("pdf", "docx"):
+        try:
+            render_result(kind, res)
+        except ImportError:  # brak reportlab / python-docx — eksport i tak zgłosi błąd
+            pass
+
+
+def freeze():
+    """Obiekty załadowane do tej pory omijane przez GC (brak zapisów w stronach dzielonych po fork)."""
+    gc.collect()
+    gc.freeze()
+
+
+def _report(name: str, t0: float):
+    print(f"[{name}] rozgrzane w {time.perf_counter() - t0:.2f} s, zamrożonych obiektów: {gc.get_freeze_count()}",
+          file=sys.stderr)
+
+
+def web():
+    """Fabryka aplikacji profinstal_web (gunicorn 'wsgi:web()')."""
+    t0 = time.perf_counter()
+    from app import app
+
+    if WARMUP:
+        warm_documents()
+        warm_pages(app, ("/", "/audit"))
+    freeze()
+    _report("profinstal_web", t0)
+    return app
+
+
+def mieszkancy():
+    """Fabryka aplikacji jednoplikowej MIESZKANCY_08_17.py (gunicorn 'wsgi:mieszkancy()')."""
+    t0 = time.perf_counter()
+    sys.path.insert(0, os.path.dirname(HERE))
+    from MIESZKANCY_08_17 import app
+
+    if WARMUP:
+        warm_pages(app, ("/",))
+    freeze()
+    _report("MIESZKANCY_08_17", t0)
+    return app
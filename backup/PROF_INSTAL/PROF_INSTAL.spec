@@ -3,9 +3,9 @@
 
 a = Analysis(
     ['Dla_mieszkancow.py'],
-    pathex=[],
+    pathex=['Mieszkancy/profinstal_web'],  # wspólne moduły (fonts.py)
     binaries=[],
-    datas=[],
+    datas=[('LOGO512x512.png', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,54 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Profil szybkiego startu: katalog (one-dir) zamiast jednego pliku — bez
+# rozpakowywania całości do %TEMP% przy każdym uruchomieniu; bajtkod
+# skompilowany z -OO; bez UPX (dekompresja DLL przy starcie); moduły spoza
+# programu wykluczone (build_profile.py).
+#   pyinstaller PROF_INSTAL_fast.spec   →  dist/PROF_INSTAL/PROF_INSTAL(.exe)
+#   python bench_startup.py dist/PROF_INSTAL
+import sys
+
+sys.path.insert(0, SPECPATH)
+from build_profile import excludes
+
+
+a = Analysis(
+    ['Dla_mieszkancow.py'],
+    pathex=['Mieszkancy/profinstal_web'],  # wspólne moduły (fonts.py)
+    binaries=[],
+    datas=[('LOGO512x512.png', '.')],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=excludes(),
+    noarchive=False,
+    optimize=2,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='PROF_INSTAL',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='PROF_INSTAL',
+)
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL - pomiar zimnego startu wersji okienkowej © 2025 Maciej Ślusarczyk
+Wszelkie prawa zastrzeżone.
+
+Uruchamia program N razy z --startup-report/--exit-after-paint, mierzy czas
+od uruchomienia procesu do jego zakończenia (po pierwszym odrysowaniu okna)
+oraz rozmiar buildu i porównuje z budżetem (startup_budget.json). Kod
+wyjścia 1 = przekroczony budżet. Na Linuksie bez ekranu używa xvfb-run.
+
+    python bench_startup.py dist/PROF_INSTAL            # build PROF_INSTAL_fast.spec (katalog)
+    python bench_startup.py dist/PROF_INSTAL.exe        # dawny build jednoplikowy
+    python bench_startup.py --source --smoke            # źródła z -OO i wykluczeniami z build_profile.py
+    python bench_startup.py dist/PROF_INSTAL --write-budget   # zapis nowego budżetu (+25%)
+
+Pierwsze uruchomienie to start „zimny” po buildzie; --drop-caches (Linux,
+root) czyści page cache przed każdym uruchomieniem.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_NAME = "PROF_INSTAL"
+DEFAULT_BUDGET = os.path.join(HERE, "startup_budget.json")
+HEADROOM = 1.25  # zapas przy --write-budget
+
+
+def _command(target: str | None, source: bool) -> tuple:
+    """(polecenie, ścieżka buildu do pomiaru rozmiaru albo None)."""
+    if source:
+        boot = ("import sys; sys.path.insert(0, %r); import build_profile; build_profile.install_blocker(); "
+                "import runpy; runpy.run_path(%r, run_name='__main__')") % (HERE, os.path.join(HERE, "Dla_mieszkancow.py"))
+        return [sys.executable, "-OO", "-c", boot], None
+    if os.path.isdir(target):
+        exe = os.path.join(target, APP_NAME + (".exe" if sys.platform.startswith("win") else ""))
+        return [exe], target
+    return [target], target
+
+
+def _display_prefix() -> list:
+    if not sys.platform.startswith("linux") or os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"):
+        return []
+    if shutil.which("xvfb-run"):
+        return ["xvfb-run", "-a"]
+    raise SystemExit("Brak ekranu: ustaw DISPLAY albo zainstaluj xvfb (xvfb-run).")
+
+
+def _drop_caches():
+    subprocess.run(["sync"], check=False)
+    with open("/proc/sys/vm/drop_caches", "w") as f:
+        f.write("3\n")
+
+
+def run_once(cmd: list, timeout: float) -> dict:
+    fd, report_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        t = time.perf_counter()
+        subprocess.run(cmd + ["--startup-report", report_path, "--exit-after-paint"],
+                       check=True, timeout=timeout, stdout=subprocess.DEVNULL)
+        wall = time.perf_counter() - t
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+    finally:
+        os.unlink(report_path)
+    return {"wall_s": wall, "first_paint_s": report.get("first_paint"), "imports_s": report.get("imports"),
+            "widgets_s": report.get("widgets")}
+
+
+def bundle_mb(path: str | None) -> float | None:
+    if path is None:
+        return None
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 2**20
+    total = 0
+    for dirpath, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(dirpath, fn)) for fn in files)
+    return total / 2**20
+
+
+def summarize(runs: list, size: float | None) -> dict:
+    out = {
+        "runs": len(runs),
+        "cold_wall_s": runs[0]["wall_s"],
+        "median_wall_s": statistics.median(r["wall_s"] for r in runs),
+        "median_first_paint_s": statistics.median(r["first_paint_s"] for r in runs),
+        "median_imports_s": statistics.median(r["imports_s"] for r in runs),
+        "median_widgets_s": statistics.median(r["widgets_s"] for r in runs),
+    }
+    if size is not None:
+        out["bundle_mb"] = size
+    return {k: round(v, 3) if isinstance(v, float) else v for k, v in out.items()}
+
+
+def check_budget(result: dict, budget: dict) -> list:
+    """Lista przekroczeń: [(metryka, wynik, limit)] dla kluczy budżetu obecnych w wyniku."""
+    return [(k, result[k], limit) for k, limit in budget.items()
+            if not k.startswith("_") and result.get(k) is not None and result[k] > limit]
+
+
+def smoke() -> int:
+    """Dokumenty z -OO i wykluczeniami z build_profile (podproces) — czy build niczego nie utnie."""
+    return subprocess.run([sys.executable, "-OO", os.path.abspath(__file__), "--smoke-child"]).returncode
+
+
+class _Field:
+    """Zastępuje widżety okna przy generowaniu dokumentów bez ekranu."""
+
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def __getattr__(self, name):
+        return lambda *a, **kw: None
+
+
+def _smoke_child():
+    sys.path.insert(0, HERE)
+    import build_profile
+    blocker = build_profile.install_blocker()
+    import Dla_mieszkancow as D
+
+    app = D.App.__new__(D.App)
+    for attr, value in (("e_bill", "49.00"), ("e_heat_price", "73.69"), ("unit_var", "GJ"),
+                        ("e_month", "7.42"), ("e_units", "65")):
+        setattr(app, attr, _Field(value))
+    for attr in ("txt", "kpi_eta", "kpi_loss", "kpi_month", "kpi_year",
+                 "kpi_save70_month", "kpi_save70_year", "kpi_save80_month", "kpi_save80_year"):
+        setattr(app, attr, _Field())
+    app._calc_all()
+    step = _Field()
+    for name in ("_write_resident_letter_docx", "_write_resident_letter_pdf", "_write_opinion_docx", "_write_opinion_pdf"):
+        fd, path = tempfile.mkstemp(suffix=".docx" if "docx" in name else ".pdf")
+        os.close(fd)
+        try:
+            getattr(app, name)(step, path, dict(app._last), dict(D.PARTY_DEFAULTS))
+            print(f"{name}: {os.path.getsize(path)} B")
+        finally:
+            os.unlink(path)
+    print("pominięte importy:", ", ".join(sorted(blocker.hits)) or "—")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pomiar zimnego startu PROF INSTAL")
+    ap.add_argument("target", nargs="?", help="katalog buildu (one-dir) albo plik wykonywalny")
+    ap.add_argument("--source", action="store_true", help="uruchamiaj źródła (python -OO) z wykluczeniami build_profile")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--budget", default=DEFAULT_BUDGET, help="plik JSON z limitami")
+    ap.add_argument("--write-budget", action="store_true", help="zapisz wynik (+25%%) jako nowy budżet")
+    ap.add_argument("--drop-caches", action="store_true", help="czyść page cache przed każdym uruchomieniem (Linux, root)")
+    ap.add_argument("--smoke", action="store_true", help="najpierw wygeneruj dokumenty z wykluczeniami z build_profile")
+    ap.add_argument("--smoke-child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.smoke_child:
+        _smoke_child()
+        return 0
+    if args.smoke and smoke() != 0:
+        print("SMOKE: błąd generowania dokumentów", file=sys.stderr)
+        return 1
+    if not args.source and not args.target:
+        if args.smoke:
+            return 0
+        ap.error("podaj katalog/plik buildu albo --source")
+
+    cmd, bundle = _command(args.target, args.source)
+    cmd = _display_prefix() + cmd
+    runs = []
+    for _ in range(args.runs):
+        if args.drop_caches:
+            _drop_caches()
+        runs.append(run_once(cmd, args.timeout))
+    result = summarize(runs, bundle_mb(bundle))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+    if args.write_budget:
+        budget = {k: round(v * HEADROOM, 2) for k, v in result.items()
+                  if k in ("cold_wall_s", "median_wall_s", "median_first_paint_s", "bundle_mb")}
+        budget["_opis"] = "Limity dla bench_startup.py (wynik referencyjny +25%)."
+        with open(args.budget, "w", encoding="utf-8") as f:
+            json.dump(budget, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Zapisano budżet: {args.budget}")
+        return 0
+
+    with open(args.budget, encoding="utf-8") as f:
+        budget = json.load(f)
+    over = check_budget(result, budget)
+    for key, value, limit in over:
+        print(f"REGRESJA: {key} = {value} > {limit}", file=sys.stderr)
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
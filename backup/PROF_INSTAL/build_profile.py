@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL - profil budowania wersji okienkowej © 2025 Maciej Ślusarczyk
+Wszelkie prawa zastrzeżone.
+
+Lista modułów pomijanych w buildzie PyInstaller (PROF_INSTAL_fast.spec).
+Program używa tylko tkinter, python-docx (lxml.etree), reportlab (pdfgen)
+i PIL (PNG/JPEG przy skalowaniu logo) — reszta środowiska (setuptools, numpy,
+aplikacja web, wtyczki PIL innych formatów, części lxml) tylko wydłuża
+rozpakowanie i import. install_blocker() symuluje te wykluczenia w zwykłym
+Pythonie, żeby sprawdzić je bez budowania (bench_startup.py --smoke).
+"""
+import sys
+
+# formaty, których program potrzebuje (logo: PNG → PNG/JPEG; reportlab ImageReader)
+KEEP_PIL_PLUGINS = ("PngImagePlugin", "JpegImagePlugin")
+
+EXCLUDES = [
+    # narzędzia środowiska i testów
+    "setuptools", "pkg_resources", "distutils", "_distutils_hack", "pip", "wheel",
+    "unittest", "doctest", "pydoc", "lib2to3", "test", "tkinter.test", "idlelib", "pytest",
+    # aplikacja web i jej zależności
+    "flask", "werkzeug", "jinja2", "click", "itsdangerous", "numpy",
+    # lxml: python-docx używa tylko lxml.etree
+    "lxml.html", "lxml.isoschematron", "lxml.objectify", "lxml.cssselect", "lxml.html5parser",
+    # PIL: bez Tk/Qt, profili ICC i kodeków AVIF/WebP
+    "PIL.ImageTk", "PIL._imagingtk", "PIL.ImageQt", "PIL.ImageCms", "PIL._imagingcms",
+    "PIL._avif", "PIL._webp", "PIL.ImageShow", "PIL.ImageGrab",
+    # reportlab: rastrowanie i wykresy nieużywane przez pdfgen
+    "reportlab.graphics.renderPM", "rlPyCairo", "reportlab.graphics.barcode", "reportlab.graphics.charts",
+]
+
+
+def pil_plugin_excludes() -> list:
+    """Wtyczki PIL innych formatów niż KEEP_PIL_PLUGINS (Image.init pomija brakujące)."""
+    try:
+        import pkgutil
+        import PIL
+    except ImportError:
+        return []
+    return [f"PIL.{m.name}" for m in pkgutil.iter_modules(PIL.__path__)
+            if m.name.endswith("ImagePlugin") and m.name not in KEEP_PIL_PLUGINS]
+
+
+def excludes() -> list:
+    return EXCLUDES + pil_plugin_excludes()
+
+
+def _blocked(name: str, names: set) -> bool:
+    parts = name.split(".")
+    return any(".".join(parts[:i]) in names for i in range(1, len(parts) + 1))
+
+
+class _Blocker:
+    """Finder zgłaszający ImportError dla wykluczonych modułów (jak w buildzie)."""
+
+    def __init__(self, names):
+        self.names = set(names)
+        self.hits = set()
+
+    def find_spec(self, name, path=None, target=None):
+        if _blocked(name, self.names):
+            self.hits.add(name)
+            raise ImportError(f"{name} wykluczony w buildzie (build_profile.EXCLUDES)", name=name)
+        return None
+
+
+def install_blocker(names=None) -> _Blocker:
+    """Blokuje import wykluczonych modułów w bieżącym procesie; zwraca finder (atrybut hits)."""
+    blocker = _Blocker(excludes() if names is None else names)
+    sys.meta_path.insert(0, blocker)
+    return blocker
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL - generowanie dokumentów w tle © 2025 Maciej Ślusarczyk
+Wszelkie prawa zastrzeżone.
+
+Dokumenty (python-docx / reportlab) budowane są w wątku roboczym, a okno Tk
+tylko odbiera zdarzenia z kolejki (poll() wywoływane przez after()), więc
+interfejs nie zamarza. Zadania wykonywane są po kolei — można zlecić kilka
+jedno po drugim — i można je anulować: zadanie czekające od razu,
+uruchomione w najbliższym punkcie kontrolnym (Job.step).
+"""
+import itertools
+import os
+import queue
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class Cancelled(Exception):
+    """Zadanie anulowane przez użytkownika."""
+
+
+class Job:
+    """Jedno zlecone zadanie: stan, postęp 0–1, komunikat i wynik (ścieżka pliku)."""
+
+    def __init__(self, job_id: int, label: str, events: queue.Queue):
+        self.id = job_id
+        self.label = label
+        self.state = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.path = None
+        self.error = None
+        self.future = None
+        self._cancel = threading.Event()
+        self._events = events
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (DONE, FAILED, CANCELLED)
+
+    def step(self, progress: float, message: str = ""):
+        """Punkt kontrolny (wątek roboczy): zgłasza postęp i przerywa zadanie, jeśli je anulowano."""
+        if self._cancel.is_set():
+            raise Cancelled()
+        self.progress = progress
+        self.message = message
+        self._events.put((self, RUNNING))
+
+
+def _unlink(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class DocWorker:
+    """Kolejka zadań generowania dokumentów z jednym wątkiem roboczym."""
+
+    def __init__(self, workers: int = 1):
+        self._ex = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="profinstal-doc")
+        self._events = queue.Queue()
+        self._ids = itertools.count(1)
+        self.jobs = []  # niezakończone, w kolejności zlecenia (tylko wątek Tk)
+
+    def submit(self, label: str, write, suffix: str, *args) -> Job:
+        """
+        Zleca write(job, path, *args) — zapis dokumentu do pliku tymczasowego
+        z rozszerzeniem suffix. Argumenty muszą być już odczytane z widżetów
+        (wątek roboczy nie może dotykać Tk).
+        """
+        job = Job(next(self._ids), label, self._events)
+        job.future = self._ex.submit(self._run, job, write, suffix, args)
+        self.jobs.append(job)
+        return job
+
+    def _run(self, job: Job, write, suffix: str, args: tuple):
+        if job.cancel_requested:
+            job.state = CANCELLED
+            self._events.put((job, CANCELLED))
+            return
+        job.state = RUNNING
+        fd, path = tempfile.mkstemp(prefix="PROF_INSTAL_", suffix=suffix)
+        os.close(fd)
+        try:
+            job.step(0.0, "start")
+            write(job, path, *args)
+            job.step(1.0, "gotowe")
+        except Cancelled:
+            _unlink(path)
+            job.state = CANCELLED
+        except Exception as e:
+            _unlink(path)
+            job.error = e
+            job.state = FAILED
+        else:
+            job.path = path
+            job.state = DONE
+        self._events.put((job, job.state))
+
+    def cancel(self, job: Job):
+        """Anuluje zadanie: czekające od razu, uruchomione w najbliższym Job.step."""
+        job._cancel.set()
+        if job.future is not None and job.future.cancel():
+            job.state = CANCELLED
+            self._events.put((job, CANCELLED))
+
+    def current(self) -> Job | None:
+        """Zadanie w toku (albo najbliższe w kolejce)."""
+        for job in self.jobs:
+            if not job.finished:
+                return job
+        return None
+
+    def poll(self) -> list:
+        """Zdarzenia od ostatniego wywołania: [(zadanie, stan), ...] — wywoływać z wątku Tk."""
+        out = []
+        while True:
+            try:
+                job, state = self._events.get_nowait()
+            except queue.Empty:
+                break
+            out.append((job, state))
+            if state in (DONE, FAILED, CANCELLED) and job in self.jobs:
+                self.jobs.remove(job)
+        return out
+
+    def shutdown(self):
+        """Anuluje wszystkie zadania i zwalnia wątek (przy zamykaniu okna)."""
+        for job in list(self.jobs):
+            job._cancel.set()
+        self._ex.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+PROF INSTAL - warianty logo dla GUI, PDF i DOCX © 2025 Maciej Ślusarczyk
+Wszelkie prawa zastrzeżone.
+
+Logo (PNG 1024×1024, ~1,6 MB) dekodowane i skalowane jest raz na cel:
+Tk 64 px, PDF 20 mm przy 300 dpi, DOCX 1 cal przy 300 dpi. Gotowe bajty
+(PNG przy przezroczystości, inaczej JPEG) trzymane są w pamięci i w katalogu
+podręcznym użytkownika, więc kolejne uruchomienia nie potrzebują PIL ani
+dekodowania oryginału. Dla PDF dostępny jest też wspólny ImageReader.
+"""
+import io
+import os
+import sys
+import tempfile
+import threading
+
+LOGO_CANDIDATES = ("profinstal_logo_150x150.png", "LOGO512x512.png")  # pierwszy istniejący w folderze programu
+PDF_DPI = 300
+TARGETS = {
+    "tk": 64,                           # px — nagłówek okna
+    "pdf": round(20 / 25.4 * PDF_DPI),  # 20 mm
+    "docx": round(1.0 * PDF_DPI),       # 1 cal
+}
+ASSET_VERSION = 1  # zmienić przy zmianie sposobu skalowania/kompresji
+CACHE_DIR = os.environ.get("PROFINSTAL_ASSET_CACHE") or os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or tempfile.gettempdir(),
+    "profinstal-assets")
+
+_mem = {}
+_reader = None
+_lock = threading.Lock()
+
+
+def _base_dir() -> str:
+    # PyInstaller rozpakowuje dane do sys._MEIPASS
+    return getattr(sys, "_MEIPASS", None) or os.path.dirname(os.path.abspath(__file__))
+
+
+def logo_source(base_dir: str | None = None) -> str | None:
+    """Ścieżka oryginalnego logo albo None."""
+    base = base_dir or _base_dir()
+    for name in LOGO_CANDIDATES:
+        p = os.path.join(base, name)
+        if os.path.exists(p):
+            return p
+    return None
+
+
+def _cache_path(src: str, target: str) -> str:
+    st = os.stat(src)
+    tag = f"{os.path.splitext(os.path.basename(src))[0]}_{st.st_size}_{st.st_mtime_ns}_v{ASSET_VERSION}"
+    return os.path.join(CACHE_DIR, f"{tag}_{target}_{TARGETS[target]}px.bin")
+
+
+def _encode(src: str, target: str) -> bytes:
+    """Dekoduje oryginał, zmniejsza do celu i koduje (PNG / JPEG) — wymaga PIL."""
+    from PIL import Image
+
+    with Image.open(src) as im:
+        im.load()
+        im.thumbnail((TARGETS[target], TARGETS[target]), Image.LANCZOS)
+        transparent = im.mode in ("RGBA", "LA", "P") and im.convert("RGBA").getextrema()[3][0] < 255
+        out = io.BytesIO()
+        if target == "tk" or transparent:  # Tk czyta tylko PNG/GIF
+            im.save(out, "PNG", optimize=True)
+        else:
+            im.convert("RGB").save(out, "JPEG", quality=90, optimize=True)
+        return out.getvalue()
+
+
+def logo_bytes(target: str) -> bytes | None:
+    """Zakodowane logo dla celu ("tk" / "pdf" / "docx") albo None, gdy brak pliku lub PIL."""
+    data = _mem.get(target)
+    if data is not None:
+        return data
+    src = logo_source()
+    if src is None:
+        return None
+    with _lock:
+        data = _mem.get(target)
+        if data is not None:
+            return data
+        path = _cache_path(src, target)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            try:
+                data = _encode(src, target)
+            except ImportError:
+                # bez PIL: dokumenty dostają oryginał (jak dawniej), GUI bez logo
+                data = None
+                if target != "tk":
+                    with open(src, "rb") as f:
+                        data = f.read()
+            except Exception:
+                return None
+            else:
+                try:
+                    os.makedirs(CACHE_DIR, exist_ok=True)
+                    tmp = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp, path)
+                except OSError:
+                    pass
+        if data is not None:
+            _mem[target] = data
+        return data
+
+
+def logo_stream(target: str):
+    """Nowy strumień z logo (np. dla python-docx add_picture) albo None."""
+    data = logo_bytes(target)
+    return io.BytesIO(data) if data is not None else None
+
+
+def logo_reader():
+    """Wspólny reportlab ImageReader logo w rozdzielczości PDF albo None."""
+    global _reader
+    if _reader is None:
+        data = logo_bytes("pdf")
+        if data is None:
+            return None
+        from reportlab.lib.utils import ImageReader
+        _reader = ImageReader(io.BytesIO(data))
+    return _reader